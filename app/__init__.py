@@ -45,6 +45,10 @@ def create_table():
     global first_request
     if first_request:
         db.create_all()
+        # Pick up resume analysis jobs a previous process left unfinished
+        routes.resume_jobs.recover()
+        # Index resumes stored before their text was extracted
+        routes.resume_indexer.recover()
     
     first_request = False
 
@@ -12,3 +12,162 @@ class Config(object):
         "DATABASE_URL"
     ) or "sqlite:///" + os.path.join(basedir, "app.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Password hashing: the bcrypt cost (log2 rounds; hashes made with another
+    # cost are rehashed at the user's next successful login), threads that
+    # hash, and how many operations may wait for one before logins get a 503.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 64))
+
+    # Logged-in users are loaded from a per-process cache of read-only
+    # snapshots, trusted for USER_CACHE_TTL seconds (0 disables the cache) for
+    # up to USER_CACHE_SIZE users. Changes committed by this process apply at
+    # once; other processes see them when their entry expires.
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 30))
+    USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 10000))
+
+    # Review search: how long a filter's ordered result ids stay cached (seconds),
+    # how many distinct filters are kept, and the max-age sent to shared caches
+    # for anonymous search pages.
+    REVIEW_SEARCH_CACHE_TTL = int(os.environ.get("REVIEW_SEARCH_CACHE_TTL", 60))
+    REVIEW_SEARCH_CACHE_SIZE = int(os.environ.get("REVIEW_SEARCH_CACHE_SIZE", 256))
+    REVIEW_SEARCH_MAX_AGE = int(os.environ.get("REVIEW_SEARCH_MAX_AGE", 60))
+
+    # Background LLM resume analysis: worker threads, how many jobs may wait
+    # before new submissions get a 503, how many seconds a process's claim on
+    # a job lasts without renewal before another process may take the job
+    # over, and whether to run jobs inline (tests only).
+    RESUME_JOB_WORKERS = int(os.environ.get("RESUME_JOB_WORKERS", 2))
+    RESUME_JOB_MAX_PENDING = int(os.environ.get("RESUME_JOB_MAX_PENDING", 32))
+    RESUME_JOB_LEASE = int(os.environ.get("RESUME_JOB_LEASE", 120))
+    RESUME_JOBS_EAGER = False
+
+    # Seconds the list of installed LLM models is trusted before it is
+    # refreshed in the background.
+    MODEL_REGISTRY_TTL = int(os.environ.get("MODEL_REGISTRY_TTL", 30))
+
+    # LLM result cache: entries kept in process memory, total bytes of stored
+    # results, how many days a result is reused before it is regenerated, and
+    # how often (seconds) expired entries are dropped and the stored bytes are
+    # recounted across all processes.
+    LLM_CACHE_MEMORY_SIZE = int(os.environ.get("LLM_CACHE_MEMORY_SIZE", 128))
+    LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+    LLM_CACHE_MAX_AGE_DAYS = int(os.environ.get("LLM_CACHE_MAX_AGE_DAYS", 30))
+    LLM_CACHE_EVICT_INTERVAL = int(os.environ.get("LLM_CACHE_EVICT_INTERVAL", 300))
+
+    # Stream resume advice tokens to the browser over Socket.IO as the model
+    # generates them.
+    LLM_STREAM_TOKENS = os.environ.get("LLM_STREAM_TOKENS", "1") == "1"
+
+    # PDF text extraction limits: upload size, page count, CPU seconds per
+    # document, the page count from which pages are split across the
+    # PDF_WORKERS sandbox subprocesses, and how many extracted documents stay
+    # cached.
+    PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", 10 * 1024 * 1024))
+    PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 50))
+    PDF_CPU_BUDGET_SECONDS = float(os.environ.get("PDF_CPU_BUDGET_SECONDS", 10))
+    PDF_PARALLEL_PAGE_THRESHOLD = int(os.environ.get("PDF_PARALLEL_PAGE_THRESHOLD", 8))
+    PDF_WORKERS = int(os.environ.get("PDF_WORKERS", 2))
+    PDF_TEXT_CACHE_SIZE = int(os.environ.get("PDF_TEXT_CACHE_SIZE", 64))
+
+    # PDF sandboxes: extra address space each may map, wall-clock seconds per
+    # request before it is killed, and documents parsed before it is replaced.
+    # PDF_SANDBOX=0 parses in the web process.
+    PDF_SANDBOX = os.environ.get("PDF_SANDBOX", "1") == "1"
+    PDF_SANDBOX_MEMORY_MB = int(os.environ.get("PDF_SANDBOX_MEMORY_MB", 512))
+    PDF_SANDBOX_TIMEOUT = float(os.environ.get("PDF_SANDBOX_TIMEOUT", 20))
+    PDF_SANDBOX_MAX_DOCUMENTS = int(os.environ.get("PDF_SANDBOX_MAX_DOCUMENTS", 50))
+
+    # Uploaded resumes are stored once per distinct file, under their SHA-256
+    # in a sharded directory tree below this folder, and may be at most
+    # RESUME_MAX_BYTES. Requests with a larger body than MAX_CONTENT_LENGTH
+    # are refused with a 413 before the upload is read.
+    RESUME_STORE_DIR = os.environ.get("RESUME_STORE_DIR") or os.path.join(basedir, "resumes", "store")
+    RESUME_MAX_BYTES = int(os.environ.get("RESUME_MAX_BYTES", 10 * 1024 * 1024))
+    MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 16 * 1024 * 1024))
+
+    # Where resume files live: "local" (RESUME_STORE_DIR on this host) or "s3"
+    # (a bucket on any S3-compatible object store, shared by every app host;
+    # downloads redirect to presigned URLs valid for RESUME_URL_EXPIRES seconds).
+    # "flask resumes migrate" moves existing files into the configured storage.
+    RESUME_STORAGE = os.environ.get("RESUME_STORAGE", "local")
+    RESUME_S3_ENDPOINT = os.environ.get("RESUME_S3_ENDPOINT", "http://localhost:9000")
+    RESUME_S3_BUCKET = os.environ.get("RESUME_S3_BUCKET", "resumes")
+    RESUME_S3_ACCESS_KEY = os.environ.get("RESUME_S3_ACCESS_KEY", "")
+    RESUME_S3_SECRET_KEY = os.environ.get("RESUME_S3_SECRET_KEY", "")
+    RESUME_S3_REGION = os.environ.get("RESUME_S3_REGION", "us-east-1")
+    RESUME_S3_PREFIX = os.environ.get("RESUME_S3_PREFIX", "")
+    RESUME_URL_EXPIRES = int(os.environ.get("RESUME_URL_EXPIRES", 300))
+
+    # Stored resumes nothing references any more are garbage collected every
+    # RESUME_GC_INTERVAL seconds (0 disables it; "flask resumes gc" runs it by
+    # hand) once they are RESUME_GC_GRACE seconds old, RESUME_GC_BATCH_SIZE
+    # rows per transaction with RESUME_GC_BATCH_PAUSE seconds between batches.
+    RESUME_GC_INTERVAL = int(os.environ.get("RESUME_GC_INTERVAL", 6 * 3600))
+    RESUME_GC_GRACE = int(os.environ.get("RESUME_GC_GRACE", 24 * 3600))
+    RESUME_GC_BATCH_SIZE = int(os.environ.get("RESUME_GC_BATCH_SIZE", 500))
+    RESUME_GC_BATCH_PAUSE = float(os.environ.get("RESUME_GC_BATCH_PAUSE", 0.05))
+    # Text extracted from files posted to the resume parser endpoints is kept
+    # RESUME_UPLOAD_TEXT_TTL seconds so resubmissions skip the PDF parse; the
+    # collector deletes older rows.
+    RESUME_UPLOAD_TEXT_TTL = int(os.environ.get("RESUME_UPLOAD_TEXT_TTL", 24 * 3600))
+
+    # Text of every stored resume is extracted and indexed for search by this
+    # many background threads, which then render its preview;
+    # RESUME_INDEX_EAGER runs both inline (tests only).
+    RESUME_INDEX_WORKERS = int(os.environ.get("RESUME_INDEX_WORKERS", 1))
+    RESUME_INDEX_EAGER = False
+
+    # Resume previews (first-page image and snippet) are cached in this
+    # folder, evicting the least recently used beyond RESUME_PREVIEW_MAX_BYTES,
+    # and served with a RESUME_PREVIEW_MAX_AGE second cache lifetime.
+    RESUME_PREVIEW_DIR = os.environ.get("RESUME_PREVIEW_DIR") or os.path.join(basedir, "resumes", "previews")
+    RESUME_PREVIEW_MAX_BYTES = int(os.environ.get("RESUME_PREVIEW_MAX_BYTES", 100 * 1024 * 1024))
+    RESUME_PREVIEW_MAX_AGE = int(os.environ.get("RESUME_PREVIEW_MAX_AGE", 365 * 24 * 3600))
+
+    # "Download all resumes" ZIP bundles of a posting are streamed as they are
+    # built and also kept in RESUME_BUNDLE_DIR, up to RESUME_BUNDLE_CACHE_BYTES
+    # (least recently used deleted first; 0 disables the cache), so a repeat
+    # download of an unchanged applicant set is sent straight from disk.
+    RESUME_BUNDLE_DIR = os.environ.get("RESUME_BUNDLE_DIR") or os.path.join(basedir, "resumes", "bundles")
+    RESUME_BUNDLE_CACHE_BYTES = int(os.environ.get("RESUME_BUNDLE_CACHE_BYTES", 500 * 1024 * 1024))
+
+    # How resume downloads are delivered: "" sends them from the app (zero-copy
+    # where the server supports it), "x-sendfile" (Apache, lighttpd) or
+    # "x-accel-redirect" (nginx, with an internal location at
+    # RESUME_ACCEL_PREFIX aliased to RESUME_STORE_DIR) hands the transfer to
+    # the front proxy.
+    RESUME_SENDFILE = os.environ.get("RESUME_SENDFILE", "")
+    RESUME_ACCEL_PREFIX = os.environ.get("RESUME_ACCEL_PREFIX", "/protected-resumes/")
+
+    # LLM admission control: concurrent model calls, calls allowed to wait
+    # for a slot, outstanding requests per user, and the Retry-After sent on
+    # rejection before any call times have been observed.
+    LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 1))
+    LLM_MAX_WAITING = int(os.environ.get("LLM_MAX_WAITING", 16))
+    LLM_MAX_PER_USER = int(os.environ.get("LLM_MAX_PER_USER", 2))
+    LLM_RETRY_AFTER = int(os.environ.get("LLM_RETRY_AFTER", 30))
+
+    # Long resumes are split by section into chunks of at most this many
+    # (estimated) tokens, and up to LLM_CHUNK_WORKERS chunk prompts of one
+    # resume are in flight at once (each still takes an LLM concurrency slot).
+    LLM_CHUNK_TOKENS = int(os.environ.get("LLM_CHUNK_TOKENS", 1500))
+    LLM_CHUNK_WORKERS = int(os.environ.get("LLM_CHUNK_WORKERS", 4))
+
+    # LLM backend: "ollama" for the local daemon or "stub" for a deterministic
+    # offline model (load tests and benchmarks) that waits LLM_STUB_LATENCY
+    # seconds, then emits LLM_STUB_TOKENS_PER_SECOND tokens per second.
+    LLM_BACKEND = os.environ.get("LLM_BACKEND", "ollama")
+    LLM_STUB_MODELS = os.environ.get("LLM_STUB_MODELS", "deepseek-r1:1.5b").split(",")
+    LLM_STUB_LATENCY = float(os.environ.get("LLM_STUB_LATENCY", 0))
+    LLM_STUB_TOKENS_PER_SECOND = float(os.environ.get("LLM_STUB_TOKENS_PER_SECOND", 0))
+    LLM_STUB_RESPONSE_TOKENS = int(os.environ.get("LLM_STUB_RESPONSE_TOKENS", 64))
+    LLM_STUB_LOAD_LATENCY = float(os.environ.get("LLM_STUB_LOAD_LATENCY", 0))
+
+    # How long the backend keeps the model loaded after each call (an Ollama
+    # duration such as "30m", or -1 for forever), and whether the model is
+    # loaded at startup, when it reappears in the model list, and once its
+    # keep-alive has passed since it was last loaded.
+    LLM_KEEP_ALIVE = os.environ.get("LLM_KEEP_ALIVE", "30m")
+    LLM_WARMUP = os.environ.get("LLM_WARMUP", "1") == "1"
@@ -1,10 +1,24 @@
-from app import db, login_manager
+from app import app, db, login_manager
+from app.services.user_cache import UserCache
 from flask_login import UserMixin
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import Session, object_session
+
+# Snapshots of recently seen users, so most requests get current_user without a query
+user_cache = UserCache(ttl=app.config["USER_CACHE_TTL"], maxsize=app.config["USER_CACHE_SIZE"])
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+
+    def load():
+        user = User.query.get(user_id)
+        return UserSnapshot.of(user) if user is not None else None
+
+    return user_cache.get_or_load(user_id, load)
 
 
 class Reviews(db.Model):
@@ -60,7 +74,7 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(60), nullable=False)
     is_recruiter = db.Column(db.Boolean, default=False)
     ## updating the user to store the resume 2/22
-    resume_path = db.Column(db.String(255), nullable=True) 
+    resume_path = db.Column(db.String(255), nullable=True)  # StoredResume id (older rows hold a file path)
 
     # Relationships
     reviews = db.relationship("Reviews", backref="author", lazy=True)
@@ -69,6 +83,35 @@ class User(db.Model, UserMixin):
         return f"User('{self.username}', '{self.email}')"
 
 
+class UserSnapshot(UserMixin, namedtuple("UserSnapshot", ["id", "username", "email", "is_recruiter", "resume_path"])):
+    """Read-only copy of a User row, which is what current_user holds; it is never bound to a session.
+    Views that change the user load the row with User.query.get(current_user.id)."""
+
+    @classmethod
+    def of(cls, user):
+        return cls(user.id, user.username, user.email, bool(user.is_recruiter), user.resume_path)
+
+
+def _user_changed(mapper, connection, target):
+    # Dropped now for this flush, and again once the change is committed (see below)
+    user_cache.invalidate(target.id)
+    object_session(target).info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # A request that read the row between the flush and the commit may have cached the old values
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+event.listen(User, "after_update", _user_changed)
+event.listen(User, "after_delete", _user_changed)
+# Ids are reused when the table is recreated (e.g. between tests)
+event.listen(User.__table__, "after_create", lambda target, connection, **kw: user_cache.clear())
+event.listen(User.__table__, "after_drop", lambda target, connection, **kw: user_cache.clear())
+
+
 class JobApplication(db.Model):
     """Model to store information about job applications"""
 
@@ -78,7 +121,7 @@ class JobApplication(db.Model):
     last_update_on = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(50), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    resume_path = db.Column(db.String(255), nullable=True)  # Store resume file path
+    resume_path = db.Column(db.String(255), nullable=True)  # StoredResume id (older rows hold a file path)
 
 
     def __repr__(self):
@@ -160,3 +203,116 @@ class Meetings(db.Model):
 
     def __repr__(self):
         return f"<Meeting {self.id} | Time: {self.meeting_time}>"
+
+
+class ResumeJob(db.Model):
+    """Model to store background LLM resume analysis jobs so they survive a restart"""
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex handed back to the client
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)  # Submitting user, if logged in
+    task = db.Column(db.String(32), nullable=False)  # "advice", "work_experience" or "posting_summaries"
+    posting_id = db.Column(db.Integer, db.ForeignKey("recruiter_postings.postingId"), nullable=True)  # Posting a batch job covers
+    admission_key = db.Column(db.String(64), nullable=True)  # Submitter key the LLM limiter admitted the job under
+    status = db.Column(db.String(20), index=True, nullable=False, default="queued")  # queued, running, complete, failed
+    owner = db.Column(db.String(64), nullable=True)  # Worker id of the process that holds the job
+    lease_expires = db.Column(db.DateTime, index=True, nullable=True)  # Another process may claim the job after this
+    resume_text = db.Column(db.Text, nullable=False)  # Extracted resume text the task runs on
+    result = db.Column(db.Text, nullable=True)  # Model output or error message
+    created_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_on = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ResumeJob {self.id} | {self.task} | {self.status}>"
+
+
+class ResumeUpload(db.Model):
+    """Model to store the text extracted from an uploaded resume once, keyed by the file's SHA-256"""
+
+    file_hash = db.Column(db.String(64), primary_key=True)
+    text = db.Column(db.Text, nullable=False)  # Text of every page, each followed by a newline
+    created_on = db.Column(db.DateTime, index=True, nullable=False, default=datetime.utcnow)  # Pruned by the resume GC
+
+    def __repr__(self):
+        return f"<ResumeUpload {self.file_hash[:12]}>"
+
+
+class ResumeBlob(db.Model):
+    """Model to count the references to one stored resume file, keyed by the file's SHA-256"""
+
+    file_hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)  # Bytes on disk
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # StoredResume rows pointing at this file
+    created_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Last change of ref_count
+
+    def __repr__(self):
+        return f"<ResumeBlob {self.file_hash[:12]} | refs {self.ref_count}>"
+
+
+class StoredResume(db.Model):
+    """Model to store the metadata of one resume upload; its id is what resume_path columns hold"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_hash = db.Column(db.String(64), db.ForeignKey("resume_blob.file_hash"), index=True, nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)  # Uploading user
+    original_name = db.Column(db.String(255), nullable=False)  # File name as uploaded, for downloads
+    size = db.Column(db.Integer, nullable=False)
+    mime = db.Column(db.String(127), nullable=False)
+    created_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StoredResume {self.id} | {self.original_name}>"
+
+
+class ResumeText(db.Model):
+    """Model to store the normalized text of a stored resume file for search, keyed by the file's SHA-256"""
+
+    file_hash = db.Column(db.String(64), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, complete, failed
+    text = db.Column(db.Text, nullable=True)  # Unicode-normalized text with whitespace collapsed
+    text_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the normalized text
+    error = db.Column(db.String(255), nullable=True)
+    indexed_on = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ResumeText {self.file_hash[:12]} | {self.status}>"
+
+
+# SQLite full-text index over ResumeText.text, created and dropped with the table
+RESUME_TEXT_FTS = "resume_text_fts"
+event.listen(ResumeText.__table__, "after_create", DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RESUME_TEXT_FTS} USING fts5(file_hash UNINDEXED, text)"
+).execute_if(dialect="sqlite"))
+event.listen(ResumeText.__table__, "before_drop", DDL(
+    f"DROP TABLE IF EXISTS {RESUME_TEXT_FTS}"
+).execute_if(dialect="sqlite"))
+
+
+class ApplicantSummary(db.Model):
+    """Model to store the LLM summary of an applicant's resume for a recruiter posting"""
+
+    posting_id = db.Column(db.Integer, db.ForeignKey("recruiter_postings.postingId"), primary_key=True)
+    applicant_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    resume_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of the resume text that was summarized
+    status = db.Column(db.String(20), nullable=False)  # complete or failed
+    summary = db.Column(db.Text, nullable=True)  # JSON: headline, years_experience, skills, highlights
+    error = db.Column(db.String(255), nullable=True)  # Why the summary failed
+    updated_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ApplicantSummary Posting ID: {self.posting_id}, Applicant ID: {self.applicant_id} | {self.status}>"
+
+
+class LLMResult(db.Model):
+    """Model to cache LLM outputs under the SHA-256 of (resume text, prompt version, model name)"""
+
+    key = db.Column(db.String(64), primary_key=True)
+    model_name = db.Column(db.String(64), nullable=False)
+    prompt_version = db.Column(db.String(64), nullable=False)
+    result = db.Column(db.Text, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # Length of the result in bytes, for the size budget
+    created_on = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_on = db.Column(db.DateTime, index=True, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<LLMResult {self.key[:12]} | {self.prompt_version} | {self.model_name}>"
@@ -1,16 +1,39 @@
-from flask import render_template, request, send_from_directory, redirect, flash, url_for, abort, jsonify
+from flask import render_template, request, send_from_directory, redirect, flash, url_for, abort, jsonify, make_response
 from flask_login import login_user, current_user, logout_user, login_required
+from flask_socketio import join_room, emit
+from flask.cli import AppGroup
+from flask_sqlalchemy import Pagination
+from sqlalchemy.exc import IntegrityError
 from app.services.job_fetcher import fetch_job_listings
-from app import app, db, bcrypt
-from app.models import Meetings, Reviews, User, JobApplication, Recruiter_Postings, PostingApplications, JobExperience
+from app.services.review_search import ResultIdCache, normalize_review_filters, canonical_query_args, filter_hash
+from app import app, db, bcrypt, socketio, scheduler
+from app.models import Meetings, Reviews, User, JobApplication, Recruiter_Postings, PostingApplications, JobExperience, ResumeJob, ApplicantSummary, ResumeUpload, StoredResume
+from app.services.resume_analysis import (
+    MODEL_NAME, resume_advice, cached_resume_advice, extract_work_experience,
+    cached_work_experience, save_work_experience, llm_limiter, llm_backend, llm_cache,
+    summarize_resume, cached_resume_summary,
+)
+from app.services.llm_backend import keep_alive_seconds
+from app.services.llm_limiter import LLMRejected
+from app.services.metrics import metrics
+from app.services.model_registry import ModelRegistry
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+from app.services.pdf_text import PDFTextExtractor
+from app.services.blob_storage import LocalBlobStorage, StorageError, create_storage
+from app.services.resume_store import ResumeStore, UploadRejected, copy_blobs, migrate_legacy_resumes
+from app.services.resume_bundle import BundleCache, BundleEntry, bundle_key, bundles_served, stream_bundle
+from app.services.resume_gc import ResumeGC
+from app.services.resume_index import ResumeIndexer
+from app.services.resume_preview import PreviewCache, ResumePreviewer
+from app.services.resume_jobs import ResumeJobQueue, QueueFullError, job_payload, user_room, job_room, llm_user_key, job_user_key
 
 from app.forms import RegistrationForm, LoginForm, ReviewForm, JobApplicationForm, PostingForm
 from datetime import datetime
+import click
+import hashlib
 import json
-
-import ollama
-from ollama import chat
-from ollama import ChatResponse
+import pytz
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from pdfquery import PDFQuery
 import base64
@@ -20,23 +43,52 @@ from io import BytesIO
 ## additions made 2/22
 import os
 from werkzeug.utils import secure_filename
+from werkzeug.utils import send_file as werkzeug_send_file
 from flask import Flask, flash, current_app
 # added on 2/24
 from flask import send_from_directory, current_app  # NEW
 from werkzeug.utils import secure_filename  # NEW
 
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    text = ""
-    with open(pdf_path) as doc:
-        for page in doc:
-            text += page.get_text("text") + "\n"  # Extract text from each page
-    return text if text.strip() else "No text found in the PDF."
-
-
 app.config["SECRET_KEY"] = "5791628bb0b13ce0c676dfde280ba245"
 
+pdf_extractor = PDFTextExtractor(
+    max_bytes=app.config["PDF_MAX_BYTES"],
+    max_pages=app.config["PDF_MAX_PAGES"],
+    cpu_budget=app.config["PDF_CPU_BUDGET_SECONDS"],
+    parallel_threshold=app.config["PDF_PARALLEL_PAGE_THRESHOLD"],
+    workers=app.config["PDF_WORKERS"],
+    cache_size=app.config["PDF_TEXT_CACHE_SIZE"],
+    memory_limit=app.config["PDF_SANDBOX_MEMORY_MB"] * 1024 * 1024,
+    timeout=app.config["PDF_SANDBOX_TIMEOUT"],
+    max_documents=app.config["PDF_SANDBOX_MAX_DOCUMENTS"],
+    sandbox=app.config["PDF_SANDBOX"],
+)
+
+model_registry = ModelRegistry(
+    llm_backend, ttl=app.config["MODEL_REGISTRY_TTL"], warm_models=[MODEL_NAME] if app.config["LLM_WARMUP"] else [],
+    rewarm_after=keep_alive_seconds(app.config["LLM_KEEP_ALIVE"]),
+)
+scheduler.add_job(
+    model_registry.refresh, "interval", seconds=app.config["MODEL_REGISTRY_TTL"], timezone=pytz.timezone("America/New_York")
+)
+# Refresh (and so warm the model) once right away instead of on the first request
+scheduler.add_job(model_registry.refresh, "date", timezone=pytz.timezone("America/New_York"))
+# Expire cached LLM results and recount their size, including what other processes stored
+scheduler.add_job(
+    llm_cache.scheduled_evict, "interval", args=[app], seconds=app.config["LLM_CACHE_EVICT_INTERVAL"],
+    timezone=pytz.timezone("America/New_York")
+)
+
+password_hasher = PasswordHasher(
+    bcrypt, rounds=app.config["BCRYPT_LOG_ROUNDS"], max_workers=app.config["PASSWORD_HASH_WORKERS"],
+    max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+)
+
+review_search_cache = ResultIdCache(
+    ttl=app.config["REVIEW_SEARCH_CACHE_TTL"], maxsize=app.config["REVIEW_SEARCH_CACHE_SIZE"]
+)
+
 @app.route("/")
 @app.route("/home")
 def home():
@@ -55,14 +107,152 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 # Ensure the upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+resume_store = ResumeStore(create_storage(app.config), legacy_dir=app.config['UPLOAD_FOLDER'])
+# Extracts and indexes the text of every resume stored from here on
+resume_indexer = ResumeIndexer(app, resume_store, pdf_extractor, max_workers=app.config['RESUME_INDEX_WORKERS'])
+resume_previewer = ResumePreviewer(
+    app, PreviewCache(app.config['RESUME_PREVIEW_DIR'], max_bytes=app.config['RESUME_PREVIEW_MAX_BYTES']),
+    resume_store, resume_indexer,
+)
+# Finished "download all resumes" archives, reused while a posting's applicants are unchanged
+resume_bundles = BundleCache(app.config['RESUME_BUNDLE_DIR'], max_bytes=app.config['RESUME_BUNDLE_CACHE_BYTES'])
+
+resume_gc = ResumeGC(app, resume_store, grace=app.config['RESUME_GC_GRACE'],
+                     batch_size=app.config['RESUME_GC_BATCH_SIZE'], pause=app.config['RESUME_GC_BATCH_PAUSE'],
+                     upload_text_ttl=app.config['RESUME_UPLOAD_TEXT_TTL'])
+if app.config['RESUME_GC_INTERVAL']:
+    scheduler.add_job(
+        resume_gc.scheduled_run, "interval", seconds=app.config['RESUME_GC_INTERVAL'],
+        timezone=pytz.timezone("America/New_York")
+    )
+
+resumes_cli = AppGroup('resumes', help="Manage stored resume files.")
+
+
+@resumes_cli.command('migrate')
+@click.option('--from-dir', help="Local store directory to copy blobs from, when moving to another storage backend.")
+@click.option('--keep', is_flag=True, help="Keep the original files instead of deleting them.")
+def migrate_resumes_command(from_dir, keep):
+    """Move existing resume files into the configured resume storage."""
+    db.create_all()
+    click.echo(f"Moved {migrate_legacy_resumes(resume_store, keep=keep)} resumes stored by file path into the store")
+    if from_dir:
+        copied = copy_blobs(LocalBlobStorage(from_dir), resume_store, keep=keep)
+        click.echo(f"Copied {copied} blobs from {from_dir} to {app.config['RESUME_STORAGE']} storage")
+
+
+@resumes_cli.command('gc')
+@click.option('--grace', type=int, help="Seconds an unreferenced file must be old before it is deleted "
+                                        "(default RESUME_GC_GRACE).")
+def gc_resumes_command(grace):
+    """Delete stored resume files nothing references any more."""
+    db.create_all()
+    collector = ResumeGC(app, resume_store, grace=app.config['RESUME_GC_GRACE'] if grace is None else grace,
+                         batch_size=app.config['RESUME_GC_BATCH_SIZE'], pause=app.config['RESUME_GC_BATCH_PAUSE'],
+                         upload_text_ttl=app.config['RESUME_UPLOAD_TEXT_TTL'])
+    click.echo(f"Resume GC: {collector.run()}")
+
+
+app.cli.add_command(resumes_cli)
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+
+def _store_resume(file):
+    """Put an uploaded resume in the store and return its id for a resume_path column.
+
+    The upload is streamed into the store, so raises ``UploadRejected`` for a
+    file over ``RESUME_MAX_BYTES`` or whose content does not match its
+    extension, and when the storage backend fails.
+    """
+    try:
+        stored = resume_store.put_stream(file.stream, secure_filename(file.filename) or 'resume',
+                                         owner_id=current_user.id, max_bytes=app.config['RESUME_MAX_BYTES'])
+    except StorageError as e:
+        print(f'{e}')
+        raise UploadRejected("The resume could not be stored right now, please try again shortly")
+    return str(stored.id)
+
+
+def _release_resume(resume_path):
+    """Drop the reference of a resume_path value that a committed row no longer holds.
+
+    Call it only after the row pointing at the replacement is committed, so
+    no reader can find a row naming a released resume.
+    """
+    try:
+        resume_store.release(resume_path)
+    except StorageError as e:
+        print(f'{e}')  # the old reference is kept and the collector frees it later
+
+
+def _read_upload(file_storage):
+    """Bytes of an uploaded PDF, reading no more than one byte past ``PDF_MAX_BYTES``."""
+    limit = app.config['PDF_MAX_BYTES']
+    data = file_storage.stream.read(limit + 1)
+    if len(data) > limit:
+        raise UploadRejected(f"File is larger than {limit} bytes")
+    return data
+
+
+def _send_resume(resume_path, as_attachment=False):
+    """Response delivering a resume without streaming it through this worker where possible.
+
+    Resumes in an object store are a redirect to a short-lived presigned URL.
+    With ``RESUME_SENDFILE = "x-accel-redirect"`` stored resumes are handed to
+    nginx, which serves them from ``RESUME_ACCEL_PREFIX``; with
+    ``"x-sendfile"`` the proxy reads the file named in the X-Sendfile header.
+    Otherwise the file is sent with the server's zero-copy file wrapper and
+    Range support. Stored resumes carry their SHA-256 as a strong ETag and
+    must be revalidated, so a repeat download is a 304.
+    """
+    resume = resume_store.resolve(resume_path)
+    if resume is None:
+        abort(404)
+    if resume.path is None:
+        return redirect(resume_store.storage.download_url(
+            resume_store.blob_key(resume.file_hash), resume.name, resume.mime, expires=app.config['RESUME_URL_EXPIRES'],
+            as_attachment=as_attachment,
+        ))
+    mode = app.config['RESUME_SENDFILE']
+    if mode == 'x-accel-redirect' and resume.file_hash:
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = \
+            app.config['RESUME_ACCEL_PREFIX'].rstrip('/') + '/' + resume_store.blob_key(resume.file_hash)
+        response.mimetype = resume.mime
+        response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline',
+                             filename=resume.name)
+        response.set_etag(resume.file_hash)
+        response.make_conditional(request)
+    else:
+        response = werkzeug_send_file(
+            resume.path, request.environ, mimetype=resume.mime, as_attachment=as_attachment,
+            download_name=resume.name, conditional=True, etag=resume.file_hash or True,
+            use_x_sendfile=mode == 'x-sendfile', response_class=app.response_class,
+        )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _may_read_resume(owner_ids):
+    """Whether the current user may read a resume owned by ``owner_ids``.
+
+    Owners may read their own resume, and recruiters may read the resumes of
+    users who applied to one of their postings.
+    """
+    if current_user.id in owner_ids:
+        return True
+    return bool(current_user.is_recruiter and owner_ids) and PostingApplications.query.filter(
+        PostingApplications.recruiterId == current_user.id, PostingApplications.applicantId.in_(owner_ids)
+    ).first() is not None
+
 @app.route("/account", methods=['GET', 'POST'])
 @login_required
 def account():
-    user = current_user
+    # The row rather than the cached current_user, so a resume uploaded through another worker shows at once
+    user = User.query.get(current_user.id)
     print("User's resume path (from database):", user.resume_path)  # Debugging: Print the path from the database.
     
     if request.method == 'POST':
@@ -72,13 +262,15 @@ def account():
                 flash('No selected file', 'warning')
                 return redirect(request.url)
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-
+                try:
+                    resume_id = _store_resume(file)
+                except UploadRejected as e:
+                    flash(str(e), 'danger')
+                    return redirect(request.url)
                 # Update the user's resume path in the database
-                user.resume_path = filepath  # Or just filename if you prefer
+                replaced, user.resume_path = user.resume_path, resume_id
                 db.session.commit()
+                _release_resume(replaced)
                 flash('Resume uploaded successfully!', 'success')
                 return redirect(url_for('account'))
             else:
@@ -86,15 +278,19 @@ def account():
                 return redirect(request.url)
         
     resume_path = user.resume_path if user.is_authenticated else None
-    return render_template("account.html", title="Account", resume_path=resume_path)
+    resume = resume_store.resolve(resume_path)
+    return render_template("account.html", title="Account", resume_path=resume_path,
+                           resume_name=resume.name if resume else None,
+                           reviews=Reviews.query.filter_by(user_id=user.id).all())
 
 
 @app.route('/resume/<path:path>')  # Serve the resume
 @login_required
 def serve_resume(path):
-    user = current_user
-    directory = app.config['UPLOAD_FOLDER']
-    return send_from_directory(directory, path)
+    """A resume, for its owner and for recruiters the owner applied to; anyone else gets a 404."""
+    if not _may_read_resume(resume_store.owner_ids(path)):
+        abort(404)
+    return _send_resume(path)
 
 # #####################################
 # #####################################
@@ -102,15 +298,24 @@ def serve_resume(path):
 #@app.route("/register", methods=["GET"])
 #def register():
 
+def _busy(body):
+    """503 response asking the client to retry shortly, for when the password hashing pool is full."""
+    response = make_response(body, 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 @app.route("/register", methods=["POST", "GET"])
 def register():
     if current_user.is_authenticated:
         return redirect(url_for("home"))
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode(
-            "utf-8"
-        )
+        try:
+            hashed_password = password_hasher.hash(form.password.data)
+        except PasswordHasherBusy as e:
+            flash(str(e), "warning")
+            return _busy(render_template("register.html", title="Register", form=form))
         user = User(
             username=form.username.data, email=form.email.data, password=hashed_password, is_recruiter=form.signup_as_recruiter.data
         )
@@ -130,7 +335,14 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        try:
+            valid = user is not None and password_hasher.check(user.password, form.password.data)
+            if valid and password_hasher.upgrade(user, form.password.data):
+                db.session.commit()
+        except PasswordHasherBusy as e:
+            flash(str(e), "warning")
+            return _busy(render_template("login.html", title="Login", form=form))
+        if valid:
             login_user(user, remember=form.remember.data)
             next_page = request.args.get("next")
             return redirect(next_page) if next_page else redirect(url_for("home"))
@@ -171,50 +383,32 @@ def resume_parser():
     """
     LLM Integration that gives resume advice
     """
-    available_models = ollama.list()
-    print('available models', available_models)
-
-    model_name = 'deepseek-r1:1.5b'
-    model_exists = any(model.model == model_name for model in available_models['models'])
-
-    
+    model_exists = model_registry.is_ready(MODEL_NAME)
 
     if request.method == 'POST':
-        # if 'file' not in request.files:
-        #     return render_template("resume_parser.html", llmresponse = "no file added...")
-        # file = request.files['file']
-        text = ''
         if request.files:
             file_storage = request.files['file']  # Extract the FileStorage object
 
-            # Read the file content
-            file_content = file_storage.read()  # This returns the file content as bytes
-
-            # If you need to save the file
-            #file_storage.save('Resume-Srinivas_Vasudevan.pdf')
             try:
-                pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-
-                print(model_exists, len(text) > 0, text)
-            
-                if model_exists and len(text) > 0:
-                    response: ChatResponse = chat(model='deepseek-r1:1.5b', messages=[{'role': 'user','content': f'give improvement suggestions for this resume: {text}'}])
-                    print(response.message.content)
-                    return jsonify({'status': 'Task complete', 'result': response.message.content })
-                else:
-                    return jsonify({'status': 'Task Failed', 'result': 'Possibly no model' })
+                # Read the file content, refusing files the PDF extractor would reject anyway
+                file_content = _read_upload(file_storage)
+                file_hash, text = _upload_text(file_content)
             except Exception as e:
                 print(f'{e}')
                 return jsonify({'status': 'Task failed', 'result': 'Possibly wrong file type' })
+
+            if model_exists and len(text) > 0:
+                cached = cached_resume_advice(text)
+                if cached is not None:
+                    return jsonify({'status': 'Task complete', 'result': cached })
+                return _enqueue_resume_job('advice', text, file_hash=file_hash)
+            else:
+                return jsonify({'status': 'Task Failed', 'result': 'Possibly no model' })
         else:
             return jsonify({'status': 'Failed', 'result': 'No file sent' })
-    
+
     else:
         if model_exists:
-            #response: ChatResponse = chat(model='deepseek-r1:1.5b', messages=[{'role': 'user','content': 'Why is the sky blue?'}])
-            #print(response.message.content)
             return render_template("resume_parser.html", llmresponse = 'llm ready buddy..')
         else:
             return render_template("resume_parser.html", llmresponse = "model is not ready yet....")
@@ -222,105 +416,290 @@ def resume_parser():
 @app.route("/resume_parser_we", methods=['POST'])
 def resume_parser_we():
     """
-    LLM Integration that gives resume advice
+    LLM Integration that extracts work experience from a resume into the job profile
     """
-    available_models = ollama.list()
-    print('available models', available_models)
+    model_exists = model_registry.is_ready(MODEL_NAME)
+
+    if request.files:
+        # Entries are saved to the user's job profile, so an anonymous job could only fail after using the model
+        if not current_user.is_authenticated:
+            return jsonify({'status': 'Task Failed', 'result': 'Log in to extract work experience'}), 401
+        file_storage = request.files['file']  # Extract the FileStorage object
+
+        try:
+            # Read the file content, refusing files the PDF extractor would reject anyway
+            file_content = _read_upload(file_storage)
+            file_hash, text = _upload_text(file_content)
+        except Exception as e:
+            print(f'{e}')
+            return jsonify({'status': 'Task Failed', 'result': 'Possibly wrong file type'})
+
+        if model_exists and len(text) > 0:
+            cached = cached_work_experience(text)
+            if cached is not None:
+                we_text, entries = cached
+                save_work_experience(entries, current_user.username)
+                return jsonify({'status': 'Task complete', 'result': we_text })
+            return _enqueue_resume_job('work_experience', text, file_hash=file_hash)
+        else:
+            return jsonify({'status': 'Task Failed', 'result': 'Possibly no model' })
+    else:
+        return jsonify({'status': 'Failed', 'result': 'No file sent' })
 
-    model_name = 'deepseek-r1:1.5b'
-    model_exists = any(model.model == model_name for model in available_models['models'])
 
-    if request.method == 'POST':
-        # if 'file' not in request.files:
-        #     return render_template("resume_parser.html", llmresponse = "no file added...")
-        # file = request.files['file']
-        text = ''
-        if request.files:
-            file_storage = request.files['file']  # Extract the FileStorage object
+def _upload_text(file_content):
+    """SHA-256 and extracted text of an uploaded PDF.
 
+    The text is stored once per distinct file, so both resume endpoints and
+    repeated submissions of the same file reuse it instead of parsing again.
+    """
+    file_hash = hashlib.sha256(file_content).hexdigest()
+    upload = ResumeUpload.query.get(file_hash)
+    if upload is not None:
+        return file_hash, upload.text
 
-            # Read the file content
-            file_content = file_storage.read()  # This returns the file content as bytes
+    text = pdf_extractor.extract(file_content, page_separator="\n")
+    try:
+        db.session.add(ResumeUpload(file_hash=file_hash, text=text))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # a concurrent request stored the same file first
+    return file_hash, text
 
-            try:
 
-            # If you need to save the file
-            #file_storage.save('Resume-Srinivas_Vasudevan.pdf')
-
-                pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                    text+= "\n"
-
-            
-                if model_exists and len(text) > 0:
-                    response: ChatResponse = chat(model='deepseek-r1:1.5b', messages=[{'role': 'user','content': 
-                                        f'''categorize the work experience you see in the following resume into following categories: 
-                                            job_title, 
-                                            company_name,
-                                            location,
-                                            duration,
-                                            description,
-                                            skills, 
-                                            give that output in a json formatt.
-                                            This work experience should only be extracted from the experience section of the resume. Do not parse the whole resume and give incorrect results.
-                                            You should essentially return an array of json objects each holding the work experience categorized correctly based on my requirements.   
-                                            Make sure that the answer you give me just has a json so that I dont run into parsing issues in my python script.  
-                                            a sample output would be: [{{"job_title":"",
-                                            "company_name":"",
-                                            "location":"",
-                                            "duration":"",
-                                            "description":"",
-                                            "skills":""}},
-                                            {{"job_title":"",
-                                            "company_name":"",
-                                            "location":"",
-                                            "duration":"",
-                                            "description":"",
-                                            "skills":""}}]      
-                                            see how it is an array of json objects and it only uses the work experience/professional experience section and nothing else. 
-                                            , the resume is : 
-                                            : {text}'''}])
-                    print(response.message.content)
-                    print(response.message.content[response.message.content.find('['):response.message.content.rfind(']')+1])
-                    we_json = json.loads(response.message.content[response.message.content.find('['):response.message.content.rfind(']')+1])
-                    for we in we_json:
-                        print(we)
-                        job_title = we["job_title"]
-                        company_name = we["company_name"]
-                        location =we["location"]
-                        duration = we["duration"]
-                        description =we["description"]
-                        skills = ','.join(we["skills"])
-
-                        new_job = JobExperience(
-                            job_title=job_title,
-                            company_name=company_name,
-                            location=location,
-                            duration=duration,
-                            description=description,
-                            skills=skills,
-                            username=current_user.username
-                        )
-                        db.session.add(new_job)
-                        db.session.commit()
-                    return jsonify({'status': 'Task complete', 'result': response.message.content[response.message.content.find('['):response.message.content.rfind(']')+1] })
-                else:
-                    return jsonify({'status': 'Task Failed', 'result': 'Possibly no model' })
-            except Exception as e:
-                print(f'{e}')
-                return jsonify({'status': 'Task Failed', 'result': 'Possibly wrong file type'})
-        else:
-            return jsonify({'status': 'Failed', 'result': 'No file sent' })
-    
-    else:
-        if model_exists:
-            #response: ChatResponse = chat(model='deepseek-r1:1.5b', messages=[{'role': 'user','content': 'Why is the sky blue?'}])
-            #print(response.message.content)
-            return render_template("resume_parser.html", llmresponse = 'llm ready buddy..')
-        else:
-            return render_template("resume_parser.html", llmresponse = "model is not ready yet....")
-        
+def _enqueue_resume_job(task, text, posting_id=None, file_hash=None):
+    """Queue an LLM resume task and answer immediately with its job id.
+
+    Submitting a file again (a double click) while its job for the same task
+    and user is still running returns that job instead of starting another.
+    """
+    user_id = current_user.id if current_user.is_authenticated else None
+    # Anonymous submitters are admitted per client address
+    admission_key = llm_user_key(user_id) if user_id is not None else f"anonymous:{request.remote_addr}"
+    dedupe_key = (task, file_hash, user_id if user_id is not None else admission_key) if file_hash else None
+    try:
+        job = resume_jobs.submit(task, text, user_id=user_id, admission_key=admission_key, posting_id=posting_id,
+                                 dedupe_key=dedupe_key)
+    except LLMRejected as e:
+        response = jsonify({'status': 'Task Failed', 'result': str(e)})
+        response.status_code = e.status_code
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    except QueueFullError:
+        response = jsonify({'status': 'Task Failed', 'result': 'Too many resumes are being analyzed, try again shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(llm_limiter.retry_after())
+        return response
+    response = jsonify({
+        'status': 'Task queued',
+        'job_id': job.id,
+        'status_url': url_for('resume_job_status', job_id=job.id),
+    })
+    response.status_code = 202
+    return response
+
+
+@app.route("/resume_jobs/<string:job_id>", methods=['GET'])
+def resume_job_status(job_id):
+    """Status and result of a background resume analysis job."""
+    job = ResumeJob.query.get_or_404(job_id)
+    if job.user_id is not None and (not current_user.is_authenticated or current_user.id != job.user_id):
+        abort(404)
+    return jsonify(job_payload(job, partial=resume_jobs.partial_result(job.id)))
+
+
+def _run_advice_job(job, on_token):
+    if not app.config['LLM_STREAM_TOKENS']:
+        on_token = None
+    return resume_advice(job.resume_text, on_token=on_token, user_key=job_user_key(job))
+
+
+def _run_work_experience_job(job, on_token):
+    # The experience JSON is only useful once complete, so this task does not stream
+    user = User.query.get(job.user_id) if job.user_id is not None else None
+    if user is None:
+        raise ValueError("Work experience can only be saved for a logged in user")
+    we_text, entries = extract_work_experience(job.resume_text, user_key=job_user_key(job))
+    save_work_experience(entries, user.username)
+    return we_text
+
+
+def _applicant_resume_file(posting_id, applicant):
+    """The resume an applicant sent with this application, else their profile resume."""
+    application = JobApplication.query.filter_by(job_link=str(posting_id), user_id=applicant.id) \
+        .order_by(JobApplication.id.desc()).first()
+    candidates = [application.resume_path if application else None, applicant.resume_path]
+    return next((resume for resume in map(resume_store.resolve, candidates) if resume is not None), None)
+
+
+def _read_resume_text(resume):
+    """Text of a PDF or plain-text resume; raises ``ValueError`` for other formats."""
+    with resume_store.open(resume) as f:
+        data = f.read()
+    extension = resume.name.rsplit('.', 1)[-1].lower()
+    if extension == 'pdf':
+        return pdf_extractor.extract(data, page_separator="\n")
+    if extension == 'txt':
+        return data.decode('utf-8', errors='replace')
+    raise ValueError(f"Resumes of type .{extension} cannot be summarized")
+
+
+def _store_applicant_summary(posting_id, applicant_id, resume_hash, summary=None, error=None):
+    row = ApplicantSummary.query.get((posting_id, applicant_id))
+    if row is None:
+        row = ApplicantSummary(posting_id=posting_id, applicant_id=applicant_id)
+        db.session.add(row)
+    row.resume_hash = resume_hash
+    row.status = 'failed' if error else 'complete'
+    row.summary = json.dumps(summary) if summary is not None else None
+    row.error = error[:255] if error else None
+    row.updated_on = datetime.utcnow()
+    db.session.commit()
+    return row
+
+
+def summary_payload(row):
+    return {
+        'applicant_id': row.applicant_id,
+        'status': row.status,
+        'summary': json.loads(row.summary) if row.summary else None,
+        'error': row.error,
+    }
+
+
+def _run_posting_summaries_job(job, on_token):
+    """Summarize the resume of every applicant of ``job.posting_id``.
+
+    Applicants whose resume is unchanged since their stored summary are
+    skipped, and summaries already in the LLM cache are stored without a
+    model call. The remaining resumes are summarized concurrently (every call
+    still takes an LLM limiter slot) and each summary is stored and pushed to
+    the recruiter as soon as it is ready.
+    """
+    posting_id = job.posting_id
+    applicants = User.query.join(PostingApplications, PostingApplications.applicantId == User.id) \
+        .filter(PostingApplications.postingId == posting_id).all()
+    user_key = job_user_key(job)
+    progress = {'done': 0, 'total': len(applicants), 'skipped': 0, 'failed': 0}
+
+    def report(row):
+        progress['done'] += 1
+        event = dict(progress, job_id=job.id, posting_id=posting_id, **summary_payload(row))
+        socketio.emit('applicant_summary', event, to=job_room(job.id))
+        socketio.emit('applicant_summary', event, to=user_room(job.user_id))
+
+    to_summarize = []
+    for applicant in applicants:
+        resume = _applicant_resume_file(posting_id, applicant)
+        try:
+            if resume is None:
+                raise ValueError("No resume on file")
+            text = _read_resume_text(resume)
+            if not text.strip():
+                raise ValueError("No text found in the resume")
+        except Exception as e:
+            progress['failed'] += 1
+            report(_store_applicant_summary(posting_id, applicant.id, None, error=str(e)))
+            continue
+
+        resume_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        existing = ApplicantSummary.query.get((posting_id, applicant.id))
+        if existing is not None and existing.status == 'complete' and existing.resume_hash == resume_hash:
+            progress['skipped'] += 1
+            report(existing)
+            continue
+        cached = cached_resume_summary(text)
+        if cached is not None:
+            report(_store_applicant_summary(posting_id, applicant.id, resume_hash, summary=cached))
+            continue
+        to_summarize.append((applicant.id, resume_hash, text))
+
+    def summarize(text):
+        # summarize_resume reads and writes the LLM cache, so each thread needs its own app context
+        with app.app_context():
+            try:
+                return summarize_resume(text, user_key=user_key)
+            finally:
+                db.session.remove()
+
+    if to_summarize:
+        # The limiter bounds the model calls; more threads than slots would only wait
+        with ThreadPoolExecutor(max_workers=app.config['LLM_MAX_CONCURRENCY'], thread_name_prefix='summaries') as pool:
+            futures = {pool.submit(summarize, text): (applicant_id, resume_hash)
+                       for applicant_id, resume_hash, text in to_summarize}
+            for future in as_completed(futures):
+                applicant_id, resume_hash = futures[future]
+                try:
+                    row = _store_applicant_summary(posting_id, applicant_id, resume_hash, summary=future.result())
+                except Exception as e:
+                    print(f'{e}')
+                    progress['failed'] += 1
+                    row = _store_applicant_summary(posting_id, applicant_id, resume_hash, error=str(e))
+                report(row)
+
+    return (f"Summarized {progress['total'] - progress['failed']} of {progress['total']} applicants "
+            f"({progress['skipped']} unchanged, {progress['failed']} failed)")
+
+
+resume_jobs = ResumeJobQueue(
+    app,
+    tasks={
+        'advice': _run_advice_job,
+        'work_experience': _run_work_experience_job,
+        'posting_summaries': _run_posting_summaries_job,
+    },
+    max_workers=app.config['RESUME_JOB_WORKERS'],
+    max_pending=app.config['RESUME_JOB_MAX_PENDING'],
+    limiter=llm_limiter,
+    lease=app.config['RESUME_JOB_LEASE'],
+)
+# Keep this process's job leases fresh and take over jobs whose owner stopped renewing
+scheduler.add_job(
+    resume_jobs.scheduled_heartbeat, "interval", seconds=max(1, app.config['RESUME_JOB_LEASE'] // 3),
+    timezone=pytz.timezone("America/New_York")
+)
+
+
+@app.route("/healthz", methods=['GET'])
+def healthz():
+    """Readiness probe: reports whether the resume model is installed, from the cached model list."""
+    status = model_registry.status(MODEL_NAME)
+    response = jsonify(dict(status, status='ok' if status['model_ready'] else 'model unavailable'))
+    response.status_code = 200 if status['model_ready'] else 503
+    return response
+
+
+@app.route("/metrics", methods=['GET'])
+def metrics_endpoint():
+    """LLM queue depth, wait times and rejections in the Prometheus text format."""
+    response = make_response(metrics.render())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
+
+@socketio.on('connect')
+def join_user_room():
+    """Put every logged-in socket in its user's room so background jobs can push results."""
+    if current_user.is_authenticated:
+        join_room(user_room(current_user.id))
+
+
+@socketio.on('watch_resume_job')
+def watch_resume_job(data):
+    """Subscribe this socket to the token stream of a job and send what it has missed so far."""
+    job = ResumeJob.query.get((data or {}).get('job_id', ''))
+    if job is None:
+        return
+    if job.user_id is not None and (not current_user.is_authenticated or current_user.id != job.user_id):
+        return
+    join_room(job_room(job.id))
+    # Re-read after joining so a job finishing in between is not missed
+    db.session.refresh(job)
+    partial = resume_jobs.partial_result(job.id)
+    if job.status in ('complete', 'failed'):
+        emit('resume_job_update', job_payload(job))
+    elif partial is not None:
+        emit('resume_job_partial', {'job_id': job.id, 'text': partial})
 
 
 @app.route("/review/new", methods=["GET", "POST"])
@@ -338,7 +717,7 @@ def new_review():
             review=form.review.data,
             rating=form.rating.data,
             recommendation=form.recommendation.data,
-            author=current_user,
+            user_id=current_user.id,
         )
         db.session.add(review)
         db.session.commit()
@@ -442,7 +821,7 @@ def applyForJob(posting_id):
     postings = Recruiter_Postings.query.all()
     recruiter_id = request.form.get('recruiter_id')
     applicant_id = current_user.id
-    resume_filename = None
+    resume_id = None
 
     # Check if the applicant has already applied
     existing_application = PostingApplications.query.filter_by(
@@ -459,9 +838,11 @@ def applyForJob(posting_id):
     if 'resume' in request.files:
         file = request.files['resume']
         if file.filename != '' and allowed_file(file.filename):  # Validate file type
-            resume_filename = secure_filename(file.filename)
-            resume_path = os.path.join(UPLOAD_FOLDER, resume_filename)
-            file.save(resume_path)  # Save resume to 'static/resumes/'
+            try:
+                resume_id = _store_resume(file)
+            except UploadRejected as e:
+                flash(str(e), "danger")
+                return redirect(request.referrer)
         else:
             flash("Invalid resume file. Only PDF, DOC, or DOCX allowed.", "danger")
             return redirect(request.referrer)
@@ -483,7 +864,7 @@ def applyForJob(posting_id):
         last_update_on=datetime.utcnow().date(),
         status="applied",
         user_id=applicant_id,
-        resume_path=f"static/resumes/{resume_filename}" if resume_filename else None
+        resume_path=resume_id
     )
 
     db.session.add(job_application)
@@ -609,13 +990,126 @@ def get_applications(posting_id):
         if applicant:
             application_user_profiles.append(applicant)
 
+    summaries = {
+        row.applicant_id: summary_payload(row)
+        for row in ApplicantSummary.query.filter_by(posting_id=posting_id)
+    }
+
+    # Cached first-page previews; missing ones are queued and show up on a later visit
+    previews = {}
+    for applicant in application_user_profiles:
+        resume = _applicant_resume_file(posting_id, applicant)
+        if resume is not None and resume.file_hash:
+            preview = resume_previewer.preview(resume.file_hash, resume.name)
+            if preview is not None:
+                previews[applicant.id] = {'url': url_for('resume_preview', file_hash=resume.file_hash),
+                                          'snippet': preview[1]}
+
     # Pass the posting and the applicants to the template
     return render_template(
         "posting_applicants.html",
         posting=posting,
         application_user_profiles=application_user_profiles,
+        summaries=summaries,
+        previews=previews,
     )
 
+
+@app.route("/recruiter/<int:posting_id>/resumes.zip", methods=["GET"])
+@login_required
+def download_posting_resumes(posting_id):
+    """
+    ZIP archive of the resumes of every applicant of a posting, streamed as it is built.
+    The ETag names the applicant set and their files, so a repeat download of an
+    unchanged set is a 304 or is sent from the bundle cache.
+    """
+    Recruiter_Postings.query.filter_by(postingId=posting_id, recruiterId=current_user.id).first_or_404()
+    applicants = User.query.join(PostingApplications, PostingApplications.applicantId == User.id) \
+        .filter(PostingApplications.postingId == posting_id).order_by(User.username).all()
+
+    entries, names = [], set()
+    for applicant in applicants:
+        resume = _applicant_resume_file(posting_id, applicant)
+        if resume is None:
+            continue
+        name = f"{secure_filename(applicant.username) or applicant.id}-{resume.name}"
+        if name in names:  # two usernames that sanitize to the same name
+            name = f"{applicant.id}-{name}"
+        names.add(name)
+        entries.append(BundleEntry(name, resume))
+    if not entries:
+        flash('None of the applicants has uploaded a resume yet.', 'info')
+        return redirect(url_for('get_applications', posting_id=posting_id))
+
+    key = bundle_key(entries)
+    download_name = f"posting-{posting_id}-resumes.zip"
+    cached = resume_bundles.path(key)
+    if cached is not None:
+        source = 'cache'
+        response = werkzeug_send_file(
+            cached, request.environ, mimetype='application/zip', as_attachment=True, download_name=download_name,
+            conditional=True, etag=key, use_x_sendfile=app.config['RESUME_SENDFILE'] == 'x-sendfile',
+            response_class=app.response_class,
+        )
+    else:
+        source = 'stream'
+        # The generator only touches the resolved files, so it needs no request or app context
+        response = app.response_class(resume_bundles.tee(key, stream_bundle(entries, resume_store.open)),
+                                      mimetype='application/zip')
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        response.set_etag(key)
+        response.make_conditional(request)
+    bundles_served.inc(source='not_modified' if response.status_code == 304 else source)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route("/resume_preview/<file_hash>", methods=["GET"])
+@login_required
+def resume_preview(file_hash):
+    """First-page preview image of a stored resume, for its owners and recruiters they applied to.
+
+    The URL names the content, so the image is cached for
+    ``RESUME_PREVIEW_MAX_AGE`` and marked immutable.
+    """
+    owners = {owner_id for (owner_id,) in db.session.query(StoredResume.owner_id)
+              .filter(StoredResume.file_hash == file_hash, StoredResume.owner_id.isnot(None))}
+    if not _may_read_resume(owners):
+        abort(404)
+    cached = resume_previewer.cache.get(file_hash)
+    if cached is None:
+        abort(404)
+    response = send_from_directory(resume_previewer.cache.root, cached[0], max_age=app.config['RESUME_PREVIEW_MAX_AGE'])
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route("/recruiter/<int:posting_id>/summaries", methods=["GET", "POST"])
+@login_required
+def posting_summaries(posting_id):
+    """
+    GET: stored resume summaries of a posting's applicants.
+    POST: queue a batch job summarizing every applicant's resume.
+    """
+    Recruiter_Postings.query.filter_by(postingId=posting_id, recruiterId=current_user.id).first_or_404()
+
+    if request.method == 'POST':
+        if not model_registry.is_ready(MODEL_NAME):
+            return jsonify({'status': 'Task Failed', 'result': 'Possibly no model'}), 503
+        return _enqueue_resume_job('posting_summaries', '', posting_id=posting_id)
+
+    rows = ApplicantSummary.query.filter_by(posting_id=posting_id).all()
+    job = ResumeJob.query.filter_by(task='posting_summaries', posting_id=posting_id) \
+        .order_by(ResumeJob.created_on.desc()).first()
+    return jsonify({
+        'posting_id': posting_id,
+        'applicants': PostingApplications.query.filter_by(postingId=posting_id).count(),
+        'summaries': [summary_payload(row) for row in rows],
+        'job': job_payload(job) if job else None,
+    })
+
 @app.route("/applicant_profile/<string:applicant_username>", methods=["GET"])
 @login_required
 def get_applicant(applicant_username):
@@ -634,39 +1128,81 @@ def get_applicant(applicant_username):
 
 @app.route("/pageContentPost", methods=["POST", "GET"])
 def page_content_post():
-    """An API for the user to view specific reviews depending on the job title, location, and rating range with pagination."""
+    """Legacy search entry point: redirects to the canonical GET search URL so filters survive pagination."""
     page = request.args.get("page", 1, type=int)
-    per_page = 5  # Set items per page as desired
+    filters = normalize_review_filters(request.values)
+    return redirect(url_for("search_reviews", **canonical_query_args(filters, page)), code=303)
 
-    # Retrieve form data
-    search_title = request.form.get("search_title", "")
-    search_location = request.form.get("search_location", "")
-    min_rating = request.form.get("min_rating", type=int, default=1)
-    max_rating = request.form.get("max_rating", type=int, default=5)
 
-    # Initial query for reviews
-    query = Reviews.query
-
-    # Apply filters if search fields are filled
-    if search_title.strip():
-        query = query.filter(Reviews.job_title.ilike(f"%{search_title}%"))
-    if search_location.strip():
-        query = query.filter(Reviews.locations.ilike(f"%{search_location}%"))
-    if min_rating is not None and max_rating is not None:
-        query = query.filter(Reviews.rating.between(min_rating, max_rating))
+@app.route("/reviews/search", methods=["GET"])
+def search_reviews():
+    """An API for the user to view specific reviews depending on the job title, location, and rating range with pagination."""
+    page = request.args.get("page", 1, type=int)
+    per_page = 5  # Set items per page as desired
 
-    # Paginate the results
-    entries = query.paginate(page=page, per_page=per_page)
+    # Redirect equivalent searches to one canonical URL so they share browser, proxy and server caches
+    filters = normalize_review_filters(request.args)
+    canonical_args = canonical_query_args(filters, page)
+    if request.args.to_dict(flat=False) != {k: [str(v)] for k, v in canonical_args.items()}:
+        return redirect(url_for("search_reviews", **canonical_args))
+
+    key = filter_hash(filters)
+    ids = review_search_cache.get_or_compute(key, lambda: _search_review_ids(filters))
+    page_ids = ids[(page - 1) * per_page:page * per_page]
+    if page > 1 and not page_ids:
+        abort(404)
+
+    items = _load_reviews_in_order(page_ids)
+    if len(items) != len(page_ids):
+        # A cached id disappeared before the cache was invalidated; re-run the search once
+        review_search_cache.discard(key)
+        ids = review_search_cache.get_or_compute(key, lambda: _search_review_ids(filters))
+        items = _load_reviews_in_order(ids[(page - 1) * per_page:page * per_page])
+    entries = Pagination(None, page, per_page, len(ids), items)
 
     # Pass search terms back to the template to preserve state across pagination
-    return render_template(
+    response = make_response(render_template(
         "view_reviews.html",
         entries=entries,
-        search_title=search_title,
-        search_location=search_location,
-        min_rating=min_rating,
-        max_rating=max_rating,
-    )
+        search_title=filters["search_title"],
+        search_location=filters["search_location"],
+        min_rating=filters["min_rating"],
+        max_rating=filters["max_rating"],
+        search_args=canonical_query_args(filters),
+    ))
+    if current_user.is_authenticated:
+        response.headers["Cache-Control"] = "private, no-cache"
+    else:
+        response.headers["Cache-Control"] = f"public, max-age={app.config['REVIEW_SEARCH_MAX_AGE']}"
+    response.vary.add("Cookie")
+    return response
+
+
+def _search_review_ids(filters):
+    """Run the review search and return the ordered list of matching review ids."""
+    query = db.session.query(Reviews.id)
+    if filters["search_title"]:
+        query = query.filter(Reviews.job_title.ilike(f"%{filters['search_title']}%"))
+    if filters["search_location"]:
+        query = query.filter(Reviews.locations.ilike(f"%{filters['search_location']}%"))
+    query = query.filter(Reviews.rating.between(filters["min_rating"], filters["max_rating"]))
+    return [review_id for (review_id,) in query.order_by(Reviews.id).all()]
+
+
+def _load_reviews_in_order(review_ids):
+    """Fetch one page of reviews by id, preserving the order of ``review_ids``."""
+    if not review_ids:
+        return []
+    rows = {review.id: review for review in Reviews.query.filter(Reviews.id.in_(review_ids)).all()}
+    return [rows[review_id] for review_id in review_ids if review_id in rows]
+
+
+def _invalidate_review_search(mapper, connection, target):
+    review_search_cache.clear()
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    db.event.listen(Reviews, _event, _invalidate_review_search)
 
 
 # @app.route("/account", methods=['GET', 'POST'])
@@ -950,11 +1486,17 @@ def search_candidates():
         return redirect(url_for('home'))
 
     job_experiences = []
+    resume_matches = []
     if request.method == 'POST':
-        # Get search type (role or skills) and search query
+        # Get search type (role, skills or resume text) and search query
         search_type = request.form.get('search_type')
         search_query = request.form.get('search_query', '').strip()
 
+        if search_type == 'resume':
+            resume_matches = _search_resumes(search_query)
+            return render_template('search_candidates.html', job_experiences=job_experiences,
+                                   resume_matches=resume_matches, searched_resumes=True)
+
         # Base query: Fetch job experiences with related user information
         query = db.session.query(JobExperience, User).join(User).filter(User.is_recruiter == False)
 
@@ -968,23 +1510,41 @@ def search_candidates():
         # Execute query
         job_experiences = query.all()
 
-    return render_template('search_candidates.html', job_experiences=job_experiences)
+    return render_template('search_candidates.html', job_experiences=job_experiences, resume_matches=resume_matches)
+
+
+def _search_resumes(search_query):
+    """``(user, snippet)`` for each candidate with a current resume whose indexed text matches the query."""
+    matches = resume_indexer.search(search_query)
+    if not matches:
+        return []
+    snippets = dict(matches)
+    rank = {file_hash: position for position, (file_hash, _) in enumerate(matches)}
+    # StoredResume rows are the live references, so replaced resumes do not match
+    rows = db.session.query(User, StoredResume.file_hash) \
+        .join(StoredResume, StoredResume.owner_id == User.id) \
+        .filter(StoredResume.file_hash.in_(snippets), User.is_recruiter == False).all()  # noqa: E712
+    best = {}
+    for user, file_hash in rows:
+        if user.id not in best or rank[file_hash] < rank[best[user.id][1]]:
+            best[user.id] = (user, file_hash)
+    ordered = sorted(best.values(), key=lambda pair: rank[pair[1]])
+    return [(user, snippets[file_hash]) for user, file_hash in ordered]
 
 @app.route("/download_resume/<int:user_id>", methods=["GET"])
 @login_required
 def download_resume(user_id):
-    """Allow users to download their uploaded resume."""
+    """Allow users to download their uploaded resume, and recruiters the resumes of their applicants."""
     user = User.query.get_or_404(user_id)
-    
+    if not _may_read_resume({user.id}):
+        abort(403)
+
     if not user.resume_path:
         flash("Resume not found for this user.", "danger")
         return redirect(url_for("account"))
 
-    return send_from_directory(
-        directory=os.path.dirname(user.resume_path),
-        path=os.path.basename(user.resume_path),
-        as_attachment=True,
-    )
+    return _send_resume(user.resume_path, as_attachment=True)
+
 @app.route("/upload_resume", methods=["POST"])
 @login_required
 def upload_resume():
@@ -998,12 +1558,16 @@ def upload_resume():
         return redirect(url_for("account"))
 
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
-
-        current_user.resume_path = filepath
+        # The row, not the cached current_user, holds the reference being replaced
+        user = User.query.get(current_user.id)
+        try:
+            resume_id = _store_resume(file)
+        except UploadRejected as e:
+            flash(str(e), "danger")
+            return redirect(url_for("account"))
+        replaced, user.resume_path = user.resume_path, resume_id
         db.session.commit()
+        _release_resume(replaced)
 
         flash("Resume uploaded successfully!", "success")
         return redirect(url_for("account"))
@@ -1029,7 +1593,7 @@ def profile():
         flash("Invalid characters in username", "danger")
         return render_template("profile.html"), 400  
 
-    current_user.username = username
+    User.query.get(current_user.id).username = username
     db.session.commit()
 
     flash("Profile updated successfully!", "success")
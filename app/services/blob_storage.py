@@ -0,0 +1,265 @@
+# app/services/blob_storage.py
+"""Pluggable byte storage behind the resume store.
+
+``RESUME_STORAGE`` selects the implementation: ``local`` keeps blobs in a
+sharded directory tree on this host, ``s3`` keeps them in a bucket of any
+S3-API-compatible object store (AWS S3, MinIO, Ceph, ...), so several app
+hosts can share one set of resumes. Reads and writes stream in chunks, and
+the S3 backend hands out presigned URLs so downloads go straight to the
+object store instead of through the app.
+
+The S3 backend speaks the REST API with Signature Version 4 over
+``requests`` rather than depending on an SDK.
+"""
+
+import datetime
+import hashlib
+import hmac
+import os
+import shutil
+from abc import ABC, abstractmethod
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+import requests
+
+# Bytes per chunk when streaming a blob
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StorageError(Exception):
+    """Raised when the storage backend cannot be reached or answers with an unexpected error."""
+
+
+class BlobStorage(ABC):
+    """Interface every storage backend implements; keys are ``/``-separated relative paths."""
+
+    @abstractmethod
+    def put_file(self, key, path):
+        """Store the local file at ``path`` under ``key``; the file is consumed (moved or deleted)."""
+
+    @abstractmethod
+    def open(self, key):
+        """Return a binary file object streaming the blob; raises ``FileNotFoundError`` if missing."""
+
+    @abstractmethod
+    def exists(self, key):
+        """Whether a blob is stored under ``key``."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Delete a blob; deleting a missing blob is not an error."""
+
+    @abstractmethod
+    def iter_keys(self):
+        """Yield ``(key, size, modified)`` for every stored blob; ``modified`` is a Unix timestamp."""
+
+    def local_path(self, key):
+        """Path of the blob on this host, or ``None`` if the backend is remote."""
+        return None
+
+    def staging_dir(self):
+        """Directory uploads are written to before ``put_file``, or ``None`` for the system temp dir."""
+        return None
+
+    def download_url(self, key, filename, mime, expires=300, as_attachment=True):
+        """A URL the browser can download (or, without ``as_attachment``, display) the blob from, or ``None``."""
+        return None
+
+
+class LocalBlobStorage(BlobStorage):
+    """Blobs as files under ``root``; uploads are staged in ``root/tmp``."""
+
+    STAGING = "tmp"
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def local_path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def staging_dir(self):
+        # Inside the root so moving a staged upload into place is an atomic rename
+        return os.path.join(self.root, self.STAGING)
+
+    def put_file(self, key, path):
+        target = self.local_path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(path, target)  # atomic, so readers never see a partial blob
+        except OSError:
+            shutil.move(path, target)  # the file is on another filesystem
+
+    def open(self, key):
+        return open(self.local_path(key), "rb")
+
+    def exists(self, key):
+        return os.path.isfile(self.local_path(key))
+
+    def delete(self, key):
+        try:
+            os.unlink(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def iter_keys(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root and self.STAGING in dirnames:
+                dirnames.remove(self.STAGING)
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                stat = os.stat(path)
+                yield key, stat.st_size, stat.st_mtime
+
+
+def _sign(key, message):
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _uri_encode(value, safe="-_.~"):
+    return quote(value, safe=safe)
+
+
+class S3BlobStorage(BlobStorage):
+    """Blobs as objects in an S3-compatible bucket, addressed path-style (``endpoint/bucket/key``)."""
+
+    def __init__(self, endpoint_url, bucket, access_key, secret_key, region="us-east-1", prefix="", timeout=30):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.timeout = timeout
+        self.host = self.endpoint_url.split("://", 1)[-1].split("/", 1)[0]
+        self._session = requests.Session()
+
+    def _path(self, key=""):
+        return f"/{self.bucket}/" + _uri_encode(self.prefix + key, safe="-_.~/") if key else f"/{self.bucket}"
+
+    def _signing_key(self, date):
+        key = _sign(("AWS4" + self.secret_key).encode("utf-8"), date)
+        for part in (self.region, "s3", "aws4_request"):
+            key = _sign(key, part)
+        return key
+
+    def _signature(self, method, path, query, headers, payload_hash, now):
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{now:%Y%m%d}/{self.region}/s3/aws4_request"
+        canonical_query = "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(query.items()))
+        signed_headers = ";".join(sorted(headers))
+        canonical_headers = "".join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers))
+        canonical_request = "\n".join([method, path, canonical_query, canonical_headers, signed_headers, payload_hash])
+        string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope,
+                                    hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()])
+        signature = hmac.new(self._signing_key(f"{now:%Y%m%d}"), string_to_sign.encode("utf-8"), hashlib.sha256)
+        return scope, signed_headers, signature.hexdigest()
+
+    def _request(self, method, key="", query=None, data=None, extra_headers=None, stream=False):
+        query = query or {}
+        now = datetime.datetime.utcnow()
+        # The body is streamed, so it is not hashed up front
+        headers = {"host": self.host, "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+                   "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ")}
+        headers.update({name.lower(): value for name, value in (extra_headers or {}).items()})
+        path = self._path(key)
+        scope, signed_headers, signature = self._signature(method, path, query, headers, "UNSIGNED-PAYLOAD", now)
+        headers["authorization"] = (f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+                                    f"SignedHeaders={signed_headers}, Signature={signature}")
+        canonical_query = "&".join(f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(query.items()))
+        url = self.endpoint_url + path + ("?" + canonical_query if canonical_query else "")
+        try:
+            return self._session.request(method, url, data=data, headers=headers, stream=stream, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise StorageError(f"{method} {path} failed: {e}") from e
+
+    @staticmethod
+    def _check(response, key=""):
+        """Raise ``StorageError`` unless ``response`` is a success."""
+        if not response.ok:
+            response.close()
+            raise StorageError(f"{response.request.method} {key or '/'} failed with HTTP {response.status_code}")
+
+    def put_file(self, key, path):
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            response = self._request("PUT", key, data=f, extra_headers={"content-length": str(size)})
+        self._check(response, key)
+        os.unlink(path)
+
+    def open(self, key):
+        response = self._request("GET", key, stream=True)
+        if response.status_code == 404:
+            response.close()
+            raise FileNotFoundError(key)
+        self._check(response, key)
+        response.raw.decode_content = True
+        return response.raw
+
+    def exists(self, key):
+        response = self._request("HEAD", key)
+        if response.status_code == 404:
+            return False
+        self._check(response, key)
+        return True
+
+    def delete(self, key):
+        response = self._request("DELETE", key)
+        if response.status_code != 404:
+            self._check(response, key)
+
+    def iter_keys(self):
+        token = None
+        while True:
+            query = {"list-type": "2", "prefix": self.prefix}
+            if token:
+                query["continuation-token"] = token
+            response = self._request("GET", query=query)
+            self._check(response)
+            root = ElementTree.fromstring(response.content)
+            namespace = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+            for item in root.iter(f"{namespace}Contents"):
+                key = item.find(f"{namespace}Key").text
+                modified = datetime.datetime.fromisoformat(item.findtext(f"{namespace}LastModified").replace("Z", "+00:00"))
+                yield key[len(self.prefix):], int(item.find(f"{namespace}Size").text), modified.timestamp()
+            token = root.findtext(f"{namespace}NextContinuationToken")
+            if root.findtext(f"{namespace}IsTruncated") != "true" or not token:
+                return
+
+    def download_url(self, key, filename, mime, expires=300, as_attachment=True):
+        """Presigned GET URL that also sets the download's file name, type and disposition."""
+        now = datetime.datetime.utcnow()
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{now:%Y%m%d}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "X-Amz-Expires": str(expires),
+            "X-Amz-SignedHeaders": "host",
+            "response-content-disposition":
+                f"{'attachment' if as_attachment else 'inline'}; filename*=UTF-8''{_uri_encode(filename)}",
+            "response-content-type": mime,
+        }
+        path = self._path(key)
+        _, _, signature = self._signature("GET", path, query, {"host": self.host}, "UNSIGNED-PAYLOAD", now)
+        query["X-Amz-Signature"] = signature
+        return self.endpoint_url + path + "?" + "&".join(f"{_uri_encode(k)}={_uri_encode(v)}"
+                                                          for k, v in sorted(query.items()))
+
+
+def create_storage(config):
+    """Build the storage backend named by ``config["RESUME_STORAGE"]``."""
+    name = config["RESUME_STORAGE"]
+    if name == "local":
+        return LocalBlobStorage(config["RESUME_STORE_DIR"])
+    if name == "s3":
+        return S3BlobStorage(
+            config["RESUME_S3_ENDPOINT"],
+            config["RESUME_S3_BUCKET"],
+            config["RESUME_S3_ACCESS_KEY"],
+            config["RESUME_S3_SECRET_KEY"],
+            region=config["RESUME_S3_REGION"],
+            prefix=config["RESUME_S3_PREFIX"],
+        )
+    raise ValueError(f"Unknown resume storage {name!r}")
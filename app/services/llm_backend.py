@@ -0,0 +1,223 @@
+# app/services/llm_backend.py
+"""Pluggable LLM backends used by the resume analysis tasks and the model registry.
+
+``LLM_BACKEND`` selects the implementation: ``ollama`` talks to the local
+daemon, ``stub`` answers deterministically without a model, at a configurable
+latency and token rate, so the resume pipeline can be load-tested and
+benchmarked on a CPU-only box.
+
+Every call asks the backend to keep the model loaded for ``keep_alive``, and
+``warm_up()`` loads a model ahead of the first request. The time spent
+loading a model and the time spent generating are recorded as separate
+metrics.
+"""
+
+import hashlib
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+
+import ollama
+
+from app.services.metrics import metrics
+
+load_seconds = metrics.summary("llm_model_load_seconds", "Time the LLM backend spent loading a model into memory")
+generation_seconds = metrics.summary("llm_generation_seconds", "Time the LLM backend spent evaluating prompts and generating")
+warmups = metrics.counter("llm_warmups_total", "Model warm-up requests sent to the LLM backend")
+
+
+def observe_timings(model, load=None, generation=None):
+    """Record the load and generation seconds a backend reported for one call."""
+    if load is not None:
+        load_seconds.observe(load, model=model)
+    if generation is not None:
+        generation_seconds.observe(generation, model=model)
+
+
+class LLMBackend(ABC):
+    """Interface every backend implements.
+
+    ``cache_namespace`` keeps the cached results of different backends apart.
+    """
+
+    cache_namespace = None
+
+    @abstractmethod
+    def generate(self, model, prompt):
+        """Return the full completion of ``prompt``."""
+
+    @abstractmethod
+    def stream(self, model, prompt):
+        """Yield the completion of ``prompt`` token by token."""
+
+    @abstractmethod
+    def list_models(self):
+        """Return the names of the installed models."""
+
+    @abstractmethod
+    def warm_up(self, model):
+        """Load ``model`` so the next call does not pay for it; returns the load seconds."""
+
+
+def _seconds(nanoseconds):
+    return nanoseconds / 1e9 if nanoseconds is not None else None
+
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def keep_alive_seconds(keep_alive):
+    """Seconds an Ollama ``keep_alive`` value ("30m", "1h30m", 600) keeps a model loaded, ``None`` for forever."""
+    if isinstance(keep_alive, (int, float)) or keep_alive.lstrip("-").isdigit():
+        seconds = float(keep_alive)
+        return seconds if seconds >= 0 else None
+    keep_alive = keep_alive.strip()
+    if keep_alive.startswith("-"):
+        return None
+    parts = _DURATION_PART_RE.findall(keep_alive)
+    if not parts or "".join(number + unit for number, unit in parts) != keep_alive:
+        raise ValueError(f"Invalid keep_alive duration {keep_alive!r}")
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class OllamaBackend(LLMBackend):
+    # ollama is used through its module attributes so tests can patch ollama.chat and ollama.list
+
+    cache_namespace = "ollama"
+
+    def __init__(self, keep_alive="30m"):
+        # Ollama takes a duration string ("30m") or a number of seconds (-1 keeps the model loaded forever)
+        is_number = isinstance(keep_alive, str) and keep_alive.lstrip("-").isdigit()
+        self.keep_alive = int(keep_alive) if is_number else keep_alive
+
+    def _observe(self, model, response):
+        # Ollama reports durations in nanoseconds on the final response of a call
+        load = _seconds(getattr(response, "load_duration", None))
+        prompt_eval = getattr(response, "prompt_eval_duration", None)
+        evaluation = getattr(response, "eval_duration", None)
+        generation = None
+        if prompt_eval is not None or evaluation is not None:
+            generation = _seconds((prompt_eval or 0) + (evaluation or 0))
+        observe_timings(model, load, generation)
+
+    def generate(self, model, prompt):
+        response = ollama.chat(model=model, messages=[{"role": "user", "content": prompt}], keep_alive=self.keep_alive)
+        self._observe(model, response)
+        return response.message.content
+
+    def stream(self, model, prompt):
+        for chunk in ollama.chat(model=model, messages=[{"role": "user", "content": prompt}], stream=True,
+                                 keep_alive=self.keep_alive):
+            token = chunk.message.content
+            if token:
+                yield token
+            if getattr(chunk, "done", False):
+                self._observe(model, chunk)
+
+    def list_models(self):
+        return [model.model for model in ollama.list()['models']]
+
+    def warm_up(self, model):
+        # A generate request without a prompt only loads the model
+        warmups.inc(model=model)
+        response = ollama.generate(model=model, keep_alive=self.keep_alive)
+        load = _seconds(getattr(response, "load_duration", None))
+        observe_timings(model, load=load)
+        return load or 0.0
+
+
+# Words the stub's suggestions are built from
+STUB_VOCABULARY = (
+    "quantify", "your", "impact", "with", "metrics", "and", "lead", "each", "bullet", "using",
+    "strong", "action", "verbs", "tailor", "skills", "to", "the", "role", "keep", "it",
+    "concise", "highlight", "projects", "results", "ownership", "tools", "team", "scope",
+)
+
+
+class StubBackend(LLMBackend):
+    """Deterministic offline backend.
+
+    The same prompt always produces the same answer: a JSON array with one
+    experience entry when the prompt asks for JSON, otherwise
+    ``response_tokens`` words of advice. Each answer waits ``latency``
+    seconds before its first token, then emits ``tokens_per_second`` tokens
+    per second (0 means no delay). A model that has not been used for
+    ``keep_alive`` seconds first takes ``load_latency`` seconds to "load".
+    """
+
+    cache_namespace = "stub"
+
+    def __init__(self, models=("deepseek-r1:1.5b",), latency=0.0, tokens_per_second=0.0, response_tokens=64,
+                 load_latency=0.0, keep_alive=1800):
+        self.models = tuple(models)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.load_latency = load_latency
+        self.keep_alive = keep_alive
+        self._loaded_until = {}  # model -> time.monotonic() it stays loaded until
+
+    def _load(self, model):
+        if model not in self.models:
+            raise ValueError(f"model '{model}' not found")
+        now = time.monotonic()
+        load = 0.0
+        if self._loaded_until.get(model, 0) < now:
+            load = self.load_latency
+            if load:
+                time.sleep(load)
+        self._loaded_until[model] = time.monotonic() + self.keep_alive
+        return load
+
+    def _tokens(self, prompt):
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        if "json" in prompt.lower():
+            suffix = digest.hex()[:6]
+            entry = {"job_title": f"Engineer {suffix}", "company_name": f"Company {suffix}", "location": "Raleigh",
+                     "duration": "1 year", "description": "Built and maintained services", "skills": "Python,SQL"}
+            return re.findall(r"\S+\s*", json.dumps([entry]))
+        return [
+            STUB_VOCABULARY[(digest[i % len(digest)] + i) % len(STUB_VOCABULARY)] + ("" if i == self.response_tokens - 1 else " ")
+            for i in range(self.response_tokens)
+        ]
+
+    def stream(self, model, prompt):
+        load = self._load(model)
+        started = time.monotonic()
+        if self.latency:
+            time.sleep(self.latency)
+        for token in self._tokens(prompt):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            yield token
+        observe_timings(model, load, time.monotonic() - started)
+
+    def generate(self, model, prompt):
+        return "".join(self.stream(model, prompt))
+
+    def list_models(self):
+        return list(self.models)
+
+    def warm_up(self, model):
+        warmups.inc(model=model)
+        load = self._load(model)
+        observe_timings(model, load=load)
+        return load
+
+
+def create_backend(config):
+    """Build the backend named by ``config["LLM_BACKEND"]``."""
+    name = config["LLM_BACKEND"]
+    if name == "ollama":
+        return OllamaBackend(keep_alive=config["LLM_KEEP_ALIVE"])
+    if name == "stub":
+        return StubBackend(
+            models=config["LLM_STUB_MODELS"],
+            latency=config["LLM_STUB_LATENCY"],
+            tokens_per_second=config["LLM_STUB_TOKENS_PER_SECOND"],
+            response_tokens=config["LLM_STUB_RESPONSE_TOKENS"],
+            load_latency=config["LLM_STUB_LOAD_LATENCY"],
+        )
+    raise ValueError(f"Unknown LLM backend {name!r}")
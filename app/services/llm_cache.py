@@ -0,0 +1,186 @@
+# app/services/llm_cache.py
+"""Content-addressed cache for LLM outputs.
+
+Results are keyed by the SHA-256 of (input text, prompt template version,
+backend, model name), so re-uploading the same resume is answered without a new
+generation and bumping a prompt version invalidates everything produced by
+the old prompt. The backend is part of the key so answers of the offline
+stub are never served once the real model is configured. Entries live in the ``LLMResult`` table with a small
+in-process LRU in front of it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, func
+
+from app import db
+from app.models import LLMResult
+
+
+def cache_key(text, prompt_version, model_name, backend="ollama"):
+    """SHA-256 hex digest identifying one (text, prompt version, backend, model) combination."""
+    payload = json.dumps([prompt_version, backend, model_name, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResultCache:
+    """DB-backed result store with an in-memory LRU front.
+
+    ``max_bytes`` bounds the total size of stored results and ``max_age``
+    (a ``timedelta``) how long an entry is kept after it was created; both are
+    enforced by ``evict()``, which the app runs on a schedule. In between,
+    ``put`` keeps a running total of the stored bytes and drops least recently
+    used rows as soon as it goes over ``max_bytes``.
+
+    Hits answered from memory still count as uses for the DB's LRU order:
+    they are written to ``last_used_on`` in batches, once ``touch_batch`` hits
+    are pending or ``touch_interval`` seconds have passed, and before rows are
+    evicted.
+    """
+
+    def __init__(self, memory_size=128, max_bytes=50 * 1024 * 1024, max_age=timedelta(days=30),
+                 touch_batch=32, touch_interval=60):
+        self.memory_size = memory_size
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+        self._memory = OrderedDict()
+        self._touched = {}  # key -> time of its latest memory hit not yet written to last_used_on
+        self._touches_flushed_at = time.monotonic()
+        self._total = None  # stored bytes as of the last count plus what this process put since
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached result for ``key`` or ``None``."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                result, created_on = entry
+                if datetime.utcnow() - created_on <= self.max_age:
+                    self._memory.move_to_end(key)
+                    self._touched[key] = datetime.utcnow()
+                    flush = (len(self._touched) >= self.touch_batch
+                             or time.monotonic() - self._touches_flushed_at >= self.touch_interval)
+                else:
+                    del self._memory[key]
+                    entry = None
+        if entry is not None:
+            if flush:
+                self.flush_touches()
+            return result
+
+        row = LLMResult.query.get(key)
+        if row is None:
+            return None
+        if datetime.utcnow() - row.created_on > self.max_age:
+            db.session.delete(row)
+            db.session.commit()
+            return None
+        row.last_used_on = datetime.utcnow()
+        db.session.commit()
+        self._remember(key, row.result, row.created_on)
+        return row.result
+
+    def put(self, key, result, prompt_version, model_name):
+        """Store a result and evict least recently used rows if the running total is over budget."""
+        now = datetime.utcnow()
+        row = LLMResult.query.get(key) or LLMResult(key=key)
+        replaced = row.size or 0
+        row.model_name = model_name
+        row.prompt_version = prompt_version
+        row.result = result
+        row.size = len(result.encode("utf-8"))
+        row.created_on = now
+        row.last_used_on = now
+        size = row.size
+        db.session.add(row)
+        db.session.commit()
+        self._remember(key, result, now)
+        with self._lock:
+            counted = self._total is not None
+            if counted:
+                self._total += size - replaced
+        if not counted:
+            self._count()
+        if self._total > self.max_bytes:
+            self._evict_least_recently_used()
+
+    def evict(self):
+        """Drop expired entries, recount the stored bytes, then drop least recently used ones until under ``max_bytes``.
+
+        The recount also picks up what other processes stored since the last one.
+        """
+        cutoff = datetime.utcnow() - self.max_age
+        LLMResult.query.filter(LLMResult.created_on < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        self._count()
+        if self._total > self.max_bytes:
+            self._evict_least_recently_used()
+
+    def scheduled_evict(self, app):
+        """``evict()`` for the background scheduler: in its own app context, never raising."""
+        with app.app_context():
+            try:
+                self.evict()
+            except Exception as e:
+                print(f'{e}')
+            finally:
+                db.session.remove()
+
+    def flush_touches(self):
+        """Write the pending memory hits to ``last_used_on`` in one transaction."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touches_flushed_at = time.monotonic()
+        if not touched:
+            return
+        table = LLMResult.__table__
+        db.session.execute(
+            table.update().where(table.c.key == bindparam("touched_key")).values(last_used_on=bindparam("used_on")),
+            [{"touched_key": key, "used_on": used_on} for key, used_on in touched.items()],
+        )
+        db.session.commit()
+
+    def _count(self):
+        total = db.session.query(func.coalesce(func.sum(LLMResult.size), 0)).scalar()
+        with self._lock:
+            self._total = total
+
+    def _evict_least_recently_used(self, batch_size=100):
+        self.flush_touches()
+        evicted, freed = [], 0
+        while self._total - freed > self.max_bytes:
+            batch = db.session.query(LLMResult.key, LLMResult.size).order_by(LLMResult.last_used_on) \
+                .offset(len(evicted)).limit(batch_size).all()
+            if not batch:
+                break
+            for key, size in batch:
+                if self._total - freed <= self.max_bytes:
+                    break
+                evicted.append(key)
+                freed += size
+        LLMResult.query.filter(LLMResult.key.in_(evicted)).delete(synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            self._total -= freed
+            for key in evicted:
+                self._memory.pop(key, None)
+                self._touched.pop(key, None)
+
+    def clear(self):
+        """Forget the in-memory entries (the DB rows are left alone)."""
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key, result, created_on):
+        with self._lock:
+            self._memory[key] = (result, created_on)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
@@ -0,0 +1,138 @@
+# app/services/llm_limiter.py
+"""Admission control and a fair concurrency limit for calls to the local LLM.
+
+Two layers protect the single Ollama instance:
+
+* ``admit()`` runs when a request asks for LLM work. It bounds how much work
+  may be outstanding in total (running plus waiting) and per user, and
+  rejects immediately with a status code and Retry-After instead of letting
+  every request slow down together.
+* ``slot()`` wraps each model call. At most ``max_concurrency`` calls run at
+  once; waiting calls are granted slots in start-time fair order, so a user
+  with many queued calls only gets every n-th slot while others wait.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from app.services.metrics import metrics
+
+queue_depth = metrics.gauge("llm_queue_depth", "LLM calls waiting for a concurrency slot")
+active_calls = metrics.gauge("llm_active_calls", "LLM calls currently running")
+admitted_requests = metrics.gauge("llm_admitted_requests", "Admitted LLM requests not yet finished")
+wait_seconds = metrics.summary("llm_wait_seconds", "Time LLM calls waited for a concurrency slot")
+call_seconds = metrics.summary("llm_call_seconds", "Time LLM calls held a concurrency slot")
+rejections = metrics.counter("llm_rejections_total", "LLM requests rejected by admission control")
+
+
+class LLMRejected(Exception):
+    """Raised by ``admit()`` when a request cannot be queued."""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Admission:
+    """An admitted request; ``release()`` once its LLM work is done."""
+
+    def __init__(self, limiter, user_key):
+        self.limiter = limiter
+        self.user_key = user_key
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.limiter._release_admission(self.user_key)
+
+
+class LLMLimiter:
+    def __init__(self, max_concurrency=1, max_waiting=16, max_per_user=2, default_retry_after=30):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.max_per_user = max_per_user
+        self.default_retry_after = default_retry_after
+        self._cond = threading.Condition()
+        self._admitted = {}  # user key -> admitted requests
+        self._admitted_total = 0
+        self._active = 0
+        self._waiting = []  # heap of (virtual start, sequence, ticket)
+        self._virtual_time = 0
+        self._user_finish = {}  # user key -> virtual time their next call starts at
+        self._sequence = itertools.count()
+        self._calls = 0
+        self._call_time = 0.0
+
+    def admit(self, user_key, force=False):
+        """Reserve room for one request; raises ``LLMRejected`` (429 or 503) when there is none."""
+        with self._cond:
+            if not force:
+                if self._admitted.get(user_key, 0) >= self.max_per_user:
+                    rejections.inc(reason="per_user")
+                    raise LLMRejected("You already have resumes being analyzed, try again shortly",
+                                      429, self.retry_after())
+                if self._admitted_total >= self.max_concurrency + self.max_waiting:
+                    rejections.inc(reason="queue_full")
+                    raise LLMRejected("Too many resumes are being analyzed, try again shortly",
+                                      503, self.retry_after())
+            self._admitted[user_key] = self._admitted.get(user_key, 0) + 1
+            self._admitted_total += 1
+            admitted_requests.set(self._admitted_total)
+        return Admission(self, user_key)
+
+    def _release_admission(self, user_key):
+        with self._cond:
+            remaining = self._admitted.get(user_key, 0) - 1
+            if remaining > 0:
+                self._admitted[user_key] = remaining
+            else:
+                self._admitted.pop(user_key, None)
+            self._admitted_total -= 1
+            admitted_requests.set(self._admitted_total)
+
+    @contextmanager
+    def slot(self, user_key):
+        """Hold one of the ``max_concurrency`` LLM slots for the duration of the block."""
+        ticket = object()
+        enqueued = time.monotonic()
+        with self._cond:
+            start = max(self._virtual_time, self._user_finish.get(user_key, 0))
+            self._user_finish[user_key] = start + 1
+            heapq.heappush(self._waiting, (start, next(self._sequence), ticket))
+            queue_depth.set(len(self._waiting))
+            while self._active >= self.max_concurrency or self._waiting[0][2] is not ticket:
+                self._cond.wait()
+            start, _, _ = heapq.heappop(self._waiting)
+            self._virtual_time = start
+            self._active += 1
+            queue_depth.set(len(self._waiting))
+            active_calls.set(self._active)
+        acquired = time.monotonic()
+        wait_seconds.observe(acquired - enqueued)
+        try:
+            yield
+        finally:
+            held = time.monotonic() - acquired
+            call_seconds.observe(held)
+            with self._cond:
+                self._calls += 1
+                self._call_time += held
+                self._active -= 1
+                if not self._waiting and self._active == 0:
+                    self._user_finish.clear()
+                active_calls.set(self._active)
+                self._cond.notify_all()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, estimated from the average call time."""
+        if not self._calls:
+            return self.default_retry_after
+        mean = self._call_time / self._calls
+        backlog = self._admitted_total / max(self.max_concurrency, 1)
+        return max(1, math.ceil(mean * backlog))
@@ -0,0 +1,139 @@
+# app/services/model_registry.py
+"""TTL cache of the models the LLM backend has installed."""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class ModelRegistry:
+    """Caches ``backend.list_models()`` so readiness checks don't hit the daemon on every request.
+
+    The first lookup fetches synchronously; after that, lookups always answer
+    from the cache and a stale cache is refreshed on a background thread. A
+    failed refresh keeps the last known model list and records the error, but
+    once the last successful listing is older than ``ttl`` and the backend
+    still cannot be reached, no model is reported ready.
+
+    A refresh also warms each installed model in ``warm_models`` on a
+    background thread, so it is loaded before the first user request: once
+    when it appears in the listing (including after the backend could not be
+    reached), and again once ``rewarm_after`` seconds (the backend's keep-alive;
+    ``None`` keeps models loaded for good) have passed since its last warm-up.
+    Other refreshes send nothing to the model.
+    """
+
+    def __init__(self, backend, ttl=30, warm_models=(), rewarm_after=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.warm_models = tuple(warm_models)
+        self.rewarm_after = timedelta(seconds=rewarm_after) if rewarm_after is not None else None
+        self._warming = set()
+        self._warmed_on = {}  # model -> wall-clock time of its last successful warm-up
+        self._models = frozenset()
+        self._fetched_at = None  # time.monotonic() of the last refresh attempt
+        self._listed_at = None  # time.monotonic() of the last successful refresh
+        self._checked_on = None  # wall-clock time of the last refresh attempt, for /healthz
+        self._error = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetch the installed models from the backend now."""
+        try:
+            models = frozenset(self.backend.list_models())
+            error = None
+        except Exception as e:
+            print(f'Could not list LLM models: {e}')
+            models = None
+            error = str(e)
+
+        with self._lock:
+            # Models the backend did not list on the last attempt may have been (re)loaded since
+            listed_before = self._models if self._error is None else frozenset()
+            if models is not None:
+                self._models = models
+                self._listed_at = time.monotonic()
+            self._error = error
+            self._fetched_at = time.monotonic()
+            self._checked_on = datetime.utcnow()
+            self._refreshing = False
+            to_warm = [model for model in self.warm_models
+                       if models is not None and model in models and model not in self._warming
+                       and self._needs_warm_up(model, listed_before)]
+            self._warming.update(to_warm)
+
+        for model in to_warm:
+            threading.Thread(target=self._warm_up, args=(model,), name="model-warm-up", daemon=True).start()
+
+    def _needs_warm_up(self, model, listed_before):
+        # Called with the lock held
+        warmed_on = self._warmed_on.get(model)
+        if model not in listed_before or warmed_on is None:
+            return True
+        return self.rewarm_after is not None and datetime.utcnow() - warmed_on >= self.rewarm_after
+
+    def clear(self):
+        """Forget the cached model list; the next lookup fetches it again."""
+        with self._lock:
+            self._models = frozenset()
+            self._fetched_at = None
+            self._listed_at = None
+            self._checked_on = None
+            self._error = None
+
+    def _warm_up(self, model):
+        try:
+            load = self.backend.warm_up(model)
+            print(f'Warmed up {model} (loaded in {load:.2f}s)')
+            warmed_on = datetime.utcnow()
+        except Exception as e:
+            print(f'Could not warm up {model}: {e}')
+            warmed_on = None
+        with self._lock:
+            self._warming.discard(model)
+            if warmed_on is not None:
+                self._warmed_on[model] = warmed_on
+
+    def available_models(self):
+        """Return the cached set of installed model names."""
+        with self._lock:
+            never_fetched = self._fetched_at is None
+            stale = not never_fetched and time.monotonic() - self._fetched_at > self.ttl
+            start_refresh = stale and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+
+        if never_fetched:
+            self.refresh()
+        elif start_refresh:
+            threading.Thread(target=self.refresh, name="model-registry-refresh", daemon=True).start()
+
+        with self._lock:
+            return self._models
+
+    def _is_stale(self):
+        # Called with the lock held
+        if self._error is None:
+            return False
+        return self._listed_at is None or time.monotonic() - self._listed_at > self.ttl
+
+    def is_ready(self, model_name):
+        """Cheap check whether ``model_name`` is installed, answered from the cache."""
+        models = self.available_models()
+        with self._lock:
+            return not self._is_stale() and model_name in models
+
+    def status(self, model_name):
+        """Readiness summary used by the health probe."""
+        ready = self.is_ready(model_name)
+        with self._lock:
+            return {
+                'model': model_name,
+                'model_ready': ready,
+                'stale': self._is_stale(),
+                'models': sorted(self._models),
+                'checked_on': self._checked_on.isoformat() if self._checked_on else None,
+                'warmed_on': self._warmed_on[model_name].isoformat() if model_name in self._warmed_on else None,
+                'error': self._error,
+            }
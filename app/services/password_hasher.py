@@ -0,0 +1,101 @@
+# app/services/password_hasher.py
+"""bcrypt password hashing on a bounded pool of worker threads.
+
+bcrypt is slow on purpose, so a burst of logins hashing inline on every
+request thread would compete for the same cores and make each login
+slower. Here every hash and check runs on a fixed number of threads
+(bcrypt releases the GIL, so they use separate cores) and the request
+thread blocks until the result is ready. Beyond ``max_pending`` queued
+operations new ones are turned away at once instead of making every login
+slower.
+
+This only bounds concurrency under a threaded server (the Flask
+development server, gunicorn's sync or gthread workers): the waiting
+request thread is still occupied. Under a cooperative server (eventlet or
+gevent) the wait is not a yield point, so it blocks the event loop like an
+inline check would.
+
+The work factor is ``rounds``; a hash made with another cost is reported by
+``needs_rehash()`` so it can be replaced at the user's next successful login.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.metrics import metrics
+
+hash_seconds = metrics.summary("password_hash_seconds", "Time spent in bcrypt, by operation")
+pending_operations = metrics.gauge("password_hash_pending", "Password hashes and checks running or queued")
+rejections = metrics.counter("password_hash_rejections_total", "Password operations turned away because the pool was full")
+rehashes = metrics.counter("password_rehashes_total", "Password hashes upgraded to the configured cost at login")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already running or queued."""
+
+
+def hash_cost(password_hash):
+    """The cost (log2 rounds) a bcrypt hash was made with, or ``None`` if it is not a bcrypt hash."""
+    parts = password_hash.split("$")  # $2b$12$<salt and digest>
+    if len(parts) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Hashes and checks passwords with a Flask-Bcrypt ``bcrypt`` on ``max_workers`` threads."""
+
+    def __init__(self, bcrypt, rounds=12, max_workers=1, max_pending=64):
+        self.bcrypt = bcrypt
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _run(self, operation, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_pending:
+                rejections.inc()
+                raise PasswordHasherBusy("Too many sign-ins at the moment, try again shortly")
+            self._pending += 1
+            pending_operations.set(self._pending)
+        try:
+            return self._executor.submit(self._timed, operation, fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                pending_operations.set(self._pending)
+
+    @staticmethod
+    def _timed(operation, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+    def hash(self, password):
+        """bcrypt hash of ``password`` at the configured cost, as a string."""
+        return self._run("hash", self.bcrypt.generate_password_hash, password, self.rounds).decode("utf-8")
+
+    def check(self, password_hash, password):
+        return self._run("check", self.bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with a cost other than the configured one."""
+        cost = hash_cost(password_hash)
+        return cost is not None and cost != self.rounds
+
+    def upgrade(self, user, password):
+        """After a successful login, rehash ``user.password`` if its cost is outdated; returns True if it was.
+
+        The caller commits the session.
+        """
+        if not self.needs_rehash(user.password):
+            return False
+        user.password = self.hash(password)
+        rehashes.inc()
+        return True
@@ -0,0 +1,309 @@
+# app/services/pdf_text.py
+"""Bounded PDF text extraction shared by every route that reads resume PDFs.
+
+Uploads are untrusted, so PyPDF2 runs in a pool of reusable sandbox
+subprocesses rather than in the web worker. Each sandbox has an address-space
+rlimit and a per-document CPU-time rlimit, every request has a wall-clock
+timeout after which the sandbox is killed, and sandboxes are replaced after a
+number of documents. A pathological file costs one bounded subprocess.
+
+Documents are also capped by size and page count, extraction stops once a
+per-document CPU-time budget is spent, large documents are split into page
+ranges that run on several sandboxes, and the extracted pages are cached by
+the SHA-256 of the file so the same upload is never parsed twice; concurrent
+requests for the same file wait for a single parse.
+"""
+
+import hashlib
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import PyPDF2
+
+from app.services.metrics import metrics
+from app.services.single_flight import SingleFlight
+
+try:
+    import resource
+except ImportError:  # not available on Windows; sandboxes then run without rlimits
+    resource = None
+
+sandbox_exits = metrics.counter("pdf_sandbox_exits_total", "PDF sandbox subprocesses stopped, by reason")
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF is over the size, page, CPU, memory or time limits, or cannot be read."""
+
+
+def _extract_pages(reader, start, stop, cpu_budget):
+    """Extract pages ``start``..``stop`` of an open PDF.
+
+    Returns the page texts and the CPU seconds spent. The budget is checked
+    between pages, so a single pathological page can still overrun it (the
+    sandbox's CPU rlimit catches that case).
+    """
+    started = time.process_time()
+    texts = []
+    for index in range(start, stop):
+        texts.append(reader.pages[index].extract_text() or "")
+        if time.process_time() - started > cpu_budget:
+            raise PDFExtractionError(f"PDF text extraction exceeded its {cpu_budget}s CPU budget")
+    return texts, time.process_time() - started
+
+
+def _extract_page_range(data, start, stop, max_pages, cpu_budget):
+    """Open the PDF and extract one page range; returns the page count, texts and CPU seconds."""
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        raise PDFExtractionError(f"PDF has {page_count} pages, the limit is {max_pages}")
+    texts, cpu_used = _extract_pages(reader, start, min(stop, page_count), cpu_budget)
+    return page_count, texts, cpu_used
+
+
+def _address_space_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _set_soft_limit(limit_name, soft):
+    _, hard = resource.getrlimit(limit_name)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(limit_name, (soft, hard))
+
+
+def _sandbox_main(conn, cpu_seconds, memory_bytes):
+    """Sandbox process loop: extract the page ranges sent over ``conn`` until told to stop."""
+    if resource is not None:
+        # A forked sandbox already maps the parent's memory, so the limit is on top of that
+        _set_soft_limit(resource.RLIMIT_AS, _address_space_bytes() + memory_bytes)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        if resource is not None:
+            # RLIMIT_CPU counts the process's total CPU time, so move it forward for each
+            # document; going over it kills the sandbox with SIGXCPU
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            _set_soft_limit(resource.RLIMIT_CPU, math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds))
+        try:
+            reply = ("ok", _extract_page_range(*request))
+        except PDFExtractionError as e:
+            reply = ("error", str(e))
+        except MemoryError:
+            reply = ("error", "PDF text extraction exceeded its memory limit")
+        except Exception as e:
+            reply = ("error", f"Could not read PDF: {e}")
+        conn.send(reply)
+
+
+def _pool_context():
+    # Forked sandboxes inherit the already imported modules; spawning would
+    # re-import the app package (and start its scheduler) in every sandbox.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+class _Sandbox:
+    """One sandbox subprocess and the pipe to it."""
+
+    def __init__(self, context, cpu_seconds, memory_bytes):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_sandbox_main, args=(child_conn, cpu_seconds, memory_bytes),
+                                       name="pdf-sandbox", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+        self.alive = True
+
+    def call(self, request, timeout):
+        self.documents += 1
+        self.conn.send(request)
+        if not self.conn.poll(timeout):
+            self.kill("timeout")
+            raise PDFExtractionError(f"PDF text extraction took longer than {timeout}s")
+        try:
+            status, value = self.conn.recv()
+        except EOFError:
+            # The sandbox died: SIGXCPU from the CPU rlimit, or killed while out of memory
+            self.kill("crashed")
+            raise PDFExtractionError("PDF text extraction exceeded its CPU or memory limit")
+        if status != "ok":
+            raise PDFExtractionError(value)
+        return value
+
+    def kill(self, reason):
+        self.alive = False
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        sandbox_exits.inc(reason=reason)
+
+    def stop(self, reason):
+        self.alive = False
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        sandbox_exits.inc(reason=reason)
+
+
+class SandboxPool:
+    """Up to ``size`` reusable sandboxes, each replaced after ``max_documents`` requests."""
+
+    def __init__(self, context, size=2, cpu_seconds=10, memory_bytes=512 * 1024 * 1024, timeout=20.0,
+                 max_documents=50):
+        self.context = context
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.timeout = timeout
+        self.max_documents = max_documents
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def run(self, request):
+        """Run one ``_extract_page_range`` request in a sandbox."""
+        with self._slots:
+            with self._lock:
+                sandbox = self._idle.pop() if self._idle else None
+            if sandbox is None:
+                sandbox = _Sandbox(self.context, self.cpu_seconds, self.memory_bytes)
+            try:
+                return sandbox.call(request, self.timeout)
+            finally:
+                if sandbox.alive and sandbox.documents >= self.max_documents:
+                    sandbox.stop("recycled")
+                elif sandbox.alive:
+                    with self._lock:
+                        self._idle.append(sandbox)
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sandbox in idle:
+            sandbox.stop("shutdown")
+
+
+class PDFTextExtractor:
+    """Extracts text from PDF bytes within configurable limits.
+
+    With ``sandbox=False`` (or where fork is unavailable) PDFs are parsed in
+    this process, for trusted files and benchmarks.
+    """
+
+    def __init__(self, max_bytes=10 * 1024 * 1024, max_pages=50, cpu_budget=10.0,
+                 parallel_threshold=8, workers=2, cache_size=64, memory_limit=512 * 1024 * 1024,
+                 timeout=20.0, max_documents=50, sandbox=True):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.cpu_budget = cpu_budget
+        self.parallel_threshold = parallel_threshold
+        self.workers = max(workers, 1)
+        self.cache_size = cache_size
+        self.memory_limit = memory_limit
+        self.timeout = timeout
+        self.max_documents = max_documents
+        self.sandbox = sandbox
+        self._cache = OrderedDict()  # sha256 -> tuple of page texts
+        self._pool = None
+        self._dispatcher = None  # threads waiting on sandboxes for the page ranges of large documents
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("pdf_text")
+
+    def extract(self, data, page_separator=""):
+        """Return the text of every page, each followed by ``page_separator``."""
+        return "".join(page + page_separator for page in self.extract_pages(data))
+
+    def extract_pages(self, data):
+        """Return a tuple with the text of each page of the PDF in ``data``."""
+        if len(data) > self.max_bytes:
+            raise PDFExtractionError(f"PDF is larger than {self.max_bytes} bytes")
+
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            pages = self._cache.get(digest)
+            if pages is not None:
+                self._cache.move_to_end(digest)
+                return pages
+
+        pages, _ = self._flight.do(digest, self._parse, digest, data)
+        return pages
+
+    def _parse(self, digest, data):
+        pool = self._get_pool()
+        if pool is None:
+            _, texts, _ = _extract_page_range(data, 0, sys.maxsize, self.max_pages, self.cpu_budget)
+        else:
+            # The first sandbox also finds the page count; pages past the
+            # threshold are then split across the sandboxes
+            page_count, texts, cpu_used = pool.run((data, 0, self.parallel_threshold, self.max_pages, self.cpu_budget))
+            if page_count > len(texts):
+                texts = texts + self._extract_rest(pool, data, len(texts), page_count, cpu_used)
+
+        pages = tuple(texts)
+        with self._lock:
+            self._cache[digest] = pages
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return pages
+
+    def _extract_rest(self, pool, data, start, page_count, cpu_used):
+        chunk = -(-(page_count - start) // self.workers)  # ceil division
+        futures = [
+            self._dispatcher.submit(pool.run, (data, first, min(first + chunk, page_count), self.max_pages,
+                                               self.cpu_budget))
+            for first in range(start, page_count, chunk)
+        ]
+        texts = []
+        for future in futures:
+            _, chunk_texts, chunk_cpu = future.result()
+            texts.extend(chunk_texts)
+            cpu_used += chunk_cpu
+        if cpu_used > self.cpu_budget:
+            raise PDFExtractionError(f"PDF text extraction exceeded its {self.cpu_budget}s CPU budget")
+        return texts
+
+    def _get_pool(self):
+        if not self.sandbox:
+            return None
+        with self._lock:
+            if self._pool is None:
+                context = _pool_context()
+                if context is None:
+                    return None
+                self._pool = SandboxPool(
+                    context, size=self.workers, cpu_seconds=math.ceil(self.cpu_budget) + 1,
+                    memory_bytes=self.memory_limit, timeout=self.timeout, max_documents=self.max_documents,
+                )
+                self._dispatcher = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-dispatch")
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None:
+            dispatcher.shutdown(cancel_futures=True)
+        if pool is not None:
+            pool.shutdown()
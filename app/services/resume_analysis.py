@@ -0,0 +1,477 @@
+# app/services/resume_analysis.py
+"""LLM resume analysis tasks shared by the resume routes and the background job queue."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from app import app, db
+from app.models import JobExperience
+from app.services.llm_backend import create_backend
+from app.services.llm_cache import LLMResultCache, cache_key
+from app.services.llm_limiter import LLMLimiter
+from app.services.resume_chunker import (
+    chunk_sections, chunk_text, estimate_tokens, experience_sections, heading_offsets, split_experience_entries,
+    split_sections,
+)
+from app.services.single_flight import SingleFlight
+from app.services.skill_matcher import extract_skills
+
+MODEL_NAME = "deepseek-r1:1.5b"
+
+# Bump a version whenever its prompt changes so cached results from the old prompt are not reused
+ADVICE_PROMPT_VERSION = "advice-v2"
+WORK_EXPERIENCE_PROMPT_VERSION = "work-experience-v3"
+SUMMARY_PROMPT_VERSION = "summary-v2"
+
+ADVICE_PROMPT = "give improvement suggestions for this resume: {text}"
+
+SUMMARY_PROMPT = '''summarize this resume for a recruiter as a single json object with these keys:
+headline (one sentence describing the candidate), years_experience (a number),
+skills (an array of strings), highlights (an array of at most three short strings).
+Only answer with the json object. The resume is: {text}'''
+
+# Used instead of ADVICE_PROMPT for each chunk of a resume too long for one prompt
+ADVICE_CHUNK_PROMPT = "give improvement suggestions for this part of a resume: {text}"
+
+# Separates the suggestions generated for consecutive chunks
+CHUNK_SEPARATOR = "\n\n"
+# Joins the experience entries the parser could not structure into the text the model reads
+UNPARSED_SEPARATOR = "\n\n"
+
+WORK_EXPERIENCE_PROMPT = '''categorize the work experience you see in the following resume into following categories:
+                                            job_title,
+                                            company_name,
+                                            location,
+                                            duration,
+                                            description,
+                                            give that output in a json formatt.
+                                            This work experience should only be extracted from the experience section of the resume. Do not parse the whole resume and give incorrect results.
+                                            You should essentially return an array of json objects each holding the work experience categorized correctly based on my requirements.
+                                            Make sure that the answer you give me just has a json so that I dont run into parsing issues in my python script.
+                                            a sample output would be: [{{"job_title":"",
+                                            "company_name":"",
+                                            "location":"",
+                                            "duration":"",
+                                            "description":""}},
+                                            {{"job_title":"",
+                                            "company_name":"",
+                                            "location":"",
+                                            "duration":"",
+                                            "description":""}}]
+                                            see how it is an array of json objects and it only uses the work experience/professional experience section and nothing else.
+                                            , the resume is :
+                                            : {text}'''
+
+
+llm_limiter = LLMLimiter(
+    max_concurrency=app.config["LLM_MAX_CONCURRENCY"],
+    max_waiting=app.config["LLM_MAX_WAITING"],
+    max_per_user=app.config["LLM_MAX_PER_USER"],
+    default_retry_after=app.config["LLM_RETRY_AFTER"],
+)
+
+
+llm_backend = create_backend(app.config)
+
+
+def _cache_key(text, prompt_version):
+    return cache_key(text, prompt_version, MODEL_NAME, llm_backend.cache_namespace)
+
+
+def _chat(prompt, on_token=None, user_key="anonymous"):
+    """Run one chat completion within the LLM concurrency limit and return the full text.
+
+    With ``on_token`` the streaming API is used and each token is passed to
+    the callback as soon as the model produces it.
+    """
+    with llm_limiter.slot(user_key):
+        if on_token is None:
+            return llm_backend.generate(MODEL_NAME, prompt)
+
+        parts = []
+        for token in llm_backend.stream(MODEL_NAME, prompt):
+            parts.append(token)
+            on_token(token)
+        return "".join(parts)
+
+
+class _OrderedStream:
+    """Forwards the tokens of concurrently generated chunks to ``on_token`` in chunk order.
+
+    The first unfinished chunk streams live; tokens of later chunks are
+    buffered until every chunk before them is done, so the streamed text
+    always equals the merged result built so far.
+    """
+
+    def __init__(self, count, on_token, separator):
+        self.on_token = on_token
+        self.separator = separator
+        self._buffers = [[] for _ in range(count)]
+        self._done = [False] * count
+        self._current = 0
+        self._lock = threading.Lock()
+
+    def writer(self, index):
+        def write(token):
+            with self._lock:
+                if index == self._current:
+                    self.on_token(token)
+                else:
+                    self._buffers[index].append(token)
+        return write
+
+    def finish(self, index):
+        with self._lock:
+            self._done[index] = True
+            while self._current < len(self._done) and self._done[self._current]:
+                self._current += 1
+                if self._current < len(self._done):
+                    self.on_token(self.separator)
+                    for token in self._buffers[self._current]:
+                        self.on_token(token)
+                    self._buffers[self._current] = []
+
+
+_chunk_pool = ThreadPoolExecutor(max_workers=app.config["LLM_CHUNK_WORKERS"], thread_name_prefix="llm-chunk")
+
+
+def _map_chunks(prompt, chunks, on_token=None, user_key="anonymous"):
+    """Run ``prompt`` over every chunk concurrently and return the outputs in chunk order.
+
+    Each call still goes through ``_chat``, so the chunks of one resume queue
+    for LLM slots like any other call and the total latency is bounded by the
+    slowest chunk rather than the whole document.
+    """
+    if len(chunks) == 1:
+        return [_chat(prompt.format(text=chunks[0]), on_token=on_token, user_key=user_key)]
+
+    stream = _OrderedStream(len(chunks), on_token, CHUNK_SEPARATOR) if on_token else None
+
+    def run(index, chunk):
+        content = _chat(prompt.format(text=chunk), on_token=stream.writer(index) if stream else None,
+                        user_key=user_key)
+        if stream:
+            stream.finish(index)
+        return content
+
+    futures = [_chunk_pool.submit(run, index, chunk) for index, chunk in enumerate(chunks)]
+    try:
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+# Identical analyses running at the same time (double submits, the same resume
+# from two users) share one generation, keyed like the result cache
+llm_flight = SingleFlight("llm_results")
+
+llm_cache = LLMResultCache(
+    memory_size=app.config["LLM_CACHE_MEMORY_SIZE"],
+    max_bytes=app.config["LLM_CACHE_MAX_BYTES"],
+    max_age=timedelta(days=app.config["LLM_CACHE_MAX_AGE_DAYS"]),
+)
+
+
+# JobExperience string columns and their lengths; description and skills are Text
+EXPERIENCE_FIELDS = {"job_title": 120, "company_name": 120, "location": 120, "duration": 50, "description": None}
+
+
+def iter_json_objects(content):
+    """Yield every JSON object that can be decoded from ``content``.
+
+    Scans for ``{`` and decodes from there, so valid objects are recovered
+    even when the surrounding array is truncated, an element is malformed, or
+    the model wrapped the JSON in prose. Objects nested in a decoded object
+    are not yielded separately.
+    """
+    decoder = json.JSONDecoder()
+    position = content.find("{")
+    while position != -1:
+        try:
+            value, end = decoder.raw_decode(content, position)
+        except ValueError:
+            position = content.find("{", position + 1)
+            continue
+        if isinstance(value, dict):
+            yield value
+        position = content.find("{", end)
+
+
+def clean_experience(entry):
+    """Validate one model-produced experience object; returns a row dict or ``None``."""
+    row = {}
+    for field, max_length in EXPERIENCE_FIELDS.items():
+        value = entry.get(field)
+        value = "" if value is None else " ".join(str(value).split())
+        row[field] = value[:max_length] if max_length else value
+    if not row["job_title"] or not row["company_name"]:
+        return None
+    skills = entry.get("skills") or []
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    row["skills"] = ",".join(skill for skill in (" ".join(str(s).split()) for s in skills) if skill)
+    return row
+
+
+def _experience_key(row):
+    return tuple(row[field].lower() for field in ("job_title", "company_name", "duration"))
+
+
+def _parse_work_experience(*contents):
+    """Validated entries recovered from one or more model outputs, without duplicates."""
+    entries, seen = [], set()
+    for content in contents:
+        for row in (clean_experience(obj) for obj in iter_json_objects(content)):
+            if row and _experience_key(row) not in seen:
+                seen.add(_experience_key(row))
+                entries.append(row)
+    if not entries:
+        raise ValueError("No work experience could be recovered from the model output")
+    return json.dumps(entries), entries
+
+
+def attach_skills(text, entries):
+    """Fill in each entry's skills with the skill matcher instead of asking the model.
+
+    An entry is matched against its title and description plus the resume
+    text from where its company is mentioned up to the next entry's company
+    or the next section heading. Skills already on the entry are kept.
+    """
+    lowered = text.lower()
+    starts = [lowered.find(entry["company_name"].lower()) for entry in entries]
+    boundaries = sorted(set(p for p in starts if p != -1) | set(heading_offsets(text)))
+    for entry, start in zip(entries, starts):
+        source = f'{entry["job_title"]}\n{entry["description"]}'
+        if start != -1:
+            end = next((p for p in boundaries if p > start), len(text))
+            source += "\n" + text[start:end]
+        skills = [skill for skill in entry["skills"].split(",") if skill]
+        known = {skill.lower() for skill in skills}
+        skills += [skill for skill in extract_skills(source) if skill.lower() not in known]
+        entry["skills"] = ",".join(skills)
+    return entries
+
+
+def structure_work_experience(text):
+    """Work experience read straight from the resume's dated entries, without the model.
+
+    Returns the entries read and the texts of the entries that could not be
+    structured, or ``None`` when no entry could be.
+    """
+    parsed = split_experience_entries(text)
+    if parsed is None:
+        return None
+    entries, unparsed, seen = [], [], set()
+    for entry in parsed:
+        if "text" in entry:
+            unparsed.append(entry["text"])
+            continue
+        fields = entry["fields"]
+        row = clean_experience({"job_title": fields[0], "company_name": fields[1], "location": ", ".join(fields[2:]),
+                                "duration": entry["duration"], "description": entry["description"]})
+        if not row or _experience_key(row) in seen:
+            continue
+        # The entry's own description bounds it, so its skills come from nothing else
+        row["skills"] = ",".join(extract_skills(f'{row["job_title"]}\n{row["description"]}'))
+        seen.add(_experience_key(row))
+        entries.append(row)
+    if not entries:
+        return None
+    return entries, unparsed
+
+
+def _with_model_entries(entries, content):
+    """``entries`` followed by the ones recovered from model output ``content`` that are not among them."""
+    try:
+        _, recovered = _parse_work_experience(content)
+    except ValueError as e:
+        print(f'{e}')  # the unstructured text held no entry the model could read
+        recovered = []
+    seen = {_experience_key(entry) for entry in entries}
+    entries = entries + [entry for entry in recovered if _experience_key(entry) not in seen]
+    return json.dumps(entries), entries
+
+
+def advice_chunks(text):
+    """The resume text split into chunks that each fit the prompt token budget."""
+    return chunk_text(text, app.config["LLM_CHUNK_TOKENS"])
+
+
+def work_experience_chunks(text):
+    """Like ``advice_chunks``, but a long resume is reduced to its experience sections first."""
+    budget = app.config["LLM_CHUNK_TOKENS"]
+    if estimate_tokens(text) <= budget:
+        return [text]
+    return chunk_sections(experience_sections(split_sections(text)), budget)
+
+
+def cached_resume_advice(text):
+    """Previously generated suggestions for exactly this resume text, or ``None``."""
+    return llm_cache.get(_cache_key(text, ADVICE_PROMPT_VERSION))
+
+
+def resume_advice(text, on_token=None, user_key="anonymous"):
+    """Ask the model for improvement suggestions for a resume, optionally streaming tokens to ``on_token``."""
+    key = _cache_key(text, ADVICE_PROMPT_VERSION)
+    content = llm_cache.get(key)
+    if content is None:
+        content, shared = llm_flight.do(key, _generate_advice, key, text, on_token, user_key)
+        if shared and on_token is not None:
+            on_token(content)  # the tokens were streamed to the caller that ran the generation
+    return content
+
+
+def _generate_advice(key, text, on_token, user_key):
+    chunks = advice_chunks(text)
+    prompt = ADVICE_PROMPT if len(chunks) == 1 else ADVICE_CHUNK_PROMPT
+    content = CHUNK_SEPARATOR.join(_map_chunks(prompt, chunks, on_token=on_token, user_key=user_key))
+    llm_cache.put(key, content, ADVICE_PROMPT_VERSION, MODEL_NAME)
+    return content
+
+
+def cached_work_experience(text):
+    """Work experience for this resume text that needs no model call, or ``None``.
+
+    That is the entries read from the resume, plus the model's earlier output
+    for any part it could not structure.
+    """
+    structured = structure_work_experience(text)
+    if structured is None:
+        content = llm_cache.get(_cache_key(text, WORK_EXPERIENCE_PROMPT_VERSION))
+        return _parse_work_experience(content) if content is not None else None
+    entries, unparsed = structured
+    if not unparsed:
+        return json.dumps(entries), entries
+    content = llm_cache.get(_cache_key(UNPARSED_SEPARATOR.join(unparsed), WORK_EXPERIENCE_PROMPT_VERSION))
+    return _with_model_entries(entries, content) if content is not None else None
+
+
+def extract_work_experience(text, user_key="anonymous"):
+    """Categorize the work experience of a resume.
+
+    Entries that ``structure_work_experience`` can read from the resume's
+    dates are taken as they are, and only the entries it cannot structure
+    are sent to the model, whose entries are added after them. A resume
+    without any readable entry goes to the model whole. The model only
+    structures the entries; their skills come from the skill matcher. Long
+    text is split into chunks whose entries are merged. Returns the
+    validated entries as JSON text and as a list; model output is cached
+    only when at least one entry could be recovered from it.
+    """
+    structured = structure_work_experience(text)
+    if structured is None:
+        return _parse_work_experience(_work_experience_content(text, user_key))
+    entries, unparsed = structured
+    if not unparsed:
+        return json.dumps(entries), entries
+    return _with_model_entries(entries, _work_experience_content(UNPARSED_SEPARATOR.join(unparsed), user_key))
+
+
+def _work_experience_content(text, user_key):
+    key = _cache_key(text, WORK_EXPERIENCE_PROMPT_VERSION)
+    content = llm_cache.get(key)
+    if content is None:
+        content, _ = llm_flight.do(key, _generate_work_experience, key, text, user_key)
+    return content
+
+
+def _generate_work_experience(key, text, user_key):
+    contents = _map_chunks(WORK_EXPERIENCE_PROMPT, work_experience_chunks(text), user_key=user_key)
+    _, entries = _parse_work_experience(*contents)
+    attach_skills(text, entries)
+    we_text = json.dumps(entries)
+    llm_cache.put(key, we_text, WORK_EXPERIENCE_PROMPT_VERSION, MODEL_NAME)
+    return we_text
+
+
+def clean_summary(entry):
+    """Validate one model-produced summary object into the stored shape."""
+    def strings(value):
+        if isinstance(value, str):
+            value = value.split(",")
+        if not isinstance(value, list):
+            return []
+        return [item for item in (" ".join(str(v).split()) for v in value) if item]
+
+    try:
+        years = float(entry.get("years_experience"))
+    except (TypeError, ValueError):
+        years = None
+    return {
+        "headline": " ".join(str(entry.get("headline") or "").split())[:300],
+        "years_experience": years,
+        "skills": strings(entry.get("skills")),
+        "highlights": strings(entry.get("highlights"))[:3],
+    }
+
+
+def _merge_summaries(contents):
+    """Combine the summaries of a resume's chunks; raises ``ValueError`` when none parses."""
+    first_objects = (next(iter_json_objects(content), None) for content in contents)
+    summaries = [clean_summary(obj) for obj in first_objects if obj is not None]
+    if not summaries:
+        raise ValueError("No summary could be recovered from the model output")
+    merged = {"headline": "", "years_experience": None, "skills": [], "highlights": []}
+    for summary in summaries:
+        merged["headline"] = merged["headline"] or summary["headline"]
+        if summary["years_experience"] is not None:
+            merged["years_experience"] = max(merged["years_experience"] or 0, summary["years_experience"])
+        merged["skills"] += [skill for skill in summary["skills"]
+                             if skill.lower() not in {s.lower() for s in merged["skills"]}]
+        merged["highlights"] += summary["highlights"]
+    merged["highlights"] = merged["highlights"][:3]
+    return merged
+
+
+def cached_resume_summary(text):
+    """Previously generated recruiter summary for exactly this resume text, or ``None``."""
+    content = llm_cache.get(_cache_key(text, SUMMARY_PROMPT_VERSION))
+    return json.loads(content) if content is not None else None
+
+
+def summarize_resume(text, user_key="anonymous"):
+    """Ask the model for a structured recruiter summary of a resume.
+
+    Returns a dict with ``headline``, ``years_experience``, ``skills`` and
+    ``highlights``; skills the model missed are added by the skill matcher.
+    The summary is cached only when the output parses.
+    """
+    summary = cached_resume_summary(text)
+    if summary is not None:
+        return summary
+    summary = _merge_summaries(_map_chunks(SUMMARY_PROMPT, advice_chunks(text), user_key=user_key))
+    known = {skill.lower() for skill in summary["skills"]}
+    summary["skills"] += [skill for skill in extract_skills(text) if skill.lower() not in known]
+    llm_cache.put(_cache_key(text, SUMMARY_PROMPT_VERSION), json.dumps(summary),
+                  SUMMARY_PROMPT_VERSION, MODEL_NAME)
+    return summary
+
+
+def save_work_experience(entries, username):
+    """Store the validated experience entries for a user in one transaction.
+
+    Entries matching one of the user's existing experiences (same title,
+    company and duration) or an earlier entry of the batch are skipped.
+    Returns the number of rows inserted.
+    """
+    seen = {
+        _experience_key({"job_title": title, "company_name": company, "duration": duration})
+        for title, company, duration in db.session.query(
+            JobExperience.job_title, JobExperience.company_name, JobExperience.duration
+        ).filter(JobExperience.username == username)
+    }
+    rows = []
+    for entry in entries:
+        key = _experience_key(entry)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append(dict(entry, username=username))
+
+    if rows:
+        db.session.bulk_insert_mappings(JobExperience, rows)
+        db.session.commit()
+    return len(rows)
@@ -0,0 +1,155 @@
+# app/services/resume_bundle.py
+"""ZIP archives of many resumes, streamed while they are built.
+
+The archive is written to a sink that the response generator drains after
+every chunk, so memory stays at one chunk however many applicants a
+posting has, and the first bytes go out before the last resume is read.
+PDFs and DOCX files (compressed already) are stored as is; only plain text
+is deflated. Entries carry data descriptors, so each file is read once, and
+ZIP64 records are written for large archives.
+
+An archive is a function of its manifest (entry names, contents and
+timestamps), so the manifest's SHA-256 serves as its strong ETag. While a
+bundle streams it is also written to a ``BundleCache``; a later download of
+the same applicant set is sent straight from that file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections import namedtuple
+from datetime import datetime
+
+from app.services.blob_storage import STREAM_CHUNK_SIZE
+from app.services.metrics import metrics
+
+bundles_served = metrics.counter("resume_bundles_total", "Resume ZIP bundles downloaded, by source")
+
+# One file of a bundle: its name in the archive and the ResolvedResume it holds
+BundleEntry = namedtuple("BundleEntry", ["name", "resume"])
+
+# Extensions worth compressing; everything else is stored
+DEFLATED_EXTENSIONS = {"txt"}
+# ZIP timestamps cannot predate 1980
+_ZIP_EPOCH = datetime(1980, 1, 1)
+
+
+class _Sink:
+    """Write-only file object holding what ``zipfile`` wrote until it is drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def bundle_key(entries):
+    """SHA-256 of the manifest of ``entries``, which determines the archive byte for byte."""
+    digest = hashlib.sha256()
+    for entry in entries:
+        resume = entry.resume
+        digest.update(json.dumps([entry.name, resume.file_hash or resume.path, resume.size,
+                                  resume.modified.isoformat()]).encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def _zip_info(entry):
+    info = zipfile.ZipInfo(entry.name, date_time=max(entry.resume.modified, _ZIP_EPOCH).timetuple()[:6])
+    info.file_size = entry.resume.size  # lets zipfile decide on ZIP64 before the data is written
+    extension = entry.name.rsplit(".", 1)[-1].lower() if "." in entry.name else ""
+    info.compress_type = zipfile.ZIP_DEFLATED if extension in DEFLATED_EXTENSIONS else zipfile.ZIP_STORED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def stream_bundle(entries, open_resume, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield the ZIP archive of ``entries`` chunk by chunk; ``open_resume`` opens a ``ResolvedResume``."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as archive:  # the sink cannot seek, so entries get data descriptors
+        for entry in entries:
+            with open_resume(entry.resume) as source, archive.open(_zip_info(entry), "w") as target:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()  # the central directory
+
+
+class BundleCache:
+    """Finished bundles under ``root`` as ``<key>.zip``, within ``max_bytes``.
+
+    The least recently sent bundles are deleted first; ``path()`` refreshes a
+    bundle's modification time, which is what the order is kept by, so the
+    cache can be shared by several worker processes.
+    """
+
+    def __init__(self, root, max_bytes=500 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.zip")
+
+    def path(self, key):
+        """Path of the cached bundle ``key``, marking it recently used, or ``None``."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def tee(self, key, chunks):
+        """Yield ``chunks`` while writing them to the cache; the bundle is kept only if all of it was sent."""
+        if self.max_bytes <= 0:
+            yield from chunks
+            return
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size <= self.max_bytes:  # a bundle over the whole budget is only streamed
+                        tmp.write(chunk)
+                    yield chunk
+        except BaseException:
+            os.unlink(tmp_path)  # the download was cut off or failed
+            raise
+        if size > self.max_bytes:
+            os.unlink(tmp_path)
+            return
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        bundles = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.endswith(".zip"):
+                    stat = entry.stat()
+                    bundles.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in bundles)
+        for _, size, path in sorted(bundles):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,223 @@
+# app/services/resume_chunker.py
+"""Split resume text into sections, dated experience entries, and token-budgeted chunks for the LLM."""
+
+import math
+import re
+
+# Headings commonly used in resumes; matched case-insensitively against whole lines
+SECTION_HEADINGS = (
+    "summary", "profile", "objective", "about me",
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "work history", "relevant experience", "internships", "research experience",
+    "education", "skills", "technical skills", "projects", "academic projects", "certifications",
+    "awards", "honors", "publications", "activities", "leadership", "volunteer experience",
+    "languages", "interests", "references",
+)
+
+EXPERIENCE_HEADINGS = {
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "work history", "relevant experience", "internships", "research experience",
+}
+
+_HEADING_PATTERN = r"^[ \t]*(" + "|".join(re.escape(h) for h in sorted(SECTION_HEADINGS, key=len, reverse=True)) + r")[ \t]*:?[ \t]*$"
+_HEADING_RE = re.compile(_HEADING_PATTERN, re.IGNORECASE)
+_HEADING_LINE_RE = re.compile(_HEADING_PATTERN, re.IGNORECASE | re.MULTILINE)
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def split_sections(text):
+    """Split resume text at recognised headings.
+
+    Returns a list of ``(heading, body)`` pairs in document order; text before
+    the first heading gets the heading ``""``.
+    """
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            if heading or any(l.strip() for l in lines):
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = match.group(1).strip().lower(), []
+        else:
+            lines.append(line)
+    if heading or any(l.strip() for l in lines):
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+
+def heading_offsets(text):
+    """Character offsets at which recognised section headings start in ``text``."""
+    return [match.start() for match in _HEADING_LINE_RE.finditer(text)]
+
+
+def experience_sections(sections):
+    """Only the work-experience sections, or all of them when none is recognised."""
+    selected = [(heading, body) for heading, body in sections if heading in EXPERIENCE_HEADINGS]
+    return selected or sections
+
+
+# Experience headings as they appear inline in text extracted without line breaks ("Work Experience Grader, ...")
+_INLINE_EXPERIENCE_RE = re.compile(r"\b(" + "|".join(
+    re.escape(variant) for h in sorted(EXPERIENCE_HEADINGS, key=len, reverse=True) for variant in (h.title(), h.upper())
+) + r")\b")
+_INLINE_HEADING_RE = re.compile(r"\b(" + "|".join(
+    re.escape(variant) for h in sorted(SECTION_HEADINGS, key=len, reverse=True) if h not in EXPERIENCE_HEADINGS
+    for variant in (h.title(), h.upper())
+) + r")\b")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+)?(?:19|20)\d{{2}}"
+_DATE_RANGE_RE = re.compile(rf"\b{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now)\b", re.IGNORECASE)
+_BULLETS = "•▪●◦"
+_BULLET_RE = re.compile(rf"[{_BULLETS}]|^\s*[-*]\s", re.MULTILINE)
+_SENTENCE_END_RE = re.compile(r"[.!?%]\s+(?=[A-Z])")
+_HEADER_FIELD_RE = re.compile(r"\s*[|,\n]\s*|\s+[-–—]\s+|\s+at\s+")
+_COMPANY_SUFFIXES = {"inc", "inc.", "llc", "ltd", "ltd.", "corp", "corp.", "co.", "gmbh", "plc"}
+# Longest header taken for "title, company, location", and longest title line above one; anything longer is prose
+MAX_HEADER_LENGTH = 160
+MAX_TITLE_WORDS = 6
+
+
+def experience_text(text):
+    """The work-experience part of a resume, or ``None`` when it has no recognisable experience heading."""
+    bodies = [body for heading, body in split_sections(text) if heading in EXPERIENCE_HEADINGS]
+    if bodies:
+        return "\n".join(bodies)
+    start = _INLINE_EXPERIENCE_RE.search(text)
+    if start is None:
+        return None
+    end = _INLINE_HEADING_RE.search(text, start.end())
+    return text[start.end():end.start() if end else len(text)]
+
+
+def _header_fields(header):
+    fields = []
+    for field in _HEADER_FIELD_RE.split(header):
+        field = field.strip(" \t|,;:-–—")
+        if field and fields and field.lower() in _COMPANY_SUFFIXES:
+            fields[-1] = f"{fields[-1]}, {field}"
+        elif field:
+            fields.append(field)
+    return fields
+
+
+def _header_start(segment):
+    """Offset in ``segment`` (the text before a date range) where the entry's header starts, or ``None``."""
+    tail = segment.rstrip()
+    newline = tail.rfind("\n")
+    bullet = max((match.end() for match in _BULLET_RE.finditer(tail)), default=-1)
+    if bullet > newline:
+        # Without line breaks the header follows the previous entry's last bullet, after its last sentence
+        ends = list(_SENTENCE_END_RE.finditer(tail, bullet))
+        return ends[-1].end() if ends else None
+    start = newline + 1
+    if newline != -1:
+        # A job title on a line of its own above "Company, Location"
+        previous = tail.rfind("\n", 0, newline) + 1
+        line = tail[previous:newline].strip()
+        if (line and not _BULLET_RE.match(tail, previous) and len(_header_fields(line)) == 1
+                and len(line.split()) <= MAX_TITLE_WORDS and line[-1] not in ".!?"):
+            start = previous
+    return start
+
+
+def split_experience_entries(text):
+    """Split a resume's experience section into entries at their date ranges.
+
+    Each entry is a dict with ``fields`` (the header before its dates, split
+    into title, company and location parts), ``duration`` and
+    ``description``. An entry whose header cannot be told apart from the text
+    around it is a dict with just its raw ``text`` instead; when not even its
+    start can be found, the entry before it is folded into that text. Text
+    before the first dated entry is kept as a raw entry too. Returns ``None``
+    when the section is missing or has no dates.
+    """
+    section = experience_text(text)
+    if section is None:
+        return None
+    dates = list(_DATE_RANGE_RE.finditer(section))
+    if not dates:
+        return None
+    spans = []  # [start, date range, whether the header was found]
+    for index, match in enumerate(dates):
+        previous_end = dates[index - 1].end() if index else 0
+        start = _header_start(section[previous_end:match.start()])
+        if start is not None:
+            spans.append([previous_end + start, match, True])
+        else:
+            spans.append([spans.pop()[0] if spans else 0, match, False])
+    entries = []
+    if re.search(r"\w", section[:spans[0][0]]):
+        entries.append({"text": section[:spans[0][0]].strip()})
+    for index, (start, match, found) in enumerate(spans):
+        end = spans[index + 1][0] if index + 1 < len(spans) else len(section)
+        header = section[start:match.start()].strip()
+        fields = _header_fields(header)
+        if not found or len(fields) < 2 or len(header) > MAX_HEADER_LENGTH:
+            entries.append({"text": section[start:end].strip()})
+            continue
+        items = (" ".join(item.split()) for item in _BULLET_RE.split(section[match.end():end]))
+        description = " ".join(item if item[-1] in ".!?" else f"{item}." for item in items if item)
+        entries.append({"fields": fields, "duration": match.group(0), "description": description})
+    return entries
+
+
+def _split_oversized(text, max_tokens):
+    """Break a block larger than the budget at line, then word, boundaries."""
+    pieces, current = [], ""
+    for line in text.splitlines():
+        if estimate_tokens(line) > max_tokens:
+            for word in line.split():
+                candidate = f"{current} {word}" if current else word
+                if current and estimate_tokens(candidate) > max_tokens:
+                    pieces.append(current)
+                    candidate = word
+                current = candidate
+            continue
+        candidate = f"{current}\n{line}" if current else line
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            candidate = line
+        current = candidate
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def chunk_sections(sections, max_tokens):
+    """Pack ``(heading, body)`` sections into text chunks of at most ``max_tokens``.
+
+    Whole sections are kept together where they fit; a section larger than
+    the budget is split and each piece repeats its heading.
+    """
+    chunks, current = [], ""
+    for heading, body in sections:
+        block = f"{heading.upper()}\n{body}" if heading else body
+        if estimate_tokens(block) > max_tokens:
+            if current:
+                chunks.append(current)
+                current = ""
+            prefix = f"{heading.upper()}\n" if heading else ""
+            budget = max(max_tokens - estimate_tokens(prefix), 1)
+            chunks.extend(prefix + piece for piece in _split_oversized(body, budget))
+            continue
+        candidate = f"{current}\n\n{block}" if current else block
+        if current and estimate_tokens(candidate) > max_tokens:
+            chunks.append(current)
+            candidate = block
+        current = candidate
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def chunk_text(text, max_tokens):
+    """Split resume text by section into chunks of at most ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    return chunk_sections(split_sections(text), max_tokens)
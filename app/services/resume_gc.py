@@ -0,0 +1,216 @@
+# app/services/resume_gc.py
+"""Garbage collection of stored resume files that nothing references any more.
+
+Reference counting in the store frees a blob as soon as its last upload is
+released, but some files are still left behind: uploads whose
+``JobApplication`` row was deleted, reference counts that drifted after a
+crash, blobs whose upload crashed before it could release them, and files uploaded before the store existed and later
+replaced. Extracted text of files posted to the resume parser endpoints
+(``ResumeUpload`` rows) is only kept for ``upload_text_ttl`` seconds. The collector reconciles the store against every database
+reference and deletes what is unreferenced and older than a grace period,
+which keeps uploads that are still in flight safe.
+
+Every step walks its table (or the storage listing) in batches of
+``batch_size`` keyed on the primary key, each in its own short transaction
+with an optional pause in between, so a run never holds a lock for long.
+"""
+
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app import db
+from app.models import JobApplication, ResumeBlob, ResumeText, ResumeUpload, StoredResume, User
+from app.services.metrics import metrics
+from app.services.resume_store import MIME_TYPES, is_store_id
+
+gc_deleted = metrics.counter("resume_gc_deleted_total", "Resume uploads, blobs and files deleted by the collector, by kind")
+gc_reclaimed_bytes = metrics.counter("resume_gc_reclaimed_bytes_total", "Bytes of resume storage the collector freed")
+
+_BLOB_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+class GCReport:
+    """What one collector run did."""
+
+    def __init__(self):
+        self.released = 0  # unreferenced StoredResume rows dropped
+        self.blobs_deleted = 0  # blobs deleted from storage
+        self.files_deleted = 0  # legacy files deleted from the upload folder
+        self.refcounts_fixed = 0  # ResumeBlob rows whose count was corrected
+        self.upload_texts_pruned = 0  # expired ResumeUpload rows deleted
+        self.bytes_reclaimed = 0
+
+    def __str__(self):
+        return (f"released {self.released} uploads, deleted {self.blobs_deleted} blobs and "
+                f"{self.files_deleted} legacy files, fixed {self.refcounts_fixed} reference counts, "
+                f"pruned {self.upload_texts_pruned} upload texts, reclaimed {self.bytes_reclaimed} bytes")
+
+
+class ResumeGC:
+    """Reconciles ``store`` against the database and deletes what nothing references.
+
+    ``grace`` (seconds) is how old an unreferenced upload, blob or file must be
+    before it is deleted; ``upload_text_ttl`` (seconds) how long extracted
+    upload text is kept.
+    """
+
+    def __init__(self, app, store, grace=24 * 3600, batch_size=500, pause=0.0, upload_text_ttl=24 * 3600):
+        self.app = app
+        self.store = store
+        self.grace = grace
+        self.upload_text_ttl = upload_text_ttl
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def run(self):
+        """Run one full collection (inside an app context) and return its ``GCReport``."""
+        report = GCReport()
+        cutoff = time.time() - self.grace
+        self._release_unreferenced(report, datetime.utcnow() - timedelta(seconds=self.grace))
+        self._reconcile_blobs(report, datetime.utcnow() - timedelta(seconds=self.grace))
+        self._delete_orphan_blobs(report, cutoff)
+        self._forget_orphan_text()
+        self._prune_upload_text(report, datetime.utcnow() - timedelta(seconds=self.upload_text_ttl))
+        if self.store.legacy_dir:
+            self._delete_legacy_files(report, cutoff)
+        gc_reclaimed_bytes.inc(report.bytes_reclaimed)
+        return report
+
+    def scheduled_run(self):
+        """``run()`` for the background scheduler: in its own app context, never raising."""
+        with self.app.app_context():
+            try:
+                print(f"Resume GC: {self.run()}")
+            except Exception as e:
+                print(f'{e}')
+            finally:
+                db.session.remove()
+
+    def _batches(self, column, *criteria):
+        """Yield successive lists of at most ``batch_size`` values of the primary key ``column``."""
+        last = None
+        while True:
+            query = db.session.query(column).filter(*criteria)
+            if last is not None:
+                query = query.filter(column > last)
+            batch = [value for (value,) in query.order_by(column).limit(self.batch_size)]
+            db.session.commit()  # end the read transaction between batches
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
+            if self.pause:
+                time.sleep(self.pause)
+
+    def _release_unreferenced(self, report, cutoff):
+        # Uploads no User or JobApplication row points at, e.g. resumes of deleted applications
+        for ids in self._batches(StoredResume.id, StoredResume.created_on < cutoff):
+            values = [str(resume_id) for resume_id in ids]
+            referenced = {value for model in (User, JobApplication)
+                          for (value,) in db.session.query(model.resume_path).filter(model.resume_path.in_(values))}
+            for value in values:
+                if value not in referenced:
+                    freed = self.store.release(value)
+                    report.released += 1
+                    gc_deleted.inc(kind="upload")
+                    if freed:
+                        report.blobs_deleted += 1
+                        report.bytes_reclaimed += freed
+                        gc_deleted.inc(kind="blob")
+
+    def _reconcile_blobs(self, report, cutoff):
+        uploads = db.session.query(func.count(StoredResume.id)) \
+            .filter(StoredResume.file_hash == ResumeBlob.file_hash).scalar_subquery()
+        for hashes in self._batches(ResumeBlob.file_hash):
+            # One statement per batch, so an upload committing in between cannot be miscounted
+            report.refcounts_fixed += ResumeBlob.query \
+                .filter(ResumeBlob.file_hash.in_(hashes), ResumeBlob.ref_count != uploads) \
+                .update({ResumeBlob.ref_count: uploads}, synchronize_session=False)
+            db.session.commit()
+            # Blobs referenced or released within the grace period are left for a later run
+            unused = db.session.query(ResumeBlob.file_hash, ResumeBlob.size) \
+                .filter(ResumeBlob.file_hash.in_(hashes), ResumeBlob.ref_count <= 0,
+                        ResumeBlob.created_on < cutoff, ResumeBlob.updated_on < cutoff).all()
+            db.session.commit()
+            for file_hash, size in unused:
+                deleted = ResumeBlob.query.filter(ResumeBlob.file_hash == file_hash, ResumeBlob.ref_count <= 0,
+                                                  ResumeBlob.updated_on < cutoff) \
+                    .delete(synchronize_session=False)
+                if deleted:
+                    self.store.delete_blob_in_transaction(file_hash)
+                db.session.commit()
+                if deleted:
+                    self.store.run_delete_hooks(file_hash)
+                    report.blobs_deleted += 1
+                    report.bytes_reclaimed += size
+                    gc_deleted.inc(kind="blob")
+
+    def _delete_orphan_blobs(self, report, cutoff):
+        # Blobs in storage without a ResumeBlob row, left by uploads that failed after writing them
+        batch = []
+        for key, size, modified in self.store.storage.iter_keys():
+            file_hash = key.rsplit("/", 1)[-1]
+            # Only keys in the store's own layout; anything else sharing the bucket is left alone
+            if _BLOB_HASH.fullmatch(file_hash) and key == self.store.blob_key(file_hash) and modified < cutoff:
+                batch.append((file_hash, size))
+            if len(batch) >= self.batch_size:
+                self._delete_unknown_blobs(report, batch)
+                batch = []
+        if batch:
+            self._delete_unknown_blobs(report, batch)
+
+    def _delete_unknown_blobs(self, report, batch):
+        known = {file_hash for (file_hash,) in db.session.query(ResumeBlob.file_hash)
+                 .filter(ResumeBlob.file_hash.in_([file_hash for file_hash, _ in batch]))}
+        db.session.commit()
+        for file_hash, size in batch:
+            # Checked again right before deleting: an upload of the same file commits its row first,
+            # then writes the blob again
+            if file_hash not in known and ResumeBlob.query.get(file_hash) is None:
+                self.store.delete_blob(file_hash)
+                report.blobs_deleted += 1
+                report.bytes_reclaimed += size
+                gc_deleted.inc(kind="blob")
+        if self.pause:
+            time.sleep(self.pause)
+
+    def _forget_orphan_text(self):
+        # Extracted text (and its search index entry) of blobs deleted while a hook was failing
+        orphaned = ~db.session.query(ResumeBlob.file_hash).filter(ResumeBlob.file_hash == ResumeText.file_hash).exists()
+        for hashes in self._batches(ResumeText.file_hash, orphaned):
+            for file_hash in hashes:
+                for hook in self.store.on_delete:
+                    hook(file_hash)
+
+    def _prune_upload_text(self, report, cutoff):
+        # Text kept so a resubmitted file is not parsed again, once resubmissions are no longer expected
+        for hashes in self._batches(ResumeUpload.file_hash, ResumeUpload.created_on < cutoff):
+            report.upload_texts_pruned += ResumeUpload.query \
+                .filter(ResumeUpload.file_hash.in_(hashes), ResumeUpload.created_on < cutoff) \
+                .delete(synchronize_session=False)
+            db.session.commit()
+
+    def _delete_legacy_files(self, report, cutoff):
+        # Files saved in the upload folder before the store existed, which no row references any more
+        referenced = set()
+        for model in (User, JobApplication):
+            for (resume_path,) in db.session.query(model.resume_path).filter(model.resume_path.isnot(None)) \
+                    .yield_per(self.batch_size):
+                if not is_store_id(resume_path):
+                    referenced.add(os.path.basename(resume_path))
+        db.session.commit()
+        with os.scandir(self.store.legacy_dir) as entries:
+            for entry in entries:
+                extension = entry.name.rsplit(".", 1)[-1].lower() if "." in entry.name else ""
+                if not entry.is_file() or extension not in MIME_TYPES or entry.name in referenced:
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    report.files_deleted += 1
+                    report.bytes_reclaimed += stat.st_size
+                    gc_deleted.inc(kind="legacy_file")
@@ -0,0 +1,202 @@
+# app/services/resume_index.py
+"""Background text extraction and full-text search for stored resumes.
+
+Every resume written to the store is queued for text extraction (PDF through
+the sandboxed PDF extractor, DOCX from its document XML, TXT as is) on a
+small worker pool. The normalized text is stored once per distinct file in
+``ResumeText`` and indexed in an SQLite FTS5 table, so searching resume
+content is an index lookup and never parses a file on the request path.
+Other databases fall back to a substring match on the stored text.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from xml.etree import ElementTree
+
+from sqlalchemy import func, text as sql
+
+from app import db
+from app.models import RESUME_TEXT_FTS, ResumeBlob, ResumeText, StoredResume
+from app.services.metrics import metrics
+
+indexed_resumes = metrics.counter("resume_index_extractions_total", "Resume text extractions, by outcome")
+
+# Bytes of document XML read from a DOCX at most, so a zip bomb cannot exhaust memory
+DOCX_MAX_XML_BYTES = 20 * 1024 * 1024
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Words around the match shown in a search result snippet
+SNIPPET_TOKENS = 16
+
+
+def normalize_text(text):
+    """NFKC-normalize ``text`` and collapse every run of whitespace to one space."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def docx_text(path):
+    """Text of the paragraphs of a DOCX file, one per line."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise ValueError(f"DOCX document is larger than {DOCX_MAX_XML_BYTES} bytes")
+        with archive.open(info) as document:
+            root = ElementTree.fromstring(document.read(DOCX_MAX_XML_BYTES + 1))
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NAMESPACE}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD_NAMESPACE}t" and node.text:
+                parts.append(node.text)
+            elif node.tag in (f"{_WORD_NAMESPACE}tab", f"{_WORD_NAMESPACE}br"):
+                parts.append(" ")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def fts_query(query):
+    """FTS5 query matching every word of ``query``; operators and quotes in it are taken literally."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+class ResumeIndexer:
+    """Extracts and indexes resume text on a bounded thread pool.
+
+    ``store`` is the ``ResumeStore`` whose uploads are indexed; the indexer
+    registers itself on the store's hooks. With ``RESUME_INDEX_EAGER`` set the
+    extraction runs inline (used by the tests). Callables in ``on_indexed``
+    are called with the file hash, file name and normalized text of each
+    resume once its text is stored.
+    """
+
+    def __init__(self, app, store, pdf_extractor, max_workers=1):
+        self.app = app
+        self.store = store
+        self.pdf_extractor = pdf_extractor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-index")
+        self._queued = set()  # file hashes waiting for or in extraction
+        self._lock = threading.Lock()
+        self.on_indexed = []
+        store.on_store.append(lambda resume: self.submit(resume.file_hash, resume.original_name))
+        store.on_delete.append(self.forget)
+
+    def submit(self, file_hash, name):
+        """Queue extraction of a stored file unless its text is already indexed or queued."""
+        row = ResumeText.query.get(file_hash)
+        if row is not None and row.status == "complete":
+            return
+        with self._lock:
+            if file_hash in self._queued:
+                return
+            self._queued.add(file_hash)
+        if row is None:
+            db.session.add(ResumeText(file_hash=file_hash, status="queued"))
+            db.session.commit()
+        if self.app.config.get("RESUME_INDEX_EAGER"):
+            try:
+                self.index(file_hash, name)
+            finally:
+                self._done(file_hash)
+        else:
+            self._executor.submit(self._run, file_hash, name)
+
+    def recover(self):
+        """Queue every stored file whose text was never indexed, e.g. after a restart."""
+        pending = db.session.query(ResumeBlob.file_hash, func.min(StoredResume.original_name)) \
+            .join(StoredResume, StoredResume.file_hash == ResumeBlob.file_hash) \
+            .outerjoin(ResumeText, ResumeText.file_hash == ResumeBlob.file_hash) \
+            .filter(ResumeText.file_hash.is_(None) | (ResumeText.status == "queued")) \
+            .group_by(ResumeBlob.file_hash).all()
+        for file_hash, name in pending:
+            self.submit(file_hash, name)
+        return len(pending)
+
+    def _done(self, file_hash):
+        with self._lock:
+            self._queued.discard(file_hash)
+
+    def _run(self, file_hash, name):
+        try:
+            with self.app.app_context():
+                try:
+                    self.index(file_hash, name)
+                finally:
+                    db.session.remove()
+        finally:
+            self._done(file_hash)
+
+    def extract(self, path, name):
+        """Raw text of the resume file at ``path``; ``name`` gives its type."""
+        extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+        if extension == "pdf":
+            with open(path, "rb") as f:
+                return self.pdf_extractor.extract(f.read(), page_separator="\n")
+        if extension == "docx":
+            return docx_text(path)
+        if extension == "txt":
+            with open(path, "rb") as f:
+                return f.read().decode("utf-8", errors="replace")
+        raise ValueError(f"Cannot extract text from .{extension} files")
+
+    def index(self, file_hash, name):
+        """Extract, store and index the text of one stored file."""
+        row = ResumeText.query.get(file_hash) or ResumeText(file_hash=file_hash)
+        try:
+            with self.store.local_copy(file_hash) as path:
+                text = normalize_text(self.extract(path, name))
+        except Exception as e:
+            print(f'{e}')
+            indexed_resumes.inc(outcome="failed")
+            row.status, row.text, row.text_hash, row.error = "failed", None, None, str(e)[:255]
+        else:
+            indexed_resumes.inc(outcome="complete")
+            row.status, row.text, row.error = "complete", text, None
+            row.text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        row.indexed_on = datetime.utcnow()
+        db.session.add(row)
+        if self._has_fts():
+            db.session.execute(sql(f"DELETE FROM {RESUME_TEXT_FTS} WHERE file_hash = :file_hash"),
+                               {"file_hash": file_hash})
+            if row.text:
+                db.session.execute(sql(f"INSERT INTO {RESUME_TEXT_FTS} (file_hash, text) VALUES (:file_hash, :text)"),
+                                   {"file_hash": file_hash, "text": row.text})
+        db.session.commit()
+        if row.status == "complete":
+            for hook in self.on_indexed:
+                try:
+                    hook(file_hash, name, row.text)
+                except Exception as e:
+                    print(f'{e}')
+        return row
+
+    def forget(self, file_hash):
+        """Drop the text and index entry of a deleted file."""
+        ResumeText.query.filter_by(file_hash=file_hash).delete(synchronize_session=False)
+        if self._has_fts():
+            db.session.execute(sql(f"DELETE FROM {RESUME_TEXT_FTS} WHERE file_hash = :file_hash"),
+                               {"file_hash": file_hash})
+        db.session.commit()
+
+    def _has_fts(self):
+        return db.engine.dialect.name == "sqlite"
+
+    def search(self, query, limit=50):
+        """``(file_hash, snippet)`` of the indexed files containing every word of ``query``, best match first."""
+        match = fts_query(query)
+        if not match:
+            return []
+        if self._has_fts():
+            rows = db.session.execute(sql(
+                f"SELECT file_hash, snippet({RESUME_TEXT_FTS}, 1, '', '', '…', {SNIPPET_TOKENS}) "
+                f"FROM {RESUME_TEXT_FTS} WHERE {RESUME_TEXT_FTS} MATCH :match ORDER BY rank LIMIT :limit"
+            ), {"match": match, "limit": limit})
+            return [(file_hash, snippet) for file_hash, snippet in rows]
+
+        words = re.findall(r"\w+", query)
+        rows = ResumeText.query.filter(ResumeText.status == "complete",
+                                       *[ResumeText.text.ilike(f"%{word}%") for word in words]).limit(limit).all()
+        return [(row.file_hash, row.text[:200]) for row in rows]
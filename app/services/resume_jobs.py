@@ -0,0 +1,285 @@
+# app/services/resume_jobs.py
+"""Bounded background worker pool for LLM resume analysis jobs.
+
+Jobs are persisted as ``ResumeJob`` rows before they are handed to the pool.
+Each row names the process that holds it and carries a lease that process
+keeps renewing; anything left queued or running by a process that stopped is
+claimed again by ``recover()`` once its lease runs out. While a job runs, the
+tokens its task produces are pushed to the job's Socket.IO room as they arrive.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db, socketio
+from app.models import ResumeJob
+from app.services.metrics import metrics
+
+pending_jobs = metrics.gauge("resume_jobs_pending", "Resume analysis jobs queued or running")
+
+JOB_STATUS_MESSAGES = {
+    "queued": "Task queued",
+    "running": "Task running",
+    "complete": "Task complete",
+    "failed": "Task Failed",
+}
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFullError(Exception):
+    """Raised when the pool already holds its maximum number of pending jobs."""
+
+
+def user_room(user_id):
+    """Socket.IO room every page of a logged-in user joins."""
+    return f"user_{user_id}"
+
+
+def llm_user_key(user_id):
+    """Key the LLM limiter schedules a user's model calls under; anonymous users share one key."""
+    return f"user:{user_id}" if user_id is not None else "anonymous"
+
+
+def job_user_key(job):
+    """Key the LLM limiter admitted ``job`` under, which its model calls are scheduled under too."""
+    return job.admission_key or llm_user_key(job.user_id)
+
+
+def job_room(job_id):
+    """Socket.IO room streaming the tokens of one job."""
+    return f"resume_job_{job_id}"
+
+
+def job_payload(job, partial=None):
+    """JSON-serializable view of a job for the status endpoint and push events.
+
+    ``partial`` is the text streamed so far and stands in for the result while the job runs.
+    """
+    return {
+        "job_id": job.id,
+        "task": job.task,
+        "posting_id": job.posting_id,
+        "state": job.status,
+        "status": JOB_STATUS_MESSAGES[job.status],
+        "result": job.result if job.result is not None else partial,
+    }
+
+
+class ResumeJobQueue:
+    """Runs registered resume tasks on a bounded thread pool.
+
+    ``tasks`` maps a task name to a callable taking the ``ResumeJob`` and an
+    ``on_token`` callback and returning the result text. With
+    ``RESUME_JOBS_EAGER`` set the job runs inline in ``submit`` (used by the
+    tests).
+
+    With a ``limiter`` every job is admitted by it before it is persisted, so
+    over-limit submissions are rejected with ``LLMRejected`` up front.
+
+    Submissions with the ``dedupe_key`` of a job still queued or running get
+    that job back instead of starting another one.
+
+    Every job this queue holds is leased to it for ``lease`` seconds and
+    ``renew_leases()`` must run well within that. Status changes are
+    conditional updates on the owner, so a job another process has claimed
+    after the lease ran out is neither started nor finished here.
+    """
+
+    def __init__(self, app, tasks, max_workers=2, max_pending=32, limiter=None, lease=120):
+        self.app = app
+        self.tasks = tasks
+        self.max_pending = max_pending
+        self.limiter = limiter
+        self.lease = timedelta(seconds=lease)
+        # Unique per queue, so a restarted process never mistakes its predecessor's jobs for its own
+        self.worker_id = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._admissions = {}  # job id -> limiter admission, released when the job ends
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-job")
+        self._pending = 0
+        self._partials = {}  # job id -> (list of tokens streamed so far, their total length)
+        self._inflight = {}  # dedupe key -> id of the queued or running job
+        self._inflight_keys = {}  # job id -> its dedupe key
+        self._lock = threading.Lock()
+
+    def submit(self, task, resume_text, user_id=None, admission_key=None, posting_id=None, dedupe_key=None):
+        """Persist a new job and hand it to the pool, or return the in-flight job with the same ``dedupe_key``.
+
+        ``posting_id`` is set for batch jobs covering a recruiter posting.
+        ``admission_key`` identifies the submitter to the limiter (defaults to
+        the user's LLM key). Raises ``QueueFullError`` when the pool is full and
+        ``LLMRejected`` when the limiter turns the job away.
+        """
+        if task not in self.tasks:
+            raise ValueError(f"Unknown resume task {task!r}")
+        if dedupe_key is not None:
+            with self._lock:
+                inflight_id = self._inflight.get(dedupe_key)
+            job = ResumeJob.query.get(inflight_id) if inflight_id else None
+            if job is not None and job.status in ("queued", "running"):
+                return job
+        admission_key = admission_key or llm_user_key(user_id)
+        admission = self.limiter.admit(admission_key) if self.limiter else None
+        try:
+            self._reserve()
+        except QueueFullError:
+            if admission:
+                admission.release()
+            raise
+        try:
+            job = ResumeJob(id=uuid.uuid4().hex, user_id=user_id, task=task, resume_text=resume_text,
+                            posting_id=posting_id, admission_key=admission_key, owner=self.worker_id,
+                            lease_expires=datetime.utcnow() + self.lease)
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            self._release()
+            if admission:
+                admission.release()
+            raise
+        with self._lock:
+            if admission:
+                self._admissions[job.id] = admission
+            if dedupe_key is not None:
+                self._inflight[dedupe_key] = job.id
+                self._inflight_keys[job.id] = dedupe_key
+        self._dispatch(job.id)
+        return job
+
+    def recover(self):
+        """Claim and re-enqueue the queued or running jobs whose lease has run out.
+
+        Each job is claimed with a conditional update, so when several
+        processes recover at once every job goes to exactly one of them, and
+        jobs a live process still holds are left alone. Returns the number of
+        jobs claimed.
+        """
+        now = datetime.utcnow()
+        expired = ResumeJob.lease_expires.is_(None) | (ResumeJob.lease_expires < now)
+        candidates = [job_id for (job_id,) in
+                      db.session.query(ResumeJob.id).filter(ResumeJob.status.in_(ACTIVE_STATUSES), expired)]
+        claimed = []
+        for job_id in candidates:
+            if ResumeJob.query.filter(ResumeJob.id == job_id, ResumeJob.status.in_(ACTIVE_STATUSES), expired).update(
+                    {"status": "queued", "owner": self.worker_id, "lease_expires": now + self.lease},
+                    synchronize_session=False):
+                claimed.append(job_id)
+        db.session.commit()
+        for job in ResumeJob.query.filter(ResumeJob.id.in_(claimed)).all():
+            self._reserve(force=True)
+            if self.limiter:
+                admission = self.limiter.admit(job_user_key(job), force=True)
+                with self._lock:
+                    self._admissions[job.id] = admission
+            self._dispatch(job.id)
+        return len(claimed)
+
+    def renew_leases(self):
+        """Extend the lease on every job this queue holds; returns how many were renewed."""
+        renewed = ResumeJob.query.filter(
+            ResumeJob.owner == self.worker_id, ResumeJob.status.in_(ACTIVE_STATUSES)
+        ).update({"lease_expires": datetime.utcnow() + self.lease}, synchronize_session=False)
+        db.session.commit()
+        return renewed
+
+    def scheduled_heartbeat(self):
+        """For the background scheduler: renew this queue's leases, then claim jobs whose lease ran out."""
+        with self.app.app_context():
+            try:
+                self.renew_leases()
+                self.recover()
+            except Exception as e:
+                print(f'{e}')
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def partial_result(self, job_id):
+        """Text streamed so far by a running job, or ``None``."""
+        with self._lock:
+            partial = self._partials.get(job_id)
+            return "".join(partial[0]) if partial is not None else None
+
+    def _reserve(self, force=False):
+        with self._lock:
+            if not force and self._pending >= self.max_pending:
+                raise QueueFullError("Resume analysis queue is full")
+            self._pending += 1
+            pending_jobs.set(self._pending)
+
+    def _release(self, job_id=None):
+        with self._lock:
+            self._pending -= 1
+            pending_jobs.set(self._pending)
+            admission = self._admissions.pop(job_id, None)
+            dedupe_key = self._inflight_keys.pop(job_id, None)
+            if dedupe_key is not None and self._inflight.get(dedupe_key) == job_id:
+                del self._inflight[dedupe_key]
+        if admission:
+            admission.release()
+
+    def _dispatch(self, job_id):
+        if self.app.config.get("RESUME_JOBS_EAGER"):
+            try:
+                self._execute(job_id)
+            finally:
+                self._release(job_id)
+        else:
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                try:
+                    self._execute(job_id)
+                finally:
+                    db.session.remove()
+        finally:
+            self._release(job_id)
+
+    def _execute(self, job_id):
+        started = ResumeJob.query.filter_by(id=job_id, owner=self.worker_id, status="queued").update(
+            {"status": "running"}, synchronize_session=False)
+        db.session.commit()
+        if not started:
+            return  # gone, or claimed by another process after this one's lease ran out
+        job = ResumeJob.query.get(job_id)
+
+        with self._lock:
+            self._partials[job_id] = ([], 0)
+
+        def on_token(token):
+            # offset lets a client that joined mid-stream drop tokens its snapshot already had
+            with self._lock:
+                tokens, offset = self._partials[job_id]
+                tokens.append(token)
+                self._partials[job_id] = (tokens, offset + len(token))
+            socketio.emit("resume_job_token", {"job_id": job_id, "offset": offset, "token": token}, to=job_room(job_id))
+
+        try:
+            result, status = self.tasks[job.task](job, on_token), "complete"
+        except Exception as e:
+            print(f'{e}')
+            db.session.rollback()
+            result, status = "Could not analyze this resume", "failed"
+        finished = ResumeJob.query.filter_by(id=job_id, owner=self.worker_id).update(
+            {"result": result, "status": status, "finished_on": datetime.utcnow(), "lease_expires": None},
+            synchronize_session=False)
+        db.session.commit()
+        with self._lock:
+            self._partials.pop(job_id, None)
+        if not finished:
+            return  # another process claimed the job and reports its own result
+        job = ResumeJob.query.get(job_id)
+
+        payload = job_payload(job)
+        socketio.emit("resume_job_update", payload, to=job_room(job_id))
+        if job.user_id is not None:
+            socketio.emit("resume_job_update", payload, to=user_room(job.user_id))
@@ -0,0 +1,222 @@
+# app/services/resume_preview.py
+"""First-page previews and text snippets of stored resumes.
+
+Once the indexer has extracted a resume's text, a preview image of its
+first page and a short snippet are written to an on-disk cache keyed by the
+file's SHA-256. PDFs are rendered with ``pdftoppm`` when it is installed;
+other files (and PDFs without it) get an SVG of their opening lines. The
+cache is bounded by a byte budget and evicts the least recently used
+previews; an evicted preview is regenerated from the stored text, never by
+parsing the file again on the request path. Because previews are
+content-addressed they can be served with a year-long, immutable cache
+lifetime.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+from app import db
+from app.models import ResumeText
+from app.services.metrics import metrics
+
+previews_generated = metrics.counter("resume_previews_generated_total", "Resume previews rendered, by image format")
+preview_evictions = metrics.counter("resume_preview_evictions_total", "Resume previews evicted from the disk cache")
+
+# Characters of resume text kept as the snippet
+SNIPPET_CHARS = 280
+# Lines and characters per line drawn on an SVG preview
+SVG_LINES = 40
+SVG_LINE_CHARS = 72
+# Width in pixels of rendered PDF previews
+PNG_WIDTH = 400
+
+
+def make_snippet(text, length=SNIPPET_CHARS):
+    """The start of ``text`` cut at a word boundary, with an ellipsis if anything was cut."""
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def render_svg(text):
+    """A page-shaped SVG showing the opening lines of ``text``."""
+    lines = textwrap.wrap(text, SVG_LINE_CHARS)[:SVG_LINES]
+    rows = "".join(f'<text x="24" y="{40 + 18 * index}">{escape(line)}</text>' for index, line in enumerate(lines))
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="612" height="792" viewBox="0 0 612 792">'
+        '<rect width="612" height="792" fill="white"/>'
+        f'<g font-family="sans-serif" font-size="12" fill="#222">{rows}</g></svg>'
+    ).encode("utf-8")
+
+
+def render_pdf_png(path, pdftoppm, timeout=20):
+    """PNG of the first page of the PDF at ``path``, rendered by ``pdftoppm``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, "page")
+        subprocess.run([pdftoppm, "-png", "-f", "1", "-l", "1", "-singlefile", "-scale-to-x", str(PNG_WIDTH),
+                        "-scale-to-y", "-1", path, prefix], check=True, timeout=timeout, capture_output=True)
+        with open(prefix + ".png", "rb") as f:
+            return f.read()
+
+
+class PreviewCache:
+    """Previews under ``root`` (``ab/<hash>.png|svg`` plus ``ab/<hash>.txt``) within ``max_bytes``.
+
+    The directory is the only state, so every worker sharing ``root`` sees
+    the previews the others wrote, and the budget covers all of them. A
+    preview's last use is the modification time of its files, which ``get``
+    bumps; ``put`` measures the directory and evicts the least recently used
+    previews beyond the budget.
+    """
+
+    IMAGE_EXTENSIONS = ("png", "svg")
+    # Suffix of files still being written, which are neither read nor counted
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(self, root, max_bytes=100 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _dir(self, file_hash):
+        return os.path.join(self.root, file_hash[:2])
+
+    def _usage(self):
+        """``(file hash, (bytes on disk, last use))`` of every cached preview, least recently used first."""
+        found = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(self.PARTIAL_SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                except FileNotFoundError:
+                    continue  # evicted by another worker in the meantime
+                file_hash = filename.partition(".")[0]
+                size, used = found.get(file_hash, (0, 0))
+                found[file_hash] = (size + stat.st_size, max(used, stat.st_mtime_ns))
+        return sorted(found.items(), key=lambda item: item[1][1])
+
+    def image_name(self, file_hash):
+        """Path of the cached image relative to the root, or ``None``."""
+        for extension in self.IMAGE_EXTENSIONS:
+            name = f"{file_hash[:2]}/{file_hash}.{extension}"
+            if os.path.isfile(os.path.join(self.root, name)):
+                return name
+        return None
+
+    def get(self, file_hash):
+        """``(image name, snippet)`` of a cached preview, marking it recently used, or ``None``."""
+        image = self.image_name(file_hash)
+        if image is None:
+            return None
+        snippet_path = os.path.join(self._dir(file_hash), f"{file_hash}.txt")
+        try:
+            with open(snippet_path, encoding="utf-8") as f:
+                snippet = f.read()
+            now = time.time_ns()  # finer than the filesystem's own clock, so the LRU order is exact
+            os.utime(snippet_path, ns=(now, now))
+        except FileNotFoundError:
+            return None
+        return image, snippet
+
+    def put(self, file_hash, image, extension, snippet):
+        """Store a preview and evict the least recently used ones beyond the budget."""
+        directory = self._dir(file_hash)
+        os.makedirs(directory, exist_ok=True)
+        files = ((f"{file_hash}.{extension}", image), (f"{file_hash}.txt", snippet.encode("utf-8")))
+        for name, data in files:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=self.PARTIAL_SUFFIX)
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            now = time.time_ns()
+            os.utime(tmp_path, ns=(now, now))
+            os.replace(tmp_path, os.path.join(directory, name))
+        usage = self._usage()
+        total = sum(size for _, (size, _) in usage)
+        for old_hash, (old_size, _) in usage:
+            if total <= self.max_bytes:
+                break
+            if old_hash == file_hash:
+                continue
+            total -= old_size
+            preview_evictions.inc()
+            for old_extension in self.IMAGE_EXTENSIONS + ("txt",):
+                try:
+                    os.unlink(os.path.join(self._dir(old_hash), f"{old_hash}.{old_extension}"))
+                except FileNotFoundError:
+                    pass
+
+
+class ResumePreviewer:
+    """Renders previews as the indexer finishes each resume, and again on a cache miss.
+
+    Registers itself on the ``indexer``'s ``on_indexed`` hook, so previews are
+    rendered on the indexing workers. Misses are regenerated from the stored
+    text on a small pool of their own (inline with ``RESUME_INDEX_EAGER``).
+    """
+
+    def __init__(self, app, cache, store, indexer, pdftoppm=None, max_workers=1):
+        self.app = app
+        self.cache = cache
+        self.store = store
+        self.pdftoppm = pdftoppm if pdftoppm is not None else shutil.which("pdftoppm")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-preview")
+        self._queued = set()
+        self._lock = threading.Lock()
+        indexer.on_indexed.append(self.generate)
+
+    def generate(self, file_hash, name, text):
+        """Render and cache the preview of one stored file from its extracted ``text``."""
+        image, extension = None, "svg"
+        if self.pdftoppm and name.lower().endswith(".pdf"):
+            try:
+                with self.store.local_copy(file_hash) as path:
+                    image, extension = render_pdf_png(path, self.pdftoppm), "png"
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f'{e}')  # fall back to the text preview
+                extension = "svg"
+        if image is None:
+            image = render_svg(text)
+        self.cache.put(file_hash, image, extension, make_snippet(text))
+        previews_generated.inc(format=extension)
+
+    def preview(self, file_hash, name):
+        """``(image name, snippet)`` if cached; otherwise queue the preview and return ``None``."""
+        cached = self.cache.get(file_hash)
+        if cached is None:
+            self.submit(file_hash, name)
+        return cached
+
+    def submit(self, file_hash, name):
+        with self._lock:
+            if file_hash in self._queued:
+                return
+            self._queued.add(file_hash)
+        if self.app.config.get("RESUME_INDEX_EAGER"):
+            self._regenerate(file_hash, name)
+        else:
+            self._executor.submit(self._run, file_hash, name)
+
+    def _run(self, file_hash, name):
+        with self.app.app_context():
+            try:
+                self._regenerate(file_hash, name)
+            finally:
+                db.session.remove()
+
+    def _regenerate(self, file_hash, name):
+        try:
+            row = ResumeText.query.get(file_hash)
+            # Resumes not indexed yet get their preview when the indexer finishes them
+            if row is not None and row.status == "complete":
+                self.generate(file_hash, name, row.text)
+        finally:
+            with self._lock:
+                self._queued.discard(file_hash)
@@ -0,0 +1,358 @@
+# app/services/resume_store.py
+"""Content-addressed, deduplicated storage for uploaded resumes.
+
+Each distinct file is written once, under its SHA-256 in a sharded key
+layout (``ab/cd/abcd…``), so identical uploads share one blob and no single
+directory grows with the number of resumes. The bytes live in a pluggable
+``BlobStorage`` backend (a local directory or an S3-compatible bucket). Every upload gets a
+``StoredResume`` row (owner, original name, size, MIME type, hash) whose id
+is what ``User.resume_path`` and ``JobApplication.resume_path`` hold; a
+``ResumeBlob`` row counts those references and the blob is deleted when the
+last one is released.
+
+Uploads are streamed into a temporary file in fixed-size chunks; the
+SHA-256, the size cap and the file-type check by magic bytes all happen in
+that single pass, and the file is then renamed into place atomically (or
+uploaded to the bucket). An upload never has to fit in memory. Its
+reference is committed before the blob is written or reused, and blobs are
+deleted while their ``ResumeBlob`` row's deletion is still uncommitted, so
+an upload can never end up pointing at a blob that is being deleted.
+
+Rows written before the store existed hold a file path instead of an id;
+``resolve()`` still finds those files.
+"""
+
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from io import BytesIO
+
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import safe_join
+
+from app import db
+from app.models import JobApplication, ResumeBlob, StoredResume, User
+from app.services.blob_storage import STREAM_CHUNK_SIZE
+
+# Bytes read from an upload at a time
+CHUNK_SIZE = 64 * 1024
+# Bytes of the start of a file the type check looks at
+SNIFF_BYTES = 1024
+
+# What a resume_path value points at: the file on this host (None for a remote blob), the name to
+# offer on download, its type, its SHA-256 (None for legacy files, which are not content-addressed),
+# its size in bytes, and when it was uploaded (a naive UTC datetime)
+ResolvedResume = namedtuple("ResolvedResume", ["path", "name", "mime", "file_hash", "size", "modified"])
+
+MIME_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "txt": "text/plain",
+}
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload is empty, over the size limit, or not the type its name claims."""
+
+
+def _extension(filename):
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+
+def check_magic(filename, head):
+    """Raise ``UploadRejected`` unless ``head`` (the start of the file) matches the extension of ``filename``."""
+    extension = _extension(filename)
+    if extension == "pdf":
+        matches = b"%PDF-" in head  # readers accept a header anywhere in the first KB
+    elif extension == "docx":
+        matches = head.startswith(b"PK\x03\x04")  # a docx is a ZIP archive
+    elif extension == "txt":
+        matches = b"\x00" not in head and not head.startswith((b"%PDF-", b"PK\x03\x04"))
+    else:
+        matches = False
+    if not matches:
+        raise UploadRejected(f"File content does not look like a .{extension or '?'} file")
+
+
+def guess_mime(filename):
+    return MIME_TYPES.get(_extension(filename)) or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def is_store_id(resume_path):
+    """True when a resume_path value is a StoredResume id rather than a legacy file path."""
+    return bool(resume_path) and resume_path.isdigit()
+
+
+class ResumeStore:
+    """Resume blobs in ``storage``; ``legacy_dir`` is where pre-store uploads were saved.
+
+    Callables in ``on_store`` are called with each new ``StoredResume`` row,
+    those in ``on_delete`` with the SHA-256 of each deleted blob.
+    """
+
+    def __init__(self, storage, legacy_dir=None):
+        self.storage = storage
+        self.legacy_dir = legacy_dir
+        self.on_store = []
+        self.on_delete = []
+        self._tmp_dir = storage.staging_dir() or tempfile.gettempdir()
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def blob_key(self, file_hash):
+        """Storage key of a blob."""
+        return f"{file_hash[:2]}/{file_hash[2:4]}/{file_hash}"
+
+    def blob_path(self, file_hash):
+        """Path of a blob on this host, or ``None`` with a remote backend."""
+        return self.storage.local_path(self.blob_key(file_hash))
+
+    def open(self, resume):
+        """Binary file object streaming a ``ResolvedResume``."""
+        if resume.file_hash:
+            return self.storage.open(self.blob_key(resume.file_hash))
+        return open(resume.path, "rb")
+
+    @contextmanager
+    def local_copy(self, file_hash):
+        """Path of a blob on this host, downloading it to a temporary file for a remote backend."""
+        path = self.blob_path(file_hash)
+        if path is not None:
+            yield path
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp, self.storage.open(self.blob_key(file_hash)) as blob:
+                shutil.copyfileobj(blob, tmp, STREAM_CHUNK_SIZE)
+            yield tmp_path
+        finally:
+            os.unlink(tmp_path)
+
+    def _receive(self, stream, original_name, max_bytes):
+        """Copy ``stream`` to a temporary file; returns its path, SHA-256 and size."""
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadRejected(f"File is larger than {max_bytes} bytes")
+                    if len(head) < SNIFF_BYTES:
+                        head += chunk[:SNIFF_BYTES - len(head)]
+                        if len(head) == SNIFF_BYTES:
+                            check_magic(original_name, head)
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            if size == 0:
+                raise UploadRejected("File is empty")
+            if len(head) < SNIFF_BYTES:
+                check_magic(original_name, head)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def _commit_blob(self, tmp_path, file_hash, overwrite=False):
+        key = self.blob_key(file_hash)
+        if not overwrite and self.storage.exists(key):
+            os.unlink(tmp_path)  # the same file is already stored
+            return
+        self.storage.put_file(key, tmp_path)
+
+    def _add_reference(self, file_hash, size):
+        """Count one more reference to a blob; returns True when this created its ``ResumeBlob`` row."""
+        # The counter is bumped in SQL so concurrent uploads of the same file do not lose increments
+        created = False
+        while True:
+            updated = ResumeBlob.query.filter_by(file_hash=file_hash) \
+                .update({ResumeBlob.ref_count: ResumeBlob.ref_count + 1, ResumeBlob.updated_on: datetime.utcnow()},
+                        synchronize_session=False)
+            if updated:
+                return created
+            try:
+                db.session.add(ResumeBlob(file_hash=file_hash, size=size, ref_count=0))
+                db.session.flush()
+                created = True
+            except IntegrityError:
+                db.session.rollback()  # another upload of the same file created the row first
+
+    def put(self, data, original_name, owner_id=None, max_bytes=None):
+        """Store ``data`` (bytes) and return its ``StoredResume`` row."""
+        return self.put_stream(BytesIO(data), original_name, owner_id=owner_id, max_bytes=max_bytes)
+
+    def put_stream(self, stream, original_name, owner_id=None, max_bytes=None):
+        """Store an upload read from ``stream`` and return its ``StoredResume`` row.
+
+        Raises ``UploadRejected`` when the upload is empty, over ``max_bytes``
+        or not the type its name claims; nothing is stored then.
+        """
+        tmp_path, file_hash, size = self._receive(stream, original_name, max_bytes)
+        # The reference is committed before the blob is looked at, so from here on neither release()
+        # nor the garbage collector can delete the blob under this upload
+        try:
+            created = self._add_reference(file_hash, size)
+            resume = StoredResume(file_hash=file_hash, owner_id=owner_id, original_name=original_name,
+                                  size=size, mime=guess_mime(original_name))
+            db.session.add(resume)
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            os.unlink(tmp_path)
+            raise
+        try:
+            # A new row means any stored copy is an orphan that may be being deleted, so write ours over it
+            self._commit_blob(tmp_path, file_hash, overwrite=created)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            self.release(str(resume.id))
+            raise
+        for hook in self.on_store:
+            hook(resume)
+        return resume
+
+    def get(self, resume_id):
+        return StoredResume.query.get(int(resume_id)) if is_store_id(str(resume_id)) else None
+
+    def release(self, resume_path):
+        """Drop the reference a resume_path value holds; the blob goes with its last reference.
+
+        Returns the bytes freed: the blob's size if it was deleted, else 0.
+        """
+        resume = self.get(resume_path)
+        if resume is None:
+            return 0
+        file_hash = resume.file_hash
+        db.session.delete(resume)
+        ResumeBlob.query.filter_by(file_hash=file_hash) \
+            .update({ResumeBlob.ref_count: ResumeBlob.ref_count - 1}, synchronize_session=False)
+        size = db.session.query(ResumeBlob.size).filter_by(file_hash=file_hash).scalar() or 0
+        deleted = ResumeBlob.query.filter(ResumeBlob.file_hash == file_hash, ResumeBlob.ref_count <= 0) \
+            .delete(synchronize_session=False)
+        if deleted:
+            self.delete_blob_in_transaction(file_hash)
+        db.session.commit()
+        if not deleted:
+            return 0
+        self.run_delete_hooks(file_hash)
+        return size
+
+    def delete_blob_in_transaction(self, file_hash):
+        """Delete the bytes of a blob whose ``ResumeBlob`` row this transaction deleted, before it commits.
+
+        The deleted row stays locked until the commit, so an upload of the same
+        file waits to add its reference and then finds the blob gone and writes it again.
+        """
+        try:
+            self.storage.delete(self.blob_key(file_hash))
+        except BaseException:
+            db.session.rollback()
+            raise
+
+    def delete_blob(self, file_hash):
+        """Delete the bytes of a blob that has no ``ResumeBlob`` row and run the ``on_delete`` hooks."""
+        self.storage.delete(self.blob_key(file_hash))
+        self.run_delete_hooks(file_hash)
+
+    def run_delete_hooks(self, file_hash):
+        for hook in self.on_delete:
+            hook(file_hash)
+
+    def resolve(self, resume_path):
+        """The file a ``resume_path`` value points at, or ``None`` if it is missing."""
+        if not resume_path:
+            return None
+        if is_store_id(resume_path):
+            resume = self.get(resume_path)
+            if resume is None:
+                return None
+            # The reference count keeps the blob for as long as the row exists
+            return ResolvedResume(self.blob_path(resume.file_hash), resume.original_name, resume.mime, resume.file_hash,
+                                  resume.size, resume.created_on)
+
+        # Legacy rows hold an absolute path or "static/resumes/<name>", both for a file saved in the upload
+        # folder; only that folder is looked in, since resume_path values also arrive from URLs
+        if not self.legacy_dir:
+            return None
+        path = safe_join(self.legacy_dir, os.path.basename(resume_path))
+        if path is None or not os.path.isfile(path):
+            return None
+        name = os.path.basename(path)
+        stat = os.stat(path)
+        return ResolvedResume(path, name, guess_mime(name), None, stat.st_size, datetime.utcfromtimestamp(stat.st_mtime))
+
+    def owner_ids(self, resume_path):
+        """Ids of the users a ``resume_path`` value belongs to: the uploader, or the rows naming a legacy file."""
+        if is_store_id(resume_path):
+            resume = self.get(resume_path)
+            return {resume.owner_id} if resume is not None and resume.owner_id is not None else set()
+        name = os.path.basename(resume_path)
+        owners = set()
+        for model, owner in ((User, User.id), (JobApplication, JobApplication.user_id)):
+            matches = db.session.query(owner).filter((model.resume_path == name) | model.resume_path.endswith("/" + name))
+            owners.update(user_id for (user_id,) in matches)
+        return owners
+
+
+def migrate_legacy_resumes(store, keep=False):
+    """Move resumes that ``User``/``JobApplication`` rows reference by file path into the store.
+
+    Each row then holds a store id. The original files are deleted once every
+    row is migrated unless ``keep`` is set. Returns the number of rows migrated.
+    """
+    migrated, paths = 0, set()
+    for model, owner in ((User, lambda row: row.id), (JobApplication, lambda row: row.user_id)):
+        for row in model.query.filter(model.resume_path.isnot(None)).all():
+            if is_store_id(row.resume_path):
+                continue
+            resume = store.resolve(row.resume_path)
+            if resume is None:
+                continue
+            with open(resume.path, "rb") as f:
+                stored = store.put_stream(f, resume.name, owner_id=owner(row))
+            row.resume_path = str(stored.id)
+            db.session.commit()
+            paths.add(resume.path)
+            migrated += 1
+    if not keep:
+        for path in paths:
+            os.unlink(path)
+    return migrated
+
+
+def copy_blobs(source, store, keep=False):
+    """Copy every referenced blob missing from ``store``'s backend over from the ``source`` backend.
+
+    Used when switching backends (e.g. from a local directory to a bucket).
+    Source blobs are deleted after they are copied unless ``keep`` is set.
+    Returns the number of blobs copied.
+    """
+    copied = 0
+    for (file_hash,) in db.session.query(ResumeBlob.file_hash).all():
+        key = store.blob_key(file_hash)
+        if not source.exists(key):
+            continue
+        if not store.storage.exists(key):
+            fd, tmp_path = tempfile.mkstemp(dir=store._tmp_dir)
+            try:
+                with os.fdopen(fd, "wb") as tmp, source.open(key) as blob:
+                    shutil.copyfileobj(blob, tmp, STREAM_CHUNK_SIZE)
+                store.storage.put_file(key, tmp_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            copied += 1
+        if not keep:
+            source.delete(key)
+    return copied
@@ -0,0 +1,109 @@
+# app/services/review_search.py
+"""Helpers for the cacheable review search used by the reviews page."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+MIN_RATING = 1
+MAX_RATING = 5
+
+
+def _clean_text(value):
+    """Collapse whitespace and lowercase a free-text filter (the search is case-insensitive)."""
+    return " ".join((value or "").split()).lower()
+
+
+def _clamp_rating(value, default):
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(MIN_RATING, min(MAX_RATING, rating))
+
+
+def normalize_review_filters(values):
+    """Turn raw request values into the canonical filter dict for a review search.
+
+    Equivalent searches (different case, extra spaces, swapped rating bounds)
+    normalize to the same dict so they share one URL and one cache entry.
+    """
+    min_rating = _clamp_rating(values.get("min_rating"), MIN_RATING)
+    max_rating = _clamp_rating(values.get("max_rating"), MAX_RATING)
+    if min_rating > max_rating:
+        min_rating, max_rating = max_rating, min_rating
+    return {
+        "search_title": _clean_text(values.get("search_title")),
+        "search_location": _clean_text(values.get("search_location")),
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+    }
+
+
+def canonical_query_args(filters, page=1):
+    """Return the minimal query-string args for a filter dict, omitting defaults."""
+    args = {}
+    if filters["search_title"]:
+        args["search_title"] = filters["search_title"]
+    if filters["search_location"]:
+        args["search_location"] = filters["search_location"]
+    if filters["min_rating"] != MIN_RATING:
+        args["min_rating"] = filters["min_rating"]
+    if filters["max_rating"] != MAX_RATING:
+        args["max_rating"] = filters["max_rating"]
+    if page > 1:
+        args["page"] = page
+    return args
+
+
+def filter_hash(filters):
+    """Stable SHA-256 key for a normalized filter dict."""
+    payload = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultIdCache:
+    """Thread-safe TTL cache mapping a filter hash to the ordered list of matching ids."""
+
+    def __init__(self, ttl=60, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, ids = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return ids
+
+    def set(self, key, ids):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, list(ids))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return cached ids for ``key``, running ``compute()`` and caching on a miss."""
+        ids = self.get(key)
+        if ids is None:
+            ids = list(compute())
+            self.set(key, ids)
+        return ids
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
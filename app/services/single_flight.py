@@ -0,0 +1,55 @@
+# app/services/single_flight.py
+"""Single-flight execution: concurrent calls with the same key share one computation."""
+
+import threading
+
+from app.services.metrics import metrics
+
+shared_calls = metrics.counter("single_flight_shared_total", "Calls answered by an identical call already in flight")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for it and get the same result (or exception). Nothing is kept
+    once the call finishes, so later calls run again (or hit a cache).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}  # key -> _Call in flight
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return ``(result, shared)``; ``shared`` is true when another caller computed the result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            shared_calls.inc(name=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
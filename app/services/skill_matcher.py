@@ -0,0 +1,174 @@
+# app/services/skill_matcher.py
+"""Dictionary-driven skill extraction with an Aho–Corasick automaton.
+
+All aliases of a curated skill vocabulary are compiled into one automaton,
+so a resume is scanned once, in time linear in its length, however many
+skills the vocabulary holds. Matches only count on word boundaries, so
+"java" is not found in "javascript" and "scala" not in "scalable".
+"""
+
+from collections import deque
+
+# Canonical skill name -> lowercase aliases it is written as in resumes
+SKILL_ALIASES = {
+    # Languages
+    "Python": ("python", "python3"),
+    "Java": ("java",),
+    "JavaScript": ("javascript", "js", "es6"),
+    "TypeScript": ("typescript",),
+    "C++": ("c++", "cpp"),
+    "C#": ("c#", "csharp"),
+    "Go": ("golang",),
+    "Rust": ("rust",),
+    "Ruby": ("ruby",),
+    "PHP": ("php",),
+    "Kotlin": ("kotlin",),
+    "Swift": ("swift",),
+    "Scala": ("scala",),
+    "MATLAB": ("matlab",),
+    "Bash": ("bash", "shell scripting"),
+    "SQL": ("sql",),
+    "HTML": ("html", "html5"),
+    "CSS": ("css", "css3"),
+    # Web frameworks and runtimes
+    "React": ("react", "react.js", "reactjs"),
+    "Angular": ("angular", "angularjs"),
+    "Vue.js": ("vue", "vue.js", "vuejs"),
+    "Node.js": ("node.js", "nodejs", "node"),
+    "Express": ("express.js", "expressjs"),
+    "Django": ("django",),
+    "Flask": ("flask",),
+    "FastAPI": ("fastapi",),
+    "Spring Boot": ("spring boot", "springboot"),
+    ".NET": (".net", "asp.net", "dotnet"),
+    "Ruby on Rails": ("ruby on rails", "rails"),
+    "jQuery": ("jquery",),
+    "Bootstrap": ("bootstrap",),
+    "REST APIs": ("restful", "rest api", "rest apis"),
+    "GraphQL": ("graphql",),
+    # Data and machine learning
+    "Pandas": ("pandas",),
+    "NumPy": ("numpy",),
+    "scikit-learn": ("scikit-learn", "sklearn"),
+    "TensorFlow": ("tensorflow",),
+    "PyTorch": ("pytorch",),
+    "Keras": ("keras",),
+    "Machine Learning": ("machine learning", "ml"),
+    "Deep Learning": ("deep learning",),
+    "NLP": ("nlp", "natural language processing"),
+    "Computer Vision": ("computer vision", "opencv"),
+    "Data Analysis": ("data analysis", "data analytics"),
+    "Tableau": ("tableau",),
+    "Power BI": ("power bi", "powerbi"),
+    "Excel": ("excel", "microsoft excel"),
+    "Spark": ("spark", "apache spark", "pyspark"),
+    "Hadoop": ("hadoop",),
+    # Databases
+    "PostgreSQL": ("postgresql", "postgres"),
+    "MySQL": ("mysql",),
+    "SQLite": ("sqlite",),
+    "MongoDB": ("mongodb", "mongo"),
+    "Redis": ("redis",),
+    "Oracle": ("oracle",),
+    "Elasticsearch": ("elasticsearch",),
+    "DynamoDB": ("dynamodb",),
+    # Cloud, DevOps and tools
+    "AWS": ("aws", "amazon web services"),
+    "Azure": ("azure",),
+    "GCP": ("gcp", "google cloud"),
+    "Docker": ("docker",),
+    "Kubernetes": ("kubernetes", "k8s"),
+    "Terraform": ("terraform",),
+    "Jenkins": ("jenkins",),
+    "CI/CD": ("ci/cd", "continuous integration"),
+    "Git": ("git",),
+    "GitHub": ("github",),
+    "Linux": ("linux", "unix"),
+    "Jira": ("jira",),
+    "Agile": ("agile", "scrum"),
+    "Figma": ("figma",),
+    "Selenium": ("selenium",),
+    "Pytest": ("pytest",),
+    "JUnit": ("junit",),
+    "Kafka": ("kafka",),
+    "Microservices": ("microservices",),
+    # Professional skills
+    "Leadership": ("leadership",),
+    "Communication": ("communication",),
+    "Teamwork": ("teamwork",),
+    "Project Management": ("project management",),
+    "Customer Service": ("customer service",),
+    "Teaching": ("teaching", "tutoring"),
+    "Research": ("research",),
+}
+
+# Characters that continue a word for boundary checks ("c++" must not match "c+++", "c#" not "c#x")
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789+#")
+
+
+class SkillMatcher:
+    """Finds every vocabulary skill in a text in one pass."""
+
+    def __init__(self, aliases=SKILL_ALIASES):
+        self._goto = [{}]  # state -> {character: next state}
+        self._fail = [0]
+        self._output = [[]]  # state -> [(alias length, canonical skill)] ending here
+        for canonical, names in aliases.items():
+            for name in names:
+                self._add(name.lower(), canonical)
+        self._build_failure_links()
+
+    def _add(self, alias, canonical):
+        state = 0
+        for character in alias:
+            next_state = self._goto[state].get(character)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][character] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(alias), canonical))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(character, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """Canonical skills mentioned in ``text``, in order of first mention."""
+        text = text.lower()
+        found = {}
+        state = 0
+        for end, character in enumerate(text, start=1):
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+            for length, canonical in self._output[state]:
+                start = end - length
+                if canonical in found:
+                    continue
+                if start > 0 and (text[start - 1] in _WORD_CHARS or text[start - 1] == "."):
+                    continue
+                if end < len(text) and text[end] in _WORD_CHARS:
+                    continue
+                found[canonical] = start
+        return sorted(found, key=found.get)
+
+
+skill_matcher = SkillMatcher()
+
+
+def extract_skills(text):
+    """Skills from the curated vocabulary mentioned in ``text``."""
+    return skill_matcher.find(text)
@@ -0,0 +1,76 @@
+# app/services/user_cache.py
+"""Per-process cache of logged-in users for Flask-Login's user loader.
+
+Every authenticated request needs ``current_user`` before the view runs.
+Rather than querying the ``user`` table each time, the loader keeps a
+read-only snapshot of each recently seen user for a short TTL. Snapshots
+are plain values, not ORM objects, so they never become detached from a
+closed session and can be shared between threads.
+
+Commits that change or delete a ``User`` row drop its entry in this
+process right away; other processes pick up the change once their entry
+expires, so the TTL bounds how stale another worker's view can be.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.metrics import metrics
+
+lookups = metrics.counter("user_cache_lookups_total", "Logged-in user lookups, by result")
+
+
+class UserCache:
+    """Thread-safe TTL cache of user snapshots by user id; ``ttl <= 0`` disables it."""
+
+    def __init__(self, ttl=30, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # user id -> (expires at, snapshot), least recently used first
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                lookups.inc(result="miss")
+                return None
+            self._entries.move_to_end(user_id)
+        lookups.inc(result="hit")
+        return entry[1]
+
+    def put(self, user_id, snapshot, generation=None):
+        """Cache ``snapshot``; with ``generation`` only if nothing was invalidated since it was read."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return  # the row may have changed after the snapshot was loaded
+            self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, user_id, load):
+        """The cached snapshot of ``user_id``, or ``load()``'s, cached unless it is ``None``."""
+        snapshot = self.get(user_id)
+        if snapshot is None:
+            with self._lock:
+                generation = self._generation
+            snapshot = load()
+            if snapshot is not None:
+                self.put(user_id, snapshot, generation)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
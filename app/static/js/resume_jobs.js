@@ -0,0 +1,114 @@
+// Wait for a background resume analysis job to finish.
+// Subscribes to the job's Socket.IO room, which pushes tokens as the model
+// generates them and a final update, and polls the status endpoint as a
+// fallback. onText (optional) is called with the text streamed so far.
+function waitForResumeJob(jobId, statusUrl, onText) {
+    return new Promise((resolve) => {
+        let done = false;
+        let socket = null;
+        let timer = null;
+        let text = "";
+
+        function showText(newText) {
+            text = newText;
+            if (onText) {
+                onText(text);
+            }
+        }
+
+        function finish(job) {
+            if (done) {
+                return;
+            }
+            done = true;
+            clearInterval(timer);
+            if (socket) {
+                socket.off("resume_job_update", onUpdate);
+                socket.off("resume_job_token", onToken);
+                socket.off("resume_job_partial", onPartial);
+            }
+            resolve(job);
+        }
+
+        function onUpdate(job) {
+            if (job.job_id !== jobId) {
+                return;
+            }
+            if (job.state === "complete" || job.state === "failed") {
+                finish(job);
+            } else if (job.result && job.result.length > text.length) {
+                showText(job.result);
+            }
+        }
+
+        function onToken(data) {
+            // Tokens already covered by a snapshot have an offset below our length
+            if (data.job_id === jobId && data.offset === text.length) {
+                showText(text + data.token);
+            }
+        }
+
+        function onPartial(data) {
+            if (data.job_id === jobId && data.text.length > text.length) {
+                showText(data.text);
+            }
+        }
+
+        async function poll() {
+            try {
+                const response = await fetch(statusUrl);
+                if (response.ok) {
+                    onUpdate(await response.json());
+                }
+            } catch (error) {
+                console.error("Error polling resume job:", error);
+            }
+        }
+
+        if (typeof io !== "undefined") {
+            socket = window.resumeJobSocket || (window.resumeJobSocket = io());
+            socket.on("resume_job_update", onUpdate);
+            socket.on("resume_job_token", onToken);
+            socket.on("resume_job_partial", onPartial);
+            socket.emit("watch_resume_job", { job_id: jobId });
+        }
+        timer = setInterval(poll, 3000);
+    });
+}
+
+// Post a resume to one of the LLM endpoints and resolve with the final result.
+async function submitResumeJob(url, formData, onText) {
+    const response = await fetch(url, {
+        method: "POST",
+        body: formData
+    });
+    const result = await response.json();
+    if (!result.job_id) {
+        return result;
+    }
+    return waitForResumeJob(result.job_id, result.status_url, onText);
+}
+
+// Start the batch summary of a posting's applicants and resolve when it ends.
+// onSummary is called with each applicant summary as soon as it is stored.
+async function summarizeApplicants(url, onSummary) {
+    const response = await fetch(url, { method: "POST" });
+    const result = await response.json();
+    if (!result.job_id) {
+        return result;
+    }
+    function onEvent(event) {
+        if (event.job_id === result.job_id) {
+            onSummary(event);
+        }
+    }
+    const socket = typeof io !== "undefined" ? (window.resumeJobSocket || (window.resumeJobSocket = io())) : null;
+    if (socket) {
+        socket.on("applicant_summary", onEvent);
+    }
+    const job = await waitForResumeJob(result.job_id, result.status_url);
+    if (socket) {
+        socket.off("applicant_summary", onEvent);
+    }
+    return job;
+}
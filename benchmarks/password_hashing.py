@@ -0,0 +1,57 @@
+"""Benchmark login password checks at each bcrypt cost.
+
+For every cost, times single checks inline, then pushes a burst of logins
+from several client threads through the password hashing pool and reports
+logins/sec overall and per worker core. Use it to pick BCRYPT_LOG_ROUNDS:
+the highest cost whose per-core rate still covers the expected login burst.
+
+Usage: python benchmarks/password_hashing.py [--costs 10 11 12 13] [--logins N]
+           [--clients N] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_bcrypt import Bcrypt  # noqa: E402
+
+from app.services.password_hasher import PasswordHasher  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--logins", type=int, default=64, help="logins per cost in the burst")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent login requests")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PASSWORD_HASH_WORKERS")
+    args = parser.parse_args()
+
+    bcrypt = Bcrypt()
+    print(f"{args.logins} logins from {args.clients} clients on {args.workers} hashing threads")
+    print(f"{'cost':>4}  {'ms/check':>9}  {'logins/sec':>10}  {'per core':>9}")
+    for cost in args.costs:
+        hasher = PasswordHasher(bcrypt, rounds=cost, max_workers=args.workers, max_pending=args.logins)
+        password_hash = hasher.hash(PASSWORD)
+
+        started = time.perf_counter()
+        for _ in range(3):
+            bcrypt.check_password_hash(password_hash, PASSWORD)
+        single = (time.perf_counter() - started) / 3
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as clients:
+            results = list(clients.map(lambda _: hasher.check(password_hash, PASSWORD), range(args.logins)))
+        elapsed = time.perf_counter() - started
+        assert all(results)
+        rate = args.logins / elapsed
+        print(f"{cost:>4}  {single * 1000:9.1f}  {rate:10.1f}  {rate / args.workers:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
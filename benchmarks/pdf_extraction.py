@@ -0,0 +1,79 @@
+"""Benchmark PDF text extraction over a corpus of sample resumes.
+
+Reports pages/sec for in-process parsing, for the sandbox subprocesses, and
+for the sandboxes with every document split into page ranges, plus the peak
+RSS of this process and of its largest sandbox.
+
+Usage: python benchmarks/pdf_extraction.py [pdf or directory ...] [--repeat N]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_text import PDFTextExtractor  # noqa: E402
+
+DEFAULT_CORPUS = ["tests/test_data", "app/1"]
+
+
+def load_corpus(paths):
+    documents = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.path.join(path, name) for name in os.listdir(path))
+        else:
+            names = [path]
+        for name in names:
+            if name.lower().endswith(".pdf"):
+                with open(name, "rb") as f:
+                    documents.append((name, f.read()))
+    return documents
+
+
+def peak_rss_mib(who):
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(label, extractor, documents, repeat):
+    pages = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, data in documents:
+            extractor._cache.clear()  # measure parsing, not the text cache
+            pages += len(extractor.extract_pages(data))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {pages:>6} pages  {elapsed:8.3f}s  {pages / elapsed:10.1f} pages/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.paths)
+    if not documents:
+        parser.error("no PDFs found")
+    print(f"corpus: {len(documents)} PDFs, repeat {args.repeat}")
+
+    run("inline", PDFTextExtractor(sandbox=False), documents, args.repeat)
+    for label, threshold in (("sandbox", sys.maxsize), ("split", 1)):
+        sandboxed = PDFTextExtractor(parallel_threshold=threshold, workers=args.workers)
+        try:
+            run(label, sandboxed, documents, args.repeat)
+        finally:
+            sandboxed.shutdown()
+
+    print(f"peak RSS: {peak_rss_mib(resource.RUSAGE_SELF):.1f} MiB (self), "
+          f"{peak_rss_mib(resource.RUSAGE_CHILDREN):.1f} MiB (largest sandbox)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Load-test the resume analysis pipeline against the stub LLM backend.
+
+Submits advice jobs for distinct synthetic resumes from several simulated
+clients, waits for the background pool to drain, and reports throughput,
+job latency, queue wait, rejections, and the time to serve the same
+resumes again from the result cache. No model or GPU is needed.
+
+Usage: python benchmarks/resume_pipeline.py [--resumes N] [--clients N]
+           [--latency S] [--tokens-per-second N] [--load-latency S] [--concurrency N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--load-latency", type=float, default=0, help="stub seconds to load a cold model")
+    parser.add_argument("--concurrency", type=int, default=1, help="LLM_MAX_CONCURRENCY")
+    return parser.parse_args()
+
+
+def configure(args, database):
+    # The app reads its config at import time, so set everything up front
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{database}",
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY": str(args.latency),
+        "LLM_STUB_TOKENS_PER_SECOND": str(args.tokens_per_second),
+        "LLM_STUB_LOAD_LATENCY": str(args.load_latency),
+        "LLM_MAX_CONCURRENCY": str(args.concurrency),
+        "LLM_MAX_WAITING": str(args.resumes),
+        "LLM_MAX_PER_USER": str(args.resumes),
+        "RESUME_JOB_MAX_PENDING": str(args.resumes),
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_resume(index):
+    return f"Candidate {index}\nEXPERIENCE\nSoftware Intern {index}, Cisco\nSKILLS\nPython, SQL, Flask"
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        configure(args, os.path.join(directory, "bench.db"))
+
+        from app import app, db
+        from app.models import ResumeJob
+        from app.routes import resume_jobs
+        from app.services.llm_limiter import LLMRejected, wait_seconds
+        from app.services.resume_analysis import resume_advice
+
+        with app.app_context():
+            db.create_all()
+            rejected = 0
+            started = time.perf_counter()
+            for index in range(args.resumes):
+                try:
+                    resume_jobs.submit("advice", synthetic_resume(index), admission_key=f"client:{index % args.clients}")
+                except LLMRejected:
+                    rejected += 1
+            while resume_jobs.pending():
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - started
+
+            jobs = ResumeJob.query.filter_by(status="complete").all()
+            latencies = sorted((job.finished_on - job.created_on).total_seconds() for job in jobs)
+            print(f"backend: stub, latency {args.latency}s, {args.tokens_per_second} tokens/s, "
+                  f"LLM concurrency {args.concurrency}")
+            print(f"cold   {len(jobs):>5} jobs  {elapsed:8.3f}s  {len(jobs) / elapsed:8.2f} jobs/sec  "
+                  f"{rejected} rejected")
+            if latencies:
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(f"job latency p50 {latencies[len(latencies) // 2]:.3f}s  p95 {p95:.3f}s  "
+                      f"mean LLM queue wait {wait_seconds.mean() or 0:.3f}s")
+
+            started = time.perf_counter()
+            for index in range(args.resumes):
+                resume_advice(synthetic_resume(index))
+            elapsed = time.perf_counter() - started
+            print(f"cached {args.resumes:>5} hits  {elapsed:8.3f}s  {args.resumes / elapsed:8.1f} hits/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare the dictionary skill matcher with asking the LLM for skills.
+
+Runs both over a small labelled set of resume experience snippets and
+reports the mean latency per snippet and the recall of the labelled skills.
+LLM answers are mapped onto the vocabulary's canonical names before they are
+scored. Use ``--backend stub`` to exercise the harness without a model.
+
+Usage: python benchmarks/skill_extraction.py [--backend ollama|stub] [--model NAME] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.llm_backend import OllamaBackend, StubBackend  # noqa: E402
+from app.services.skill_matcher import extract_skills  # noqa: E402
+
+LLM_PROMPT = "list every technical or professional skill mentioned in this text as a comma separated list, nothing else: {text}"
+
+# (experience text, skills a reviewer labelled in it)
+LABELLED = [
+    ("Software Engineering Intern, Cisco. Built REST APIs in Python and Flask, containerized them with Docker "
+     "and deployed to AWS through a Jenkins CI/CD pipeline.",
+     {"Python", "Flask", "REST APIs", "Docker", "AWS", "Jenkins", "CI/CD"}),
+    ("Teaching Assistant, NC State University. Led tutoring sessions for 40 students on data structures in Java "
+     "and graded C++ assignments.",
+     {"Teaching", "Java", "C++"}),
+    ("Data Analyst, SAS Institute. Cleaned survey data with pandas and NumPy, wrote SQL against PostgreSQL and "
+     "built Tableau dashboards for leadership.",
+     {"Pandas", "NumPy", "SQL", "PostgreSQL", "Tableau"}),
+    ("Frontend Developer, Red Hat. Rebuilt the customer portal in React and TypeScript, added GraphQL queries "
+     "and end-to-end tests with Selenium; worked in an Agile team using Jira.",
+     {"React", "TypeScript", "GraphQL", "Selenium", "Agile", "Jira"}),
+    ("Machine Learning Research Assistant. Trained PyTorch models for NLP tasks on Linux GPU servers and "
+     "tracked experiments in Git.",
+     {"Machine Learning", "PyTorch", "NLP", "Linux", "Git", "Research"}),
+]
+
+
+def canonical(answer):
+    skills = set()
+    for item in re.split(r"[,\n]", answer.split("</think>")[-1]):
+        item = item.strip(" -*.")
+        if item:
+            skills.update(extract_skills(item) or [item])
+    return skills
+
+
+def run(label, extract, repeat):
+    elapsed, recalled, labelled = 0.0, 0, 0
+    for _ in range(repeat):
+        for text, expected in LABELLED:
+            started = time.perf_counter()
+            found = {skill.lower() for skill in extract(text)}
+            elapsed += time.perf_counter() - started
+            recalled += len({skill.lower() for skill in expected} & found)
+            labelled += len(expected)
+    calls = repeat * len(LABELLED)
+    print(f"{label:<8} {elapsed / calls * 1000:10.3f} ms/snippet  recall {recalled / labelled:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["ollama", "stub"], default="ollama")
+    parser.add_argument("--model", default="deepseek-r1:1.5b")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the labelled set for the LLM")
+    args = parser.parse_args()
+
+    backend = OllamaBackend() if args.backend == "ollama" else StubBackend(models=[args.model], response_tokens=16)
+    print(f"{len(LABELLED)} labelled snippets, LLM backend {args.backend} ({args.model})")
+    run("matcher", extract_skills, max(args.repeat, 100))
+    run("llm", lambda text: canonical(backend.generate(args.model, LLM_PROMPT.format(text=text))), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
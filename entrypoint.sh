@@ -5,8 +5,8 @@ ollama serve &
 # Wait a bit to ensure Ollama is running
 sleep 2
 
-# pull the model
-ollama run deepseek-r1:1.5b
+# pull the model; the app loads it into memory (warm-up) once it starts
+ollama pull deepseek-r1:1.5b
 
 # Start Flask app
 exec flask run --host=0.0.0.0
\ No newline at end of file
@@ -0,0 +1,220 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from app import app, db
+from app.models import User
+from app.routes import model_registry, pdf_extractor
+from app.services.blob_storage import LocalBlobStorage, S3BlobStorage
+from app.services.resume_analysis import llm_cache
+from app.services.resume_bundle import BundleCache
+from app.services.resume_gc import ResumeGC
+from app.services.resume_index import ResumeIndexer
+from app.services.resume_preview import PreviewCache, ResumePreviewer
+from app.services.resume_store import ResumeStore
+
+
+@pytest.fixture(autouse=True)
+def app_files_in_tmp_path(tmp_path, mocker):
+    """Point the database and every folder the app writes to at tmp_path, never into the working tree."""
+    mocker.patch.dict(app.config, {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'app.db'}",
+        'UPLOAD_FOLDER': str(tmp_path / 'upload_folder'),
+        'RESUME_STORE_DIR': str(tmp_path / 'store'),
+        'RESUME_PREVIEW_DIR': str(tmp_path / 'previews'),
+        'RESUME_BUNDLE_DIR': str(tmp_path / 'bundles'),
+    })
+    os.makedirs(app.config['UPLOAD_FOLDER'])
+    store = ResumeStore(LocalBlobStorage(app.config['RESUME_STORE_DIR']), legacy_dir=app.config['UPLOAD_FOLDER'])
+    indexer = ResumeIndexer(app, store, pdf_extractor)
+    mocker.patch.multiple(
+        'app.routes', resume_store=store, resume_indexer=indexer,
+        resume_previewer=ResumePreviewer(app, PreviewCache(app.config['RESUME_PREVIEW_DIR']), store, indexer),
+        resume_bundles=BundleCache(app.config['RESUME_BUNDLE_DIR']), resume_gc=ResumeGC(app, store),
+    )
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+
+@pytest.fixture
+def login_user(client):
+    user = User(username="testuser", email="testuser@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(user)
+    db.session.commit()
+
+    # Log in the user
+    with client.session_transaction() as session:
+        session['user_id'] = user.id
+        
+    return user
+
+
+@pytest.fixture
+def eager_resume_jobs(mocker):
+    """Run resume jobs inline and pretend the model is installed."""
+    app.config['RESUME_JOBS_EAGER'] = True
+    mocker.patch('ollama.list', return_value={'models': [type('Model', (), {'model': 'deepseek-r1:1.5b'})]})
+    model_registry.refresh()
+    llm_cache.clear()
+    yield
+    app.config['RESUME_JOBS_EAGER'] = False
+    model_registry.clear()
+
+
+@pytest.fixture
+def fake_chat():
+    """Factory of stand-ins for ollama.chat answering ``content``, word by word when streaming."""
+    def fake_chat(content):
+        def chat(model, messages, stream=False, **kwargs):
+            if stream:
+                return iter(type('Response', (), {"message": type('Message', (), {"content": token})})
+                            for token in re.findall(r'\S+\s*', content))
+            return type('Response', (), {"message": type('Message', (), {"content": content})})
+        return chat
+    return fake_chat
+
+
+LONG_RESUME = "\n".join([
+    "Jane Doe", "jane@example.com",
+    "EXPERIENCE", "Teaching Assistant, NCSU. " * 20,
+    "Software Intern, Cisco. " * 20,
+    "EDUCATION", "BS Computer Science, NCSU. " * 20,
+    "SKILLS", "Python, SQL, Flask. " * 20,
+])
+
+
+@pytest.fixture
+def long_resume():
+    """A resume too long for one model call, with experience, education and skills sections."""
+    return LONG_RESUME
+
+
+@pytest.fixture
+def store(mocker, tmp_path):
+    store = ResumeStore(LocalBlobStorage(str(tmp_path)))
+    mocker.patch('app.routes.resume_store', store)
+    return store
+
+
+@pytest.fixture
+def indexer(store, mocker):
+    mocker.patch.dict(app.config, {'RESUME_INDEX_EAGER': True})
+    indexer = ResumeIndexer(app, store, pdf_extractor)
+    mocker.patch('app.routes.resume_indexer', indexer)
+    return indexer
+
+
+class CountingStream(BytesIO):
+    """BytesIO recording the size of every read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+@pytest.fixture
+def counting_stream():
+    return CountingStream
+
+
+class S3StandIn(BaseHTTPRequestHandler):
+    """Minimal S3-compatible object server: path-style PUT, GET, HEAD, DELETE and ListObjectsV2."""
+
+    objects = {}  # (bucket, key) -> bytes
+    fail_with = None  # status every request is answered with while simulating an outage
+
+    def log_message(self, *args):
+        pass
+
+    def _target(self):
+        parsed = urlparse(self.path)
+        bucket, _, key = unquote(parsed.path).lstrip('/').partition('/')
+        return bucket, key, parse_qs(parsed.query)
+
+    def _authorized(self, query):
+        return self.headers.get('Authorization', '').startswith('AWS4-HMAC-SHA256 Credential=test-key/') or \
+            query.get('X-Amz-Credential', [''])[0].startswith('test-key/') and 'X-Amz-Signature' in query
+
+    def _reply(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        bucket, key, query = self._target()
+        if self.fail_with:
+            return self._reply(self.fail_with)
+        if not self._authorized(query):
+            return self._reply(403)
+        self.objects[(bucket, key)] = self.rfile.read(int(self.headers['Content-Length']))
+        self._reply(200)
+
+    def do_GET(self):
+        bucket, key, query = self._target()
+        if self.fail_with:
+            return self._reply(self.fail_with)
+        if not self._authorized(query):
+            return self._reply(403)
+        if not key:
+            keys = sorted(k for b, k in self.objects if b == bucket)
+            contents = "".join(f"<Contents><Key>{k}</Key><LastModified>2025-01-02T03:04:05.000Z</LastModified>"
+                               f"<Size>{len(self.objects[(bucket, k)])}</Size></Contents>" for k in keys)
+            body = f'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">{contents}' \
+                   f'<IsTruncated>false</IsTruncated></ListBucketResult>'
+            return self._reply(200, body.encode())
+        if (bucket, key) not in self.objects:
+            return self._reply(404)
+        headers = [('Content-Type', query.get('response-content-type', ['binary/octet-stream'])[0])]
+        if 'response-content-disposition' in query:
+            headers.append(('Content-Disposition', query['response-content-disposition'][0]))
+        self._reply(200, self.objects[(bucket, key)], headers)
+
+    do_HEAD = do_GET
+
+    def do_DELETE(self):
+        bucket, key, query = self._target()
+        if self.fail_with:
+            return self._reply(self.fail_with)
+        if not self._authorized(query):
+            return self._reply(403)
+        self.objects.pop((bucket, key), None)
+        self._reply(204)
+
+
+@pytest.fixture
+def s3_stand_in():
+    """An ``S3StandIn`` server on a free local port, holding no objects."""
+    S3StandIn.objects = {}
+    S3StandIn.fail_with = None
+    server = ThreadingHTTPServer(('127.0.0.1', 0), S3StandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def s3_storage(s3_stand_in):
+    return S3BlobStorage(f"http://127.0.0.1:{s3_stand_in.server_port}", "resumes", "test-key", "test-secret")
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from app.services.blob_storage import BlobStorage
+
+
+def test_s3_storage_streams_blobs_against_stand_in(s3_storage, tmp_path):
+    source = tmp_path / "blob"
+    source.write_bytes(b"%PDF-1.4\n%object")
+    s3_storage.put_file("ab/cd/abcd", str(source))
+
+    assert not source.exists()  # the staged file is consumed
+    assert s3_storage.exists("ab/cd/abcd")
+    with s3_storage.open("ab/cd/abcd") as blob:
+        assert blob.read() == b"%PDF-1.4\n%object"
+    assert list(s3_storage.iter_keys()) == [
+        ("ab/cd/abcd", 16, datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp())
+    ]
+
+    url = s3_storage.download_url("ab/cd/abcd", "My Resume.pdf", "application/pdf")
+    direct = requests.get(url)
+    assert direct.content == b"%PDF-1.4\n%object"
+    assert direct.headers['Content-Type'] == 'application/pdf'
+    assert direct.headers['Content-Disposition'] == "attachment; filename*=UTF-8''My%20Resume.pdf"
+    inline = requests.get(s3_storage.download_url("ab/cd/abcd", "My Resume.pdf", "application/pdf", as_attachment=False))
+    assert inline.headers['Content-Disposition'] == "inline; filename*=UTF-8''My%20Resume.pdf"
+
+    s3_storage.delete("ab/cd/abcd")
+    assert not s3_storage.exists("ab/cd/abcd")
+    with pytest.raises(FileNotFoundError):
+        s3_storage.open("ab/cd/abcd")
+
+
+def test_storage_missing_a_method_fails_when_constructed():
+    class WriteOnly(BlobStorage):
+        def put_file(self, key, path):
+            pass
+
+    with pytest.raises(TypeError, match="open"):
+        WriteOnly()
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+from ollama import ChatResponse
+
+from app.services.llm_backend import (LLMBackend, OllamaBackend, StubBackend, create_backend, generation_seconds,
+                                      keep_alive_seconds, load_seconds)
+from app.services.resume_analysis import clean_experience, iter_json_objects
+
+
+def test_create_backend_from_config():
+    assert isinstance(create_backend({'LLM_BACKEND': 'ollama', 'LLM_KEEP_ALIVE': '30m'}), OllamaBackend)
+    stub = create_backend({'LLM_BACKEND': 'stub', 'LLM_STUB_MODELS': ['m'], 'LLM_STUB_LATENCY': 0.5,
+                           'LLM_STUB_TOKENS_PER_SECOND': 20, 'LLM_STUB_RESPONSE_TOKENS': 8,
+                           'LLM_STUB_LOAD_LATENCY': 0})
+    assert stub.list_models() == ['m'] and stub.latency == 0.5 and stub.response_tokens == 8
+    with pytest.raises(ValueError):
+        create_backend({'LLM_BACKEND': 'gpt'})
+
+
+def test_backend_missing_a_method_fails_when_constructed():
+    class GenerateOnly(LLMBackend):
+        def generate(self, model, prompt):
+            return ""
+
+    with pytest.raises(TypeError, match="stream"):
+        GenerateOnly()
+
+
+def test_stub_backend_is_deterministic_and_rate_limited():
+    stub = StubBackend(latency=0.05, tokens_per_second=100, response_tokens=5)
+
+    started = time.monotonic()
+    tokens = list(stub.stream('deepseek-r1:1.5b', 'give improvement suggestions'))
+    assert time.monotonic() - started >= 0.05 + 5 / 100
+    assert len(tokens) == 5
+    assert ''.join(tokens) == stub.generate('deepseek-r1:1.5b', 'give improvement suggestions')
+    assert stub.generate('deepseek-r1:1.5b', 'another resume') != ''.join(tokens)
+    assert clean_experience(next(iter_json_objects(stub.generate('deepseek-r1:1.5b', 'answer in json'))))
+    with pytest.raises(ValueError):
+        stub.generate('llama3', 'hello')
+
+
+def test_ollama_backend_keeps_model_alive_and_splits_latency(mocker):
+    response = ChatResponse(model='m', done=True, load_duration=2_000_000_000, prompt_eval_duration=250_000_000,
+                            eval_duration=750_000_000, message={'role': 'assistant', 'content': 'ok'})
+    chat = mocker.patch('ollama.chat', return_value=response)
+    backend = OllamaBackend(keep_alive='-1')
+
+    assert backend.generate('keepalive-model', 'hello') == 'ok'
+    assert chat.call_args.kwargs['keep_alive'] == -1
+    assert load_seconds.mean(model='keepalive-model') == 2.0
+    assert generation_seconds.mean(model='keepalive-model') == 1.0
+
+
+def test_keep_alive_seconds():
+    assert keep_alive_seconds("30m") == 1800
+    assert keep_alive_seconds("1h30m") == 5400
+    assert keep_alive_seconds(600) == 600 and keep_alive_seconds("600") == 600
+    assert keep_alive_seconds("-1") is None and keep_alive_seconds("-1m") is None
+    with pytest.raises(ValueError):
+        keep_alive_seconds("half an hour")
@@ -0,0 +1,51 @@
+from app import db
+from app.models import LLMResult
+from app.services.llm_cache import LLMResultCache, cache_key
+
+
+def test_llm_cache_key_includes_prompt_version_and_model():
+    key = cache_key("resume text", "advice-v1", "deepseek-r1:1.5b")
+    assert key != cache_key("resume text", "advice-v2", "deepseek-r1:1.5b")
+    assert key != cache_key("resume text", "advice-v1", "llama3")
+    assert key != cache_key("resume text", "advice-v1", "deepseek-r1:1.5b", backend="stub")
+    assert key == cache_key("resume text", "advice-v1", "deepseek-r1:1.5b")
+
+
+def test_llm_cache_evicts_least_recently_used_over_size_budget(client):
+    cache = LLMResultCache(memory_size=1, max_bytes=10)
+    cache.put("a" * 64, "12345", "advice-v1", "m")
+    cache.put("b" * 64, "12345", "advice-v1", "m")
+    assert cache.get("a" * 64) == "12345"  # touch a so b is the least recently used
+    cache.put("c" * 64, "12345", "advice-v1", "m")
+
+    assert LLMResult.query.get("b" * 64) is None
+    assert cache.get("a" * 64) == "12345"
+    assert cache.get("c" * 64) == "12345"
+
+
+def test_llm_cache_memory_hits_count_as_uses_for_eviction(client, mocker):
+    cache = LLMResultCache(memory_size=2, max_bytes=10, touch_batch=100)
+    cache.put("a" * 64, "12345", "advice-v1", "m")
+    cache.put("b" * 64, "12345", "advice-v1", "m")
+    assert cache.get("a" * 64) == "12345"  # answered from memory
+    count = mocker.spy(cache, '_count')
+    cache.put("c" * 64, "12345", "advice-v1", "m")
+
+    assert not count.called  # the running total decided, without summing the table
+    assert LLMResult.query.get("b" * 64) is None
+    assert LLMResult.query.get("a" * 64) is not None
+
+
+def test_llm_cache_flushes_memory_hits_in_batches(client):
+    cache = LLMResultCache(memory_size=4, touch_batch=2, touch_interval=3600)
+    cache.put("a" * 64, "12345", "advice-v1", "m")
+    cache.put("b" * 64, "12345", "advice-v1", "m")
+    written = {row.key: row.last_used_on for row in LLMResult.query.all()}
+
+    cache.get("a" * 64)
+    db.session.expire_all()
+    assert LLMResult.query.get("a" * 64).last_used_on == written["a" * 64]
+    cache.get("b" * 64)
+    db.session.expire_all()
+    assert LLMResult.query.get("a" * 64).last_used_on > written["a" * 64]
+    assert LLMResult.query.get("b" * 64).last_used_on > written["b" * 64]
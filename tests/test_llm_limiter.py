@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from app.services.llm_limiter import LLMLimiter, LLMRejected
+
+
+def test_llm_limiter_rejects_per_user_and_when_full():
+    limiter = LLMLimiter(max_concurrency=1, max_waiting=1, max_per_user=1, default_retry_after=7)
+    first = limiter.admit("user:1")
+
+    with pytest.raises(LLMRejected) as per_user:
+        limiter.admit("user:1")
+    assert per_user.value.status_code == 429
+    assert per_user.value.retry_after == 7
+
+    limiter.admit("user:2")
+    with pytest.raises(LLMRejected) as full:
+        limiter.admit("user:3")
+    assert full.value.status_code == 503
+
+    first.release()
+    limiter.admit("user:1")
+
+
+def test_llm_limiter_grants_slots_fairly_between_users():
+    limiter = LLMLimiter(max_concurrency=1)
+    order = []
+
+    def call(user_key, label):
+        with limiter.slot(user_key):
+            order.append(label)
+
+    threads = []
+    with limiter.slot("user:0"):
+        for user_key, label in [("user:a", "a1"), ("user:a", "a2"), ("user:a", "a3"), ("user:b", "b1")]:
+            thread = threading.Thread(target=call, args=(user_key, label))
+            thread.start()
+            threads.append(thread)
+            while len(limiter._waiting) < len(threads):
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["a1", "b1", "a2", "a3"]
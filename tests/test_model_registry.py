@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from app.routes import model_registry
+from app.services.llm_backend import StubBackend, load_seconds
+from app.services.model_registry import ModelRegistry
+
+
+def test_model_registry_keeps_last_models_when_refresh_fails(mocker):
+    mocker.patch('ollama.list', return_value={'models': [type('Model', (), {'model': 'deepseek-r1:1.5b'})]})
+    model_registry.refresh()
+    mocker.patch('ollama.list', side_effect=ConnectionError("daemon busy"))
+    model_registry.refresh()
+
+    assert model_registry.is_ready('deepseek-r1:1.5b')
+
+
+def test_model_registry_refresh_warms_model():
+    backend = StubBackend(models=['warm-model'], load_latency=0.05)
+    registry = ModelRegistry(backend, warm_models=['warm-model', 'missing-model'])
+
+    registry.refresh()
+    for _ in range(100):
+        if registry.status('warm-model')['warmed_on']:
+            break
+        time.sleep(0.01)
+
+    assert registry.status('warm-model')['warmed_on'] is not None
+    assert load_seconds.mean(model='warm-model') == 0.05
+    started = time.monotonic()
+    backend.generate('warm-model', 'first user request')
+    assert time.monotonic() - started < 0.05  # already loaded
+
+
+def test_model_registry_warms_model_once_per_load(mocker):
+    backend = mocker.Mock(spec=StubBackend(models=['warm-model']))
+    backend.list_models.return_value = ['warm-model']
+    backend.warm_up.return_value = 0.0
+    registry = ModelRegistry(backend, warm_models=['warm-model'], rewarm_after=1800)
+    mocker.patch('app.services.model_registry.threading.Thread',
+                 side_effect=lambda target, args, **kwargs: mocker.Mock(start=lambda: target(*args)))
+
+    for _ in range(3):
+        registry.refresh()
+    assert backend.warm_up.call_count == 1
+
+    # The daemon could not be reached, so the model may have been unloaded
+    backend.list_models.side_effect = ConnectionError("down")
+    registry.refresh()
+    backend.list_models.side_effect = None
+    registry.refresh()
+    registry.refresh()
+    assert backend.warm_up.call_count == 2
+
+    # Its keep-alive ran out since the last warm-up
+    registry._warmed_on['warm-model'] -= timedelta(seconds=1800)
+    registry.refresh()
+    registry.refresh()
+    assert backend.warm_up.call_count == 3
@@ -39,7 +39,7 @@ def sample_resume():
     temp_dir = tempfile.mkdtemp()  # Create a temporary directory
     resume_path = os.path.join(temp_dir, 'test_resume.pdf')
     with open(resume_path, 'wb') as f:
-        f.write(b'This is a sample resume content.')  # Sample content for the file
+        f.write(b'%PDF-1.4\nThis is a sample resume content.')  # Sample content for the file
     return resume_path  # Return the path to the temp file
 
 @pytest.fixture
@@ -406,4 +406,33 @@ def test_upvote_review(logged_in_client):
 
 
 ##############################################
-##############################################
\ No newline at end of file
+##############################################
+#23. Test that paging through a GET search keeps the filters
+def test_search_reviews_pagination_keeps_filters(client):
+    user = User(username="searchuser", email="search@example.com", password="password")
+    db.session.add(user)
+    db.session.commit()
+    for i in range(7):
+        db.session.add(Reviews(job_title=f"Barista {i}", job_description="Desc", department="Dining",
+                               locations="Talley", hourly_pay="12", benefits="None", review="Fine",
+                               rating=4, recommendation=5, author=user))
+    db.session.add(Reviews(job_title="Cashier", job_description="Desc", department="Dining",
+                           locations="Talley", hourly_pay="12", benefits="None", review="Fine",
+                           rating=4, recommendation=5, author=user))
+    db.session.commit()
+
+    response = client.get('/reviews/search?search_title=barista&page=2')
+    assert response.status_code == 200
+    assert b"Barista 5" in response.data
+    assert b"Cashier" not in response.data
+    assert response.headers["Cache-Control"].startswith("public")
+
+#24. Test that equivalent searches redirect to one canonical URL
+def test_search_reviews_canonical_redirect(client):
+    response = client.get('/reviews/search?search_title=%20Barista%20&min_rating=5&max_rating=2&page=1')
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith('/reviews/search?search_title=barista&min_rating=2')
+
+    response = client.post('/pageContentPost?page=2', data={'search_title': 'Barista'})
+    assert response.status_code == 303
+    assert response.headers["Location"].endswith('/reviews/search?search_title=barista&page=2')
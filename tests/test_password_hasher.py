@@ -0,0 +1,25 @@
+import threading
+
+import pytest
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def test_password_hasher_turns_away_work_beyond_the_queue():
+    started, release = threading.Event(), threading.Event()
+
+    class SlowBcrypt:
+        def check_password_hash(self, password_hash, password):
+            started.set()
+            release.wait(5)
+            return True
+
+    hasher = PasswordHasher(SlowBcrypt(), rounds=4, max_workers=1, max_pending=0)
+    first = threading.Thread(target=hasher.check, args=("hash", "password"))
+    first.start()
+    started.wait(5)
+    with pytest.raises(PasswordHasherBusy):
+        hasher.check("hash", "password")
+    release.set()
+    first.join()
+    assert hasher.check("hash", "password") is True
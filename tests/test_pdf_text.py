@@ -0,0 +1,64 @@
+import pytest
+
+from app.services.pdf_text import PDFExtractionError, PDFTextExtractor, sandbox_exits
+
+
+def test_pdf_extractor_enforces_page_and_size_caps():
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
+        data = f.read()
+
+    with pytest.raises(PDFExtractionError):
+        PDFTextExtractor(max_pages=2).extract(data)
+    with pytest.raises(PDFExtractionError):
+        PDFTextExtractor(max_bytes=len(data) - 1).extract(data)
+
+
+def test_pdf_extractor_parallel_matches_inline():
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
+        data = f.read()
+
+    inline = PDFTextExtractor(sandbox=False).extract(data, page_separator="\n")
+    parallel_extractor = PDFTextExtractor(parallel_threshold=2, workers=2)
+    try:
+        assert parallel_extractor.extract(data, page_separator="\n") == inline
+    finally:
+        parallel_extractor.shutdown()
+
+
+def test_pdf_sandbox_timeout_kills_worker_and_recovers():
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
+        data = f.read()
+    extractor = PDFTextExtractor(timeout=0.0001)
+    timeouts = sandbox_exits.value(reason="timeout")
+    try:
+        with pytest.raises(PDFExtractionError):
+            extractor.extract(data)
+        assert sandbox_exits.value(reason="timeout") == timeouts + 1
+
+        extractor.timeout = extractor._pool.timeout = 20.0
+        assert extractor.extract(data).strip()
+    finally:
+        extractor.shutdown()
+
+
+def test_pdf_sandbox_recycles_after_max_documents():
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        data = f.read()
+    extractor = PDFTextExtractor(max_documents=1)
+    recycled = sandbox_exits.value(reason="recycled")
+    try:
+        assert extractor.extract(data).strip()
+        assert sandbox_exits.value(reason="recycled") == recycled + 1
+    finally:
+        extractor.shutdown()
+
+
+def test_pdf_extractor_caches_by_file_hash(mocker):
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        data = f.read()
+    extractor = PDFTextExtractor()
+    first = extractor.extract(data)
+
+    reader = mocker.patch('app.services.pdf_text.PyPDF2.PdfReader')
+    assert extractor.extract(data) == first
+    assert reader.call_count == 0
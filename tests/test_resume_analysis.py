@@ -0,0 +1,145 @@
+import time
+
+from app import app, db
+from app.models import JobExperience, User
+from app.services.resume_analysis import (cached_work_experience, clean_experience, extract_work_experience,
+                                          iter_json_objects, llm_cache, llm_limiter, resume_advice,
+                                          save_work_experience)
+
+
+def test_iter_json_objects_recovers_valid_entries():
+    content = (
+        '<think>{not json}</think> Here you go: ['
+        '{"job_title": "TA", "company_name": "NCSU", "skills": ["Python"]},'
+        '{"job_title": "broken", "company_name": },'
+        '{"job_title": "Intern", "company_name": "Cisco", "meta": {"remote": true}}'
+    )  # truncated array
+
+    objects = list(iter_json_objects(content))
+    assert [obj["job_title"] for obj in objects] == ["TA", "Intern"]
+
+
+def test_clean_experience_validates_and_normalizes():
+    assert clean_experience({"job_title": "", "company_name": "NCSU"}) is None
+    row = clean_experience({"job_title": " Data  Analyst ", "company_name": "SAS", "duration": None,
+                            "skills": "SQL, Tableau"})
+    assert row == {"job_title": "Data Analyst", "company_name": "SAS", "location": "", "duration": "",
+                   "description": "", "skills": "SQL,Tableau"}
+
+
+def test_save_work_experience_single_commit_and_dedup(client, mocker):
+    user = User(username="bulkuser", email="bulk@example.com", password="testpassword")
+    db.session.add(user)
+    db.session.add(JobExperience(job_title="TA", company_name="NCSU", location="Raleigh", duration="1 year",
+                                 description="Grading", username="bulkuser"))
+    db.session.commit()
+    entries = [
+        clean_experience({"job_title": "ta", "company_name": "ncsu", "duration": "1 Year"}),
+        clean_experience({"job_title": "Intern", "company_name": "Cisco", "duration": "Summer"}),
+        clean_experience({"job_title": "Intern", "company_name": "Cisco", "duration": "Summer"}),
+    ]
+    commit = mocker.spy(db.session, 'commit')
+
+    assert save_work_experience(entries, "bulkuser") == 1
+    assert commit.call_count == 1
+    assert JobExperience.query.filter_by(username="bulkuser").count() == 2
+
+
+def test_resume_advice_merges_chunks_in_order(client, mocker, fake_chat, long_resume):
+    app.config['LLM_CHUNK_TOKENS'] = 200
+    llm_cache.clear()
+    order = []
+
+    def chat(model, messages, stream=False, **kwargs):
+        prompt = messages[0]['content']
+        section = 'skills' if 'SKILLS' in prompt else 'education' if 'EDUCATION' in prompt else 'other'
+        if section == 'other':
+            time.sleep(0.05)  # the first chunk finishes last
+        order.append(section)
+        return fake_chat(f'fix {section}')(model, messages, stream)
+
+    mocker.patch('ollama.chat', side_effect=chat)
+    mocker.patch.object(llm_limiter, 'max_concurrency', 4)
+    streamed = []
+    try:
+        advice = resume_advice(long_resume, on_token=streamed.append)
+    finally:
+        app.config['LLM_CHUNK_TOKENS'] = 1500
+
+    assert advice.startswith('fix other') and advice.endswith('fix skills')
+    assert order[-1] == 'other'
+    assert ''.join(streamed) == advice
+
+
+def test_extract_work_experience_merges_experience_chunks(client, mocker, long_resume):
+    app.config['LLM_CHUNK_TOKENS'] = 200
+    llm_cache.clear()
+    prompts = []
+
+    def chat(model, messages, **kwargs):
+        prompts.append(messages[0]['content'])
+        company = 'Cisco' if 'Cisco' in messages[0]['content'].split('the resume is')[-1] else 'NCSU'
+        content = f'[{{"job_title":"TA","company_name":"NCSU"}}, {{"job_title":"Intern","company_name":"{company}"}}]'
+        return type('Response', (), {"message": type('Message', (), {"content": content})})
+
+    mocker.patch('ollama.chat', side_effect=chat)
+    try:
+        _, entries = extract_work_experience(long_resume)
+    finally:
+        app.config['LLM_CHUNK_TOKENS'] = 1500
+
+    assert len(prompts) > 1
+    assert not any('EDUCATION' in prompt or 'Python, SQL' in prompt for prompt in prompts)
+    assert [(e['job_title'], e['company_name']) for e in entries] == [('TA', 'NCSU'), ('Intern', 'NCSU'), ('Intern', 'Cisco')]
+
+
+def test_extract_work_experience_takes_skills_from_matcher(client, mocker):
+    llm_cache.clear()
+    resume = ("EXPERIENCE\nTeaching Assistant, NCSU\nGraded Java and Python labs\n"
+              "Intern, Cisco\nBuilt Flask APIs on AWS\nSKILLS\nDocker, Kubernetes")
+    content = ('[{"job_title":"Teaching Assistant","company_name":"NCSU","description":"Grading"},'
+               '{"job_title":"Intern","company_name":"Cisco","description":"Backend work"}]')
+    chat = mocker.patch('ollama.chat', return_value=type('Response', (), {"message": type('Message', (), {"content": content})}))
+
+    _, entries = extract_work_experience(resume)
+
+    assert 'skills' not in chat.call_args.kwargs['messages'][0]['content'].split('the resume is')[0]
+    assert [entry["skills"] for entry in entries] == ["Teaching,Java,Python", "Flask,AWS"]
+
+
+def test_extract_work_experience_reads_dated_entries_without_model(client, mocker):
+    llm_cache.clear()
+    resume = ("EXPERIENCE\nSoftware Engineer\nAcme Corp, Raleigh, NC\nJan 2020 - Present\n"
+              "- Built Flask APIs on AWS\n- Ran them on Docker\n"
+              "Intern | Cisco | Remote | May 2019 – Aug 2019\n• Wrote Python tests\nEDUCATION\nBS, NCSU 2015 - 2019")
+    chat = mocker.patch('ollama.chat')
+
+    _, entries = extract_work_experience(resume)
+
+    assert not chat.called
+    assert [(e["job_title"], e["company_name"], e["location"], e["duration"]) for e in entries] == [
+        ("Software Engineer", "Acme Corp", "Raleigh, NC", "Jan 2020 - Present"),
+        ("Intern", "Cisco", "Remote", "May 2019 – Aug 2019"),
+    ]
+    assert entries[0]["description"] == "Built Flask APIs on AWS. Ran them on Docker."
+    assert entries[0]["skills"] == "Flask,AWS,Docker" and entries[1]["skills"] == "Python"
+
+
+def test_extract_work_experience_asks_model_only_for_unstructured_entries(client, mocker):
+    llm_cache.clear()
+    resume = ("EXPERIENCE\nSoftware Engineer\nAcme Corp, Raleigh, NC\nJan 2020 - Present\n- Built Flask APIs on AWS\n"
+              "Freelancing 2018 - 2019\n- Built React sites for local shops\nEDUCATION\nBS, NCSU 2015 - 2019")
+    content = '[{"job_title":"Web Developer","company_name":"Freelance","duration":"2018 - 2019"}]'
+    chat = mocker.patch('ollama.chat', return_value=type('Response', (), {"message": type('Message', (), {"content": content})}))
+
+    we_text, entries = extract_work_experience(resume)
+
+    prompt = chat.call_args.kwargs['messages'][0]['content'].split('the resume is')[-1]
+    assert "Freelancing 2018 - 2019" in prompt and "Acme" not in prompt
+    assert [(e["job_title"], e["company_name"]) for e in entries] == [
+        ("Software Engineer", "Acme Corp"), ("Web Developer", "Freelance"),
+    ]
+    assert entries[0]["skills"] == "Flask,AWS"
+    # The model's part is cached, so the merged result is available without another call
+    assert cached_work_experience(resume) == (we_text, entries)
+    assert chat.call_count == 1
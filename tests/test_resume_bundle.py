@@ -0,0 +1,24 @@
+import os
+import zipfile
+from datetime import datetime
+from io import BytesIO
+
+from app.services.resume_bundle import BundleEntry, stream_bundle
+from app.services.resume_store import CHUNK_SIZE, ResolvedResume
+
+
+def test_stream_bundle_reads_and_yields_in_chunks(tmp_path, counting_stream):
+    data = b"%PDF-1.4\n" + os.urandom(10 * CHUNK_SIZE)
+    resume = ResolvedResume(None, 'big.pdf', 'application/pdf', 'f' * 64, len(data), datetime(2025, 1, 2))
+    streams = []
+
+    def open_resume(resolved):
+        streams.append(counting_stream(data))
+        return streams[-1]
+
+    chunks = list(stream_bundle([BundleEntry("big.pdf", resume)], open_resume, chunk_size=CHUNK_SIZE))
+    assert max(len(chunk) for chunk in chunks) <= CHUNK_SIZE
+    assert set(streams[0].reads) == {CHUNK_SIZE}
+    with zipfile.ZipFile(BytesIO(b"".join(chunks))) as archive:
+        assert archive.read("big.pdf") == data
+        assert archive.getinfo("big.pdf").date_time == (2025, 1, 2, 0, 0, 0)
@@ -0,0 +1,12 @@
+from app.services.resume_chunker import chunk_text, estimate_tokens, split_sections
+
+
+def test_chunk_text_splits_by_section_within_budget(long_resume):
+    assert chunk_text("short resume", 100) == ["short resume"]
+    assert [heading for heading, _ in split_sections(long_resume)] == ["", "experience", "education", "skills"]
+
+    chunks = chunk_text(long_resume, 200)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    assert any(chunk.startswith("EDUCATION") for chunk in chunks)
+    assert "".join(chunks).count("Software Intern") == 20
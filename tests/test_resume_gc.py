@@ -0,0 +1,99 @@
+import hashlib
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from app import app, db
+from app.models import JobApplication, ResumeBlob, ResumeUpload, StoredResume, User
+from app.services.blob_storage import LocalBlobStorage
+from app.services.resume_gc import ResumeGC
+from app.services.resume_store import ResumeStore
+
+
+def age(path, seconds=7200):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_resume_gc_reclaims_unreferenced_files_after_grace_period(client, tmp_path, mocker):
+    legacy = tmp_path / "uploads"
+    legacy.mkdir()
+    store = ResumeStore(LocalBlobStorage(str(tmp_path / "store")), legacy_dir=str(legacy))
+    two_hours_ago = datetime.utcnow() - timedelta(hours=2)
+
+    kept = store.put(b"%PDF-1.4\n%kept", 'kept.pdf')
+    student = User(username="gcstudent", email="gc@example.com", password="testpassword",
+                   resume_path=str(kept.id))
+    db.session.add(student)
+    orphaned = store.put(b"%PDF-1.4\n%deleted application", 'orphaned.pdf')
+    in_flight = store.put(b"%PDF-1.4\n%just uploaded", 'in_flight.pdf')
+    orphaned.created_on = two_hours_ago
+    ResumeBlob.query.filter_by(file_hash=kept.file_hash).update({ResumeBlob.ref_count: 5})  # drifted
+    db.session.commit()
+
+    stray = hashlib.sha256(b"stray").hexdigest()  # written by an upload that failed before its commit
+    stray_path = tmp_path / "store" / stray[:2] / stray[2:4] / stray
+    stray_path.parent.mkdir(parents=True)
+    stray_path.write_bytes(b"stray")
+    age(stray_path)
+    (legacy / "old.pdf").write_bytes(b"%PDF-1.4\n%replaced long ago")
+    (legacy / "current.pdf").write_bytes(b"%PDF-1.4\n%still referenced")
+    (legacy / "notes.md").write_bytes(b"not a resume")
+    for name in ("old.pdf", "current.pdf", "notes.md"):
+        age(legacy / name)
+    db.session.add(JobApplication(user_id=student.id, job_link="https://example.com", status="Applied",
+                                  applied_on=date.today(), last_update_on=date.today(),
+                                  resume_path="static/resumes/current.pdf"))
+    db.session.commit()
+    orphaned_hash, orphaned_size = orphaned.file_hash, orphaned.size
+
+    report = ResumeGC(app, store, grace=3600, batch_size=1).run()
+
+    assert report.released == 1 and report.refcounts_fixed == 1
+    assert report.blobs_deleted == 2 and report.files_deleted == 1
+    assert report.bytes_reclaimed == orphaned_size + len(b"stray") + len(b"%PDF-1.4\n%replaced long ago")
+    assert StoredResume.query.get(kept.id) is not None and StoredResume.query.get(in_flight.id) is not None
+    assert ResumeBlob.query.get(kept.file_hash).ref_count == 1
+    assert ResumeBlob.query.get(orphaned_hash) is None
+    assert not os.path.exists(store.blob_path(orphaned_hash)) and not stray_path.exists()
+    assert os.path.exists(store.blob_path(in_flight.file_hash))
+    assert sorted(os.listdir(legacy)) == ["current.pdf", "notes.md"]
+
+
+def test_resume_gc_keeps_blobs_referenced_within_grace_period(client, store):
+    two_hours_ago = datetime.utcnow() - timedelta(hours=2)
+    content = b"%PDF-1.4\n%uploaded again"
+    file_hash = hashlib.sha256(content).hexdigest()
+    # An orphan copy of the file, as if its last upload had been deleted without the blob
+    orphan = store.put(content, 'first.pdf')
+    db.session.delete(orphan)
+    ResumeBlob.query.filter_by(file_hash=file_hash).delete()
+    db.session.commit()
+    age(store.blob_path(file_hash))
+
+    resume = store.put(content, 'second.pdf')
+    assert os.path.getmtime(store.blob_path(file_hash)) > time.time() - 60  # written again, not reused
+    db.session.delete(resume)
+    ResumeBlob.query.filter_by(file_hash=file_hash).update({ResumeBlob.ref_count: 0,
+                                                            ResumeBlob.created_on: two_hours_ago})
+    db.session.commit()
+
+    gc = ResumeGC(app, store, grace=3600)
+    assert gc.run().blobs_deleted == 0  # the row changed within the grace period
+    assert os.path.exists(store.blob_path(file_hash))
+
+    ResumeBlob.query.filter_by(file_hash=file_hash).update({ResumeBlob.updated_on: two_hours_ago})
+    db.session.commit()
+    assert gc.run().blobs_deleted == 1
+    assert ResumeBlob.query.get(file_hash) is None and not os.path.exists(store.blob_path(file_hash))
+
+
+def test_resume_gc_prunes_upload_text_past_its_ttl(client, store):
+    db.session.add(ResumeUpload(file_hash="a" * 64, text="old", created_on=datetime.utcnow() - timedelta(hours=2)))
+    db.session.add(ResumeUpload(file_hash="b" * 64, text="recent"))
+    db.session.commit()
+
+    report = ResumeGC(app, store, upload_text_ttl=3600, batch_size=1).run()
+
+    assert report.upload_texts_pruned == 1
+    assert ResumeUpload.query.get("a" * 64) is None and ResumeUpload.query.get("b" * 64) is not None
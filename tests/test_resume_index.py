@@ -0,0 +1,37 @@
+import hashlib
+import zipfile
+from io import BytesIO
+
+from app.models import ResumeText
+
+
+def make_docx(*paragraphs):
+    body = "".join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    document = ('<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="http://schemas.openxmlformats.org/'
+                f'wordprocessingml/2006/main"><w:body>{body}</w:body></w:document>')
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+
+def test_resume_index_extracts_text_of_each_format(client, store, indexer):
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        pdf = store.put(f.read(), 'resume.pdf')
+    docx = store.put(make_docx('Kubernetes  operator', 'Ｔｅｒｒａｆｏｒｍ modules'), 'resume.docx')
+    txt = store.put(b"Teaching assistant\n\nfor CSC 510", 'resume.txt')
+
+    assert ResumeText.query.get(pdf.file_hash).text
+    docx_row = ResumeText.query.get(docx.file_hash)
+    assert docx_row.text == "Kubernetes operator Terraform modules"  # NFKC folds the full-width letters
+    assert docx_row.text_hash == hashlib.sha256(docx_row.text.encode('utf-8')).hexdigest()
+    assert ResumeText.query.get(txt.file_hash).text == "Teaching assistant for CSC 510"
+    assert [file_hash for file_hash, _ in indexer.search('terraform')] == [docx.file_hash]
+
+
+def test_resume_index_forgets_deleted_blobs(client, store, indexer):
+    resume = store.put(b"Django developer", 'resume.txt')
+    store.release(str(resume.id))
+
+    assert ResumeText.query.get(resume.file_hash) is None
+    assert indexer.search('django') == []
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+from app import app, db
+from app.models import ResumeJob
+from app.services.resume_jobs import ResumeJobQueue
+
+
+def test_resume_job_recovered_under_its_admission_key(client, eager_resume_jobs, mocker, fake_chat):
+    mocker.patch('ollama.chat', side_effect=fake_chat('<think></think> add metrics'))
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        response = client.post('/resume_parser', data={'file': f}, environ_base={'REMOTE_ADDR': '203.0.113.7'})
+    job = ResumeJob.query.get(response.json['job_id'])
+    assert job.admission_key == 'anonymous:203.0.113.7'
+
+    # Left running by a crashed process, then picked up again by the next one
+    job.status = 'running'
+    db.session.commit()
+    limiter = mocker.Mock()
+    queue = ResumeJobQueue(app, {'advice': lambda job, on_token: 'ok'}, limiter=limiter)
+    assert queue.recover() == 1
+    limiter.admit.assert_called_once_with('anonymous:203.0.113.7', force=True)
+
+
+def test_resume_job_recovered_only_after_its_lease_expires_and_by_one_queue(client, eager_resume_jobs):
+    ran = []
+    first, second, third = (ResumeJobQueue(app, {'advice': lambda job, on_token: ran.append(job.id) or 'ok'})
+                            for _ in range(3))
+    live = ResumeJob(id="live", task="advice", status="running", resume_text="resume", owner=first.worker_id,
+                     lease_expires=datetime.utcnow() + timedelta(minutes=1))
+    dead = ResumeJob(id="dead", task="advice", status="running", resume_text="resume", owner="stopped:1:abc",
+                     lease_expires=datetime.utcnow() - timedelta(seconds=1))
+    db.session.add_all([live, dead])
+    db.session.commit()
+
+    assert second.recover() == 1
+    assert third.recover() == 0
+    assert ran == ["dead"]
+    assert ResumeJob.query.get("dead").status == "complete"
+    assert ResumeJob.query.get("live").status == "running"
+
+    # A queue whose job was taken over while it ran does not record its result
+    def taken_over(job, on_token):
+        ResumeJob.query.filter_by(id=job.id).update({"owner": third.worker_id, "status": "queued"})
+        db.session.commit()
+        return "late"
+
+    job = ResumeJobQueue(app, {'advice': taken_over}).submit('advice', "resume")
+    db.session.expire_all()
+    job = ResumeJob.query.get(job.id)
+    assert (job.owner, job.status, job.result) == (third.worker_id, "queued", None)
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from app import app
+from app.services.resume_preview import PreviewCache, ResumePreviewer
+
+
+@pytest.fixture
+def previewer(indexer, store, mocker, tmp_path):
+    previewer = ResumePreviewer(app, PreviewCache(str(tmp_path / 'previews')), store, indexer, pdftoppm="")
+    mocker.patch('app.routes.resume_previewer', previewer)
+    return previewer
+
+
+def test_resume_preview_rendered_after_indexing_and_served_immutable(client, previewer, login_user):
+    resume = previewer.store.put(b"Jane Doe <Teaching Assistant> " + b"word " * 100, 'resume.txt',
+                                 owner_id=login_user.id)
+    image, snippet = previewer.cache.get(resume.file_hash)
+    assert image.endswith('.svg')
+    assert snippet.startswith("Jane Doe <Teaching Assistant> word") and snippet.endswith("…")
+    assert len(snippet) <= 281
+
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id  # a recruiter
+    response = client.get(f'/resume_preview/{resume.file_hash}')
+    assert response.status_code == 200
+    assert b"&lt;Teaching Assistant&gt;" in response.data
+    assert 'immutable' in response.headers['Cache-Control']
+    assert f"max-age={app.config['RESUME_PREVIEW_MAX_AGE']}" in response.headers['Cache-Control']
+
+
+def test_resume_preview_regenerated_from_stored_text_after_eviction(client, previewer, mocker):
+    resume = previewer.store.put(b"Data analyst with Tableau", 'resume.txt')
+    previewer.cache.max_bytes = 1
+    previewer.store.put(b"Another resume entirely", 'other.txt')  # evicts the first preview
+    assert previewer.cache.get(resume.file_hash) is None
+
+    blob_path = mocker.spy(previewer.store, 'blob_path')
+    assert previewer.preview(resume.file_hash, 'resume.txt') is None  # queued (inline in tests)
+    assert previewer.cache.get(resume.file_hash)[1] == "Data analyst with Tableau"
+    assert blob_path.call_count == 0  # rebuilt from the indexed text, not the file
+
+
+def test_preview_cache_evicts_least_recently_used(tmp_path):
+    cache = PreviewCache(str(tmp_path), max_bytes=250)
+    for name in ("a" * 64, "b" * 64, "c" * 64):
+        cache.put(name, b"x" * 100, "svg", "")
+        if name[0] == "b":
+            cache.get("a" * 64)  # a is now more recently used than b
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) is not None
+    assert cache.get("c" * 64) is not None
+    assert not os.path.exists(tmp_path / "bb" / f"{'b' * 64}.svg")
+
+
+def test_preview_cache_shares_previews_and_budget_across_workers(tmp_path):
+    first, second = PreviewCache(str(tmp_path), max_bytes=250), PreviewCache(str(tmp_path), max_bytes=250)
+    first.put("a" * 64, b"x" * 100, "svg", "first")
+    assert first.get("a" * 64) == (f"aa/{'a' * 64}.svg", "first")
+    assert second.get("a" * 64) == (f"aa/{'a' * 64}.svg", "first")  # written by another worker
+
+    second.put("b" * 64, b"x" * 100, "svg", "")
+    first.put("c" * 64, b"x" * 100, "svg", "")  # over the shared budget: a is the least recently used
+    assert second.get("a" * 64) is None
+    assert first.get("b" * 64) is not None
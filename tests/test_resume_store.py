@@ -0,0 +1,85 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+
+from app import db
+from app.models import ResumeBlob, StoredResume, User
+from app.services.blob_storage import LocalBlobStorage
+from app.services.resume_store import CHUNK_SIZE, ResumeStore, UploadRejected
+
+
+def test_resume_store_shares_one_blob_between_identical_uploads(client, store, login_user, tmp_path):
+    data = b"%PDF-1.4\n%Shared resume"
+    other = User(username="storestudent", email="storestudent@example.com", password="testpassword")
+    db.session.add(other)
+    db.session.commit()
+    other_resume = store.put(data, 'Resume.pdf', owner_id=other.id)
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    client.post('/upload_resume', data={'resume': (BytesIO(data), 'Resume.pdf')}, content_type='multipart/form-data')
+
+    db.session.expire_all()
+    resume_id = User.query.get(login_user.id).resume_path
+    assert resume_id.isdigit() and resume_id != str(other_resume.id)
+    file_hash = hashlib.sha256(data).hexdigest()
+    assert store.blob_path(file_hash) == str(tmp_path / file_hash[:2] / file_hash[2:4] / file_hash)
+    assert ResumeBlob.query.get(file_hash).ref_count == 2
+    assert StoredResume.query.get(int(resume_id)).owner_id == login_user.id
+
+    response = client.get(f'/download_resume/{login_user.id}')
+    assert response.data == data
+    assert response.content_type == 'application/pdf'
+    assert 'Resume.pdf' in response.headers['Content-Disposition']
+
+
+def test_resume_store_deletes_blob_with_last_reference(client, store, login_user):
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    first, second = b"%PDF-1.4\n%first", b"%PDF-1.4\n%second"
+    client.post('/upload_resume', data={'resume': (BytesIO(first), 'a.pdf')}, content_type='multipart/form-data')
+    client.post('/upload_resume', data={'resume': (BytesIO(second), 'b.pdf')}, content_type='multipart/form-data')
+
+    db.session.expire_all()
+    first_hash = hashlib.sha256(first).hexdigest()
+    assert ResumeBlob.query.get(first_hash) is None
+    assert not os.path.exists(store.blob_path(first_hash))
+    assert StoredResume.query.count() == 1
+    assert store.resolve(User.query.get(login_user.id).resume_path).name == 'b.pdf'
+
+
+def test_resume_store_resolves_legacy_paths(client, tmp_path):
+    legacy = tmp_path / "uploads"
+    legacy.mkdir()
+    (legacy / "old.txt").write_text("old resume")
+    store = ResumeStore(LocalBlobStorage(str(tmp_path / "store")), legacy_dir=str(legacy))
+
+    assert store.resolve("static/resumes/old.txt").path == str(legacy / "old.txt")
+    assert store.resolve(str(legacy / "old.txt")).mime == "text/plain"
+    assert store.resolve("static/resumes/missing.pdf") is None
+
+
+def test_resume_store_streams_upload_in_chunks(client, store, counting_stream):
+    data = b"%PDF-1.4\n" + b"x" * (3 * CHUNK_SIZE)
+    stream = counting_stream(data)
+    resume = store.put_stream(stream, 'long.pdf')
+
+    assert set(stream.reads) == {CHUNK_SIZE}
+    assert resume.file_hash == hashlib.sha256(data).hexdigest()
+    assert resume.size == len(data)
+    with open(store.blob_path(resume.file_hash), 'rb') as f:
+        assert f.read() == data
+
+
+def test_resume_store_rejects_oversized_and_mislabelled_uploads(client, store, tmp_path):
+    with pytest.raises(UploadRejected):
+        store.put(b"%PDF-1.4\n" + b"x" * 100, 'big.pdf', max_bytes=50)
+    with pytest.raises(UploadRejected):
+        store.put(b"MZ\x90\x00 not a pdf", 'resume.pdf')
+    with pytest.raises(UploadRejected):
+        store.put(b"", 'empty.txt')
+    assert store.put(b"plain text resume", 'resume.txt').mime == 'text/plain'
+
+    assert os.listdir(tmp_path / 'tmp') == []  # rejected uploads leave nothing behind
+    assert ResumeBlob.query.count() == 1
@@ -1,31 +1,32 @@
 import os
 import sys
 import pytest
-from app import app, db
-from app.models import Meetings, User, Reviews, JobApplication, JobExperience, Recruiter_Postings, PostingApplications
+from app import app, db, bcrypt
+from app.routes import model_registry, pdf_extractor, resume_jobs
+from app.services.resume_analysis import llm_cache, llm_limiter, cached_resume_advice, resume_advice
+from app.services.llm_backend import OllamaBackend, StubBackend
+from app.services.model_registry import ModelRegistry
+from app.services.blob_storage import LocalBlobStorage, StorageError
+from app.services.resume_store import ResumeStore
+from app.services.password_hasher import PasswordHasherBusy, hash_cost
+from app.services.resume_bundle import BundleCache
+from app.models import Meetings, User, Reviews, JobApplication, JobExperience, Recruiter_Postings, PostingApplications, ResumeJob, ApplicantSummary, ResumeUpload, StoredResume
 from datetime import datetime
 from unittest.mock import patch
-from flask import url_for 
+from flask import g, url_for 
 from flask_login import login_user, current_user
 import ollama
 from ollama import ChatResponse, chat
+import hashlib
 import io
+import requests
 import sqlite3
+import threading
+import time
+import zipfile
 from io import BytesIO
 
 
-@pytest.fixture
-def client():
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-            yield client
-            db.drop_all()
-        
-                
-
-
 @pytest.fixture
 def create_reviews(client, login_user):
     """Fixture to create multiple reviews for testing."""
@@ -248,17 +249,6 @@ def test_view_scheduled_meetings(client, login_user): # task 20
     assert b"Scheduled Meetings" in response.data
 
 # End of testing 2/25
-@pytest.fixture
-def login_user(client):
-    user = User(username="testuser", email="testuser@example.com", password="testpassword", is_recruiter=True)
-    db.session.add(user)
-    db.session.commit()
-
-    # Log in the user
-    with client.session_transaction() as session:
-        session['user_id'] = user.id
-        
-    return user
 
 @pytest.fixture
 def create_review(login_user):
@@ -1190,28 +1180,32 @@ def test_resume_parser_we_nofile_login(client, login_user):
     assert b'failed' in response.data.lower()
 
 # Test the response if a file is attached in either case
-def test_resume_parser_file_login(client, login_user): # this tests only get
-    # with client.session_transaction() as session:
-    #     session['user_id'] = login_user.id
+def test_resume_parser_file_login(client, login_user, eager_resume_jobs, mocker, fake_chat):
+    mocker.patch('ollama.chat', side_effect=fake_chat('<think>reading the resume</think> quantify your impact'))
 
-        # get the pdf here
-        # add pass the fileobject in data
     with open('./tests/test_data/test_resume.pdf', 'rb') as f:
         response = client.post('/resume_parser',data={'file': f},follow_redirects=True)
 
-    print(response)
-    assert b'<think>' in response.data.lower()
+    assert response.status_code == 202
+    status = client.get(f"/resume_jobs/{response.json['job_id']}")
+    assert status.json['state'] == 'complete'
+    assert '<think>' in status.json['result'].lower() and 'quantify your impact' in status.json['result']
 
-def test_resume_parser_we_file_login(client, login_user):
-    # with client.session_transaction() as session:
-    #     session['user_id'] = login_user.id
+def test_resume_parser_we_file_login(client, login_user, eager_resume_jobs, mocker):
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    chat = mocker.patch('ollama.chat')
 
-        # get the pdf here
-        # add pass the fileobject in data
     with open('./tests/test_data/test_resume.pdf', 'rb') as f:
         response = client.post('/resume_parser_we',data={'file': f},follow_redirects=True)
 
-        assert b'job_title' in response.data.lower()
+    # The dated entries are read by the parser and skill matcher, so no model job is needed
+    assert response.status_code == 200
+    assert response.json['status'] == 'Task complete'
+    assert 'job_title' in response.json['result'].lower()
+    assert not chat.called
+    experience = JobExperience.query.filter_by(username=login_user.username, company_name="Salesforce, Inc.").first()
+    assert experience.job_title == "Associate Technical Consultant" and "Java" in experience.skills.split(",")
 
 # Test the response if a file is attached in either case
 def test_resume_parser_we_db(client, login_user): # this tests only get
@@ -1222,12 +1216,23 @@ def test_resume_parser_we_db(client, login_user): # this tests only get
         # add pass the fileobject in data
     with open('./tests/test_data/test_resume.pdf', 'rb') as f:
         response = client.post('/resume_parser_we',data={'file': f},follow_redirects=True)
-        con = sqlite3.connect("./app/app.db")
+        con = sqlite3.connect(db.engine.url.database)
         cur = con.cursor()
         res = cur.execute("SELECT id FROM job_experience").fetchall()
         print(res)
         # query db and check if work experience is added
         assert b'failed' in response.data.lower()
+
+def test_resume_parser_we_rejects_anonymous_before_queueing(client, eager_resume_jobs, mocker):
+    submit = mocker.patch('app.routes.resume_jobs.submit')
+
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
+        response = client.post('/resume_parser_we', data={'file': f})
+
+    assert response.status_code == 401
+    assert response.json['status'] == 'Task Failed'
+    assert not submit.called
+    assert ResumeJob.query.count() == 0
         
 
 # Test whether ollama is working as expected
@@ -1330,27 +1335,633 @@ def test_resume_parser_corrupt_pdf(client, login_user):
     assert b'failed' in response.data.lower()
 
 # testing incorrect ollama response
-def test_resume_parser_we_malformed_json(client, login_user, mocker):
+def test_resume_parser_we_malformed_json(client, login_user, eager_resume_jobs, mocker, fake_chat):
     mock_response = '{invalid_json_response}'  # Simulate incorrect JSON
-    mocker.patch('ollama.chat', return_value=type('Response', (), {"message": type('Message', (), {"content": mock_response})}))
-
-    # with client.session_transaction() as session:
-    #     session['user_id'] = login_user.id
+    mocker.patch('ollama.chat', side_effect=fake_chat(mock_response))
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
 
-    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+    # A document without dated experience entries, so the model is asked
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
         response = client.post('/resume_parser_we', data={'file': f}, follow_redirects=True)
 
-    assert b'failed' in response.data.lower()
+    assert response.status_code == 202
+    status = client.get(f"/resume_jobs/{response.json['job_id']}")
+    assert status.json['state'] == 'failed'
+    assert status.json['status'] == 'Task Failed'
+    assert JobExperience.query.filter_by(username=login_user.username).count() == 0
 
 # # testing non resume document on ollama
-def test_resume_parser_non_resume(client, login_user, mocker):
-    #mock_response = '{invalid_json_response}'  # Simulate incorrect JSON
-    #mocker.patch('chat', return_value=type('Response', (), {"message": type('Message', (), {"content": mock_response})}))
-
-    # with client.session_transaction() as session:
-    #     session['user_id'] = login_user.id
+def test_resume_parser_non_resume(client, login_user, eager_resume_jobs, mocker, fake_chat):
+    chat = mocker.patch('ollama.chat', side_effect=fake_chat('<think>an assignment</think> This is not a resume'))
 
     with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
         response = client.post('/resume_parser', data={'file': f}, follow_redirects=True)
 
-    assert b'<think>' in response.data.lower()
+    assert response.status_code == 202
+    status = client.get(f"/resume_jobs/{response.json['job_id']}")
+    assert status.json['state'] == 'complete'
+    assert '<think>' in status.json['result'].lower() and 'not a resume' in status.json['result']
+    assert 'CSC520 Fall 2024 Assignment 2' in str(chat.call_args_list)  # the document's own text was sent
+
+
+# Background job queue for the LLM endpoints
+def test_resume_parser_returns_job_id(client, eager_resume_jobs, mocker, fake_chat):
+    mocker.patch('ollama.chat', side_effect=fake_chat('<think></think> add metrics'))
+
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        response = client.post('/resume_parser', data={'file': f})
+
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+
+    status = client.get(f'/resume_jobs/{job_id}')
+    assert status.json['state'] == 'complete'
+    assert 'add metrics' in status.json['result']
+
+
+def test_resume_parser_we_job_saves_experience(client, eager_resume_jobs, mocker):
+    user = User(username="jobuser", email="jobuser@example.com", password="testpassword")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = user.id
+
+    content = '[{"job_title":"TA","company_name":"NCSU","location":"Raleigh","duration":"1 year","description":"Grading","skills":["Python"]}]'
+    mocker.patch('ollama.chat', return_value=type('Response', (), {"message": type('Message', (), {"content": content})}))
+
+    with open('./tests/test_data/Assignment2-Description.pdf', 'rb') as f:
+        response = client.post('/resume_parser_we', data={'file': f})
+
+    status = client.get(response.json['status_url'])
+    assert status.json['state'] == 'complete'
+    assert JobExperience.query.filter_by(username="jobuser", company_name="NCSU").count() == 1
+
+
+def test_resume_job_status_hidden_from_other_users(client):
+    owner = User(username="owner", email="owner@example.com", password="testpassword")
+    db.session.add(owner)
+    db.session.commit()
+    job = ResumeJob(id="abc123", user_id=owner.id, task="advice", status="complete", resume_text="resume", result="ok")
+    db.session.add(job)
+    db.session.commit()
+
+    assert client.get('/resume_jobs/abc123').status_code == 404
+
+
+# Cached model readiness
+def test_healthz_reports_model_ready(client, mocker):
+    mocker.patch('ollama.list', return_value={'models': [type('Model', (), {'model': 'deepseek-r1:1.5b'})]})
+    model_registry.refresh()
+
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.json['model_ready'] is True
+
+
+def test_healthz_when_ollama_down(client, mocker):
+    mocker.patch('ollama.list', return_value={'models': []})
+    model_registry.refresh()
+    mocker.patch('ollama.list', side_effect=ConnectionError("daemon busy"))
+    model_registry.refresh()
+
+    response = client.get('/healthz')
+    assert response.status_code == 503
+    assert 'daemon busy' in response.json['error']
+
+
+def test_healthz_unready_once_model_list_outlives_ttl_without_refresh(client, mocker):
+    backend = StubBackend()
+    registry = ModelRegistry(backend, ttl=60)
+    mocker.patch('app.routes.model_registry', registry)
+    registry.refresh()
+    mocker.patch.object(backend, 'list_models', side_effect=ConnectionError("daemon down"))
+    registry.refresh()
+    assert client.get('/healthz').status_code == 200  # the last list is still within its TTL
+
+    clock = time.monotonic() + 61
+    mocker.patch('app.services.model_registry.time.monotonic', return_value=clock)
+    registry.refresh()
+    response = client.get('/healthz')
+    assert response.status_code == 503
+    assert response.json['stale'] is True and response.json['models'] == ['deepseek-r1:1.5b']
+    assert not registry.is_ready('deepseek-r1:1.5b')
+
+    backend.list_models.side_effect = None
+    backend.list_models.return_value = ['deepseek-r1:1.5b']
+    registry.refresh()
+    assert client.get('/healthz').status_code == 200
+
+
+def test_resume_parser_get_uses_cached_models(client, mocker):
+    list_models = mocker.patch('ollama.list', return_value={'models': []})
+    model_registry.refresh()
+    list_models.reset_mock()
+
+    for _ in range(3):
+        response = client.get('/resume_parser')
+        assert response.status_code == 200
+    assert list_models.call_count == 0
+
+
+# Content-addressed LLM result cache
+def test_resume_parser_repeat_upload_served_from_cache(client, eager_resume_jobs, mocker, fake_chat):
+    chat = mocker.patch('ollama.chat', side_effect=fake_chat('use action verbs'))
+
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        first = client.post('/resume_parser', data={'file': f})
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        second = client.post('/resume_parser', data={'file': f})
+
+    assert first.status_code == 202
+    assert second.status_code == 200
+    assert second.json == {'status': 'Task complete', 'result': 'use action verbs'}
+    assert chat.call_count == 1
+
+
+# Token streaming
+def test_resume_advice_streams_tokens_to_job_room(client, eager_resume_jobs, mocker, fake_chat):
+    mocker.patch('ollama.chat', side_effect=fake_chat('quantify your impact'))
+    emit = mocker.patch('app.services.resume_jobs.socketio.emit')
+
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        job_id = client.post('/resume_parser', data={'file': f}).json['job_id']
+
+    tokens = [call.args[1] for call in emit.call_args_list if call.args[0] == 'resume_job_token']
+    assert [t['token'] for t in tokens] == ['quantify ', 'your ', 'impact']
+    assert [t['offset'] for t in tokens] == [0, 9, 14]
+    final = [call.args[1] for call in emit.call_args_list if call.args[0] == 'resume_job_update']
+    assert final[0]['job_id'] == job_id
+    assert final[0]['result'] == 'quantify your impact'
+
+
+# LLM admission control
+def test_resume_parser_busy_returns_retry_after(client, eager_resume_jobs, mocker):
+    mocker.patch.object(llm_limiter, 'max_per_user', 0)
+
+    with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+        response = client.post('/resume_parser', data={'file': f})
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert b'llm_rejections_total{reason="per_user"}' in client.get('/metrics').data
+
+
+# Pluggable LLM backend
+def test_resume_parser_runs_on_stub_backend(client, mocker, fake_chat):
+    stub = StubBackend(response_tokens=6)
+    mocker.patch('app.services.resume_analysis.llm_backend', stub)
+    mocker.patch.object(model_registry, 'backend', stub)
+    model_registry.refresh()
+    llm_cache.clear()
+    app.config['RESUME_JOBS_EAGER'] = True
+    try:
+        with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+            response = client.post('/resume_parser', data={'file': f})
+    finally:
+        app.config['RESUME_JOBS_EAGER'] = False
+
+    status = client.get(response.json['status_url'])
+    assert status.json['state'] == 'complete'
+    assert len(status.json['result'].split()) == 6
+
+    # Switching to the real model does not serve the stub's cached answer
+    mocker.patch('app.services.resume_analysis.llm_backend', OllamaBackend())
+    chat = mocker.patch('ollama.chat', side_effect=fake_chat('<think></think> from the real model'))
+    text = pdf_extractor.extract(open('./tests/test_data/test_resume.pdf', 'rb').read(), page_separator="\n")
+    assert cached_resume_advice(text) is None
+    assert resume_advice(text) == '<think></think> from the real model' and chat.called
+    model_registry.clear()
+
+
+# Recruiter batch resume summaries
+def test_posting_summaries_batch_skips_unchanged_resumes(client, eager_resume_jobs, mocker, tmp_path, fake_chat):
+    # Resumes saved before the store existed, in the legacy upload folder
+    mocker.patch('app.routes.resume_store', ResumeStore(LocalBlobStorage(str(tmp_path / "store")), legacy_dir=str(tmp_path)))
+    recruiter = User(username="batchrecruiter", email="batchrec@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(recruiter)
+    db.session.commit()
+    posting = Recruiter_Postings(recruiterId=recruiter.id, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    for index in range(3):
+        resume = tmp_path / f"resume{index}.txt"
+        resume.write_text(f"Applicant {index}\nEXPERIENCE\nTA at NCSU")
+        applicant = User(username=f"batchapplicant{index}", email=f"batch{index}@example.com", password="testpassword",
+                         resume_path=str(resume) if index < 2 else None)
+        db.session.add(applicant)
+        db.session.flush()
+        db.session.add(PostingApplications(postingId=posting.postingId, recruiterId=recruiter.id, applicantId=applicant.id))
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = recruiter.id
+
+    chat = mocker.patch('ollama.chat', side_effect=fake_chat(
+        '<think></think>{"headline": "Experienced TA", "years_experience": "2", "skills": "Grading, Python"}'))
+    emit = mocker.patch('app.routes.socketio.emit')
+
+    response = client.post(f'/recruiter/{posting.postingId}/summaries')
+    assert response.status_code == 202
+    status = client.get(response.json['status_url']).json
+    assert status['state'] == 'complete'
+    assert status['result'] == 'Summarized 2 of 3 applicants (0 unchanged, 1 failed)'
+    assert chat.call_count == 2
+    progress = [call.args[1]['done'] for call in emit.call_args_list if call.args[0] == 'applicant_summary']
+    assert sorted(progress) == [1, 1, 2, 2, 3, 3]  # job room and recruiter room
+
+    summaries = client.get(f'/recruiter/{posting.postingId}/summaries').json['summaries']
+    complete = [s['summary'] for s in summaries if s['status'] == 'complete']
+    assert complete == [{"headline": "Experienced TA", "years_experience": 2.0, "skills": ["Grading", "Python"],
+                         "highlights": []}] * 2
+
+    client.post(f'/recruiter/{posting.postingId}/summaries')
+    assert chat.call_count == 2  # unchanged resumes are not summarized again
+    assert ApplicantSummary.query.filter_by(posting_id=posting.postingId, status='complete').count() == 2
+
+
+def test_posting_summaries_only_for_posting_owner(client):
+    posting = Recruiter_Postings(recruiterId=999, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    user = User(username="notowner", email="notowner@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = user.id
+
+    assert client.post(f'/recruiter/{posting.postingId}/summaries').status_code == 404
+
+
+# Single-flight coalescing of identical resume work
+def test_resume_upload_text_extracted_once_for_both_endpoints(client, eager_resume_jobs, mocker, fake_chat):
+    pdf_extractor._cache.clear()
+    parse = mocker.spy(pdf_extractor, '_parse')
+    mocker.patch('ollama.chat', side_effect=fake_chat('[{"job_title":"TA","company_name":"NCSU"}]'))
+
+    for url in ('/resume_parser', '/resume_parser_we', '/resume_parser'):
+        pdf_extractor._cache.clear()
+        with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+            client.post(url, data={'file': f})
+
+    assert parse.call_count == 1
+    assert ResumeUpload.query.count() == 1
+
+
+def test_resume_parser_double_submit_shares_job(client, mocker, fake_chat):
+    mocker.patch('ollama.list', return_value={'models': [type('Model', (), {'model': 'deepseek-r1:1.5b'})]})
+    model_registry.refresh()
+    llm_cache.clear()
+    release = threading.Event()
+
+    def slow_chat(model, messages, stream=False, **kwargs):
+        release.wait(2)
+        return fake_chat('add metrics')(model, messages, stream)
+
+    chat = mocker.patch('ollama.chat', side_effect=slow_chat)
+    job_ids = []
+    for _ in range(2):
+        with open('./tests/test_data/test_resume.pdf', 'rb') as f:
+            job_ids.append(client.post('/resume_parser', data={'file': f}).json['job_id'])
+    release.set()
+    for _ in range(200):
+        if not resume_jobs.pending():
+            break
+        time.sleep(0.01)
+
+    assert job_ids[0] == job_ids[1]
+    assert chat.call_count == 1
+
+
+# Streaming uploads with size caps
+def test_upload_resume_flashes_rejected_file(client, store, login_user):
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    response = client.post('/upload_resume', data={'resume': (BytesIO(b"GIF89a"), 'resume.pdf')},
+                           content_type='multipart/form-data', follow_redirects=True)
+
+    assert b"does not look like a .pdf file" in response.data
+    assert StoredResume.query.count() == 0
+
+
+def test_request_body_over_max_content_length_is_refused(client, login_user, mocker):
+    mocker.patch.dict(app.config, {'MAX_CONTENT_LENGTH': 1024})
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    response = client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-" + b"x" * 4096), 'resume.pdf')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 413
+
+
+# Offloaded, cache-friendly resume downloads
+def test_download_resume_etag_revalidates_and_serves_ranges(client, store, login_user):
+    data = b"%PDF-1.4\n%ranged resume"
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    client.post('/upload_resume', data={'resume': (BytesIO(data), 'resume.pdf')}, content_type='multipart/form-data')
+
+    response = client.get(f'/download_resume/{login_user.id}')
+    file_hash = hashlib.sha256(data).hexdigest()
+    assert response.headers['ETag'] == f'"{file_hash}"'
+    assert 'private' in response.headers['Cache-Control']
+
+    repeat = client.get(f'/download_resume/{login_user.id}', headers={'If-None-Match': f'"{file_hash}"'})
+    assert repeat.status_code == 304
+    assert repeat.data == b""
+
+    partial = client.get(f'/download_resume/{login_user.id}', headers={'Range': 'bytes=0-3'})
+    assert partial.status_code == 206
+    assert partial.data == b"%PDF"
+
+
+def test_download_resume_hands_transfer_to_proxy(client, store, login_user, mocker):
+    data = b"%PDF-1.4\n%proxied resume"
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    client.post('/upload_resume', data={'resume': (BytesIO(data), 'resume.pdf')}, content_type='multipart/form-data')
+    file_hash = hashlib.sha256(data).hexdigest()
+
+    mocker.patch.dict(app.config, {'RESUME_SENDFILE': 'x-accel-redirect'})
+    response = client.get(f'/download_resume/{login_user.id}')
+    assert response.headers['X-Accel-Redirect'] == f'/protected-resumes/{file_hash[:2]}/{file_hash[2:4]}/{file_hash}'
+    assert response.data == b""
+    assert response.content_type == 'application/pdf'
+    assert 'resume.pdf' in response.headers['Content-Disposition']
+
+    mocker.patch.dict(app.config, {'RESUME_SENDFILE': 'x-sendfile'})
+    response = client.get(f'/download_resume/{login_user.id}')
+    assert response.headers['X-Sendfile'] == store.blob_path(file_hash)
+
+
+# Resume text extraction and search at upload time
+def test_search_candidates_by_resume_text(client, store, indexer, login_user, mocker):
+    student = User(username="indexedstudent", email="indexed@example.com", password="testpassword")
+    db.session.add(student)
+    db.session.commit()
+    store.put(b"Built Kafka pipelines at Red Hat", 'resume.txt', owner_id=student.id)
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+
+    extract = mocker.spy(indexer, 'extract')
+    response = client.post('/search_candidates', data={'search_type': 'resume', 'search_query': 'kafka "red'})
+    assert b"indexedstudent" in response.data
+    assert b"Built Kafka pipelines at Red Hat" in response.data
+    assert extract.call_count == 0  # searching never parses files
+
+    response = client.post('/search_candidates', data={'search_type': 'resume', 'search_query': 'cobol'})
+    assert b"No resumes found matching your query." in response.data
+
+
+# Pluggable resume storage
+def test_download_resume_redirects_to_presigned_url(client, s3_storage, login_user, mocker):
+    mocker.patch('app.routes.resume_store', ResumeStore(s3_storage))
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%remote"), 'resume.pdf')},
+                content_type='multipart/form-data')
+
+    response = client.get(f'/download_resume/{login_user.id}')
+    assert response.status_code == 302
+    assert response.headers['Location'].startswith(s3_storage.endpoint_url)
+    assert requests.get(response.headers['Location']).content == b"%PDF-1.4\n%remote"
+
+    # Viewing the resume opens it in the browser instead of downloading it
+    view = client.get(f'/resume/{User.query.get(login_user.id).resume_path}')
+    assert view.status_code == 302
+    assert requests.get(view.headers['Location']).headers['Content-Disposition'].startswith('inline;')
+
+
+def test_upload_resume_reports_storage_outage(client, s3_stand_in, s3_storage, login_user, mocker):
+    mocker.patch('app.routes.resume_store', ResumeStore(s3_storage))
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    s3_stand_in.RequestHandlerClass.fail_with = 503
+    with pytest.raises(StorageError):
+        s3_storage.exists("ab/cd/abcd")
+
+    response = client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%remote"), 'resume.pdf')},
+                           content_type='multipart/form-data', follow_redirects=True)
+    assert response.status_code == 200
+    assert b'could not be stored right now' in response.data
+    assert User.query.get(login_user.id).resume_path is None
+
+
+def test_replaced_resume_released_only_after_new_path_is_committed(client, login_user, mocker):
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+    client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%first"), 'first.pdf')},
+                content_type='multipart/form-data')
+    first = User.query.get(login_user.id).resume_path
+    seen = []
+
+    def committed_path(resume_path):
+        # What another connection sees while the old reference is released
+        with sqlite3.connect(db.engine.url.database) as con:
+            seen.append(con.execute("SELECT resume_path FROM user WHERE id = ?", (login_user.id,)).fetchone()[0])
+    release = mocker.patch('app.routes.resume_store.release', side_effect=committed_path)
+
+    client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%second"), 'second.pdf')},
+                content_type='multipart/form-data')
+
+    second = User.query.get(login_user.id).resume_path
+    release.assert_called_once_with(first)
+    assert seen == [second] and second != first
+
+
+def test_migrate_command_moves_legacy_files_and_blobs(client, s3_storage, tmp_path, mocker):
+    legacy = tmp_path / "uploads"
+    legacy.mkdir()
+    (legacy / "Resume.pdf").write_bytes(b"%PDF-1.4\n%legacy")
+    student = User(username="legacystudent", email="legacy@example.com", password="testpassword",
+                   resume_path=str(legacy / "Resume.pdf"))
+    db.session.add(student)
+    db.session.commit()
+    student_id = student.id  # the CLI's app context tears down the session
+
+    local = LocalBlobStorage(str(tmp_path / "local"))
+    mocker.patch('app.routes.resume_store', ResumeStore(local, legacy_dir=str(legacy)))
+    result = app.test_cli_runner().invoke(args=['resumes', 'migrate'])
+    assert "Moved 1 resumes" in result.output
+    db.session.expire_all()
+    resume = StoredResume.query.get(int(User.query.get(student_id).resume_path))
+    assert resume.original_name == "Resume.pdf" and resume.owner_id == student_id
+    assert not (legacy / "Resume.pdf").exists()
+
+    mocker.patch('app.routes.resume_store', ResumeStore(s3_storage))
+    result = app.test_cli_runner().invoke(args=['resumes', 'migrate', '--from-dir', local.root])
+    assert "Copied 1 blobs" in result.output
+    assert s3_storage.exists(f"{resume.file_hash[:2]}/{resume.file_hash[2:4]}/{resume.file_hash}")
+    assert list(local.iter_keys()) == []
+
+
+# Resume garbage collection
+def test_resume_gc_command_reports_reclaimed_bytes(client, store):
+    resume = store.put(b"%PDF-1.4\n%unreferenced", 'resume.pdf')
+    path, size = store.blob_path(resume.file_hash), resume.size
+
+    result = app.test_cli_runner().invoke(args=['resumes', 'gc', '--grace', '0'])
+    assert "released 1 uploads, deleted 1 blobs" in result.output
+    assert f"reclaimed {size} bytes" in result.output
+    assert not os.path.exists(path)
+
+
+# Resume ZIP bundles
+@pytest.fixture
+def bundles(mocker, tmp_path):
+    bundles = BundleCache(str(tmp_path / 'bundles'))
+    mocker.patch('app.routes.resume_bundles', bundles)
+    return bundles
+
+
+def test_posting_resumes_zip_streams_every_resume_and_reuses_cached_bundle(client, store, bundles, mocker):
+    recruiter = User(username="ziprecruiter", email="ziprec@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(recruiter)
+    db.session.commit()
+    posting = Recruiter_Postings(recruiterId=recruiter.id, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    files = {"alice": (b"%PDF-1.4\n" + b"a" * 5000, 'cv.pdf'), "bob": (b"Bob\n" * 500, 'resume.txt'), "carol": None}
+    for username, upload in files.items():
+        applicant = User(username=username, email=f"{username}@example.com", password="testpassword")
+        db.session.add(applicant)
+        db.session.flush()
+        if upload:
+            applicant.resume_path = str(store.put(upload[0], upload[1], owner_id=applicant.id).id)
+        db.session.add(PostingApplications(postingId=posting.postingId, recruiterId=recruiter.id, applicantId=applicant.id))
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = recruiter.id
+    tee = mocker.spy(bundles, 'tee')
+
+    response = client.get(f'/recruiter/{posting.postingId}/resumes.zip')
+    assert response.status_code == 200 and tee.call_count == 1
+    assert response.headers['Content-Disposition'] == f"attachment; filename=posting-{posting.postingId}-resumes.zip"
+    with zipfile.ZipFile(BytesIO(response.data)) as archive:
+        assert archive.namelist() == ["alice-cv.pdf", "bob-resume.txt"]
+        assert archive.read("alice-cv.pdf") == files["alice"][0]
+        assert archive.read("bob-resume.txt") == files["bob"][0]
+        assert archive.getinfo("alice-cv.pdf").compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("bob-resume.txt").compress_type == zipfile.ZIP_DEFLATED
+    etag = response.headers['ETag']
+
+    cached = client.get(f'/recruiter/{posting.postingId}/resumes.zip')
+    assert cached.data == response.data and tee.call_count == 1  # sent from the bundle cache
+    assert cached.headers['ETag'] == etag
+    assert client.get(f'/recruiter/{posting.postingId}/resumes.zip',
+                      headers={'If-None-Match': etag}).status_code == 304
+
+    carol = User.query.filter_by(username="carol").first()
+    carol.resume_path = str(store.put(b"Carol", 'carol.txt', owner_id=carol.id).id)
+    db.session.commit()
+    changed = client.get(f'/recruiter/{posting.postingId}/resumes.zip')
+    assert tee.call_count == 2 and changed.headers['ETag'] != etag
+    assert zipfile.ZipFile(BytesIO(changed.data)).namelist() == ["alice-cv.pdf", "bob-resume.txt", "carol-carol.txt"]
+
+
+def test_posting_resumes_zip_only_for_posting_owner(client, bundles):
+    posting = Recruiter_Postings(recruiterId=999, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    user = User(username="zipnotowner", email="zipnotowner@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = user.id
+
+    assert client.get(f'/recruiter/{posting.postingId}/resumes.zip').status_code == 404
+
+
+# Password hashing
+@pytest.fixture
+def no_csrf(mocker):
+    mocker.patch.dict(app.config, {'WTF_CSRF_ENABLED': False})
+
+
+def test_login_rehashes_password_with_outdated_cost(client, no_csrf, mocker):
+    mocker.patch('app.routes.password_hasher.rounds', 5)
+    old_hash = bcrypt.generate_password_hash("rehashpassword", 4).decode("utf-8")
+    user = User(username="rehashuser", email="rehash@example.com", password=old_hash)
+    db.session.add(user)
+    db.session.commit()
+
+    response = client.post('/login', data={'email': 'rehash@example.com', 'password': 'rehashpassword'})
+    assert response.status_code == 302
+    db.session.expire_all()
+    new_hash = User.query.get(user.id).password
+    assert hash_cost(new_hash) == 5 and bcrypt.check_password_hash(new_hash, "rehashpassword")
+
+
+def test_login_returns_503_when_password_hashing_is_saturated(client, no_csrf, mocker):
+    mocker.patch('app.routes.password_hasher.check', side_effect=PasswordHasherBusy("Too many sign-ins"))
+    user = User(username="busyuser", email="busy@example.com", password="irrelevant")
+    db.session.add(user)
+    db.session.commit()
+
+    response = client.post('/login', data={'email': 'busy@example.com', 'password': 'somepassword'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert b"Too many sign-ins" in response.data
+
+
+def test_serve_resume_only_for_owner_and_recruiters_applied_to(client, store, mocker, tmp_path):
+    legacy = tmp_path / "uploads"
+    legacy.mkdir()
+    (legacy / "legacy.pdf").write_bytes(b"%PDF-1.4\n%legacy")
+    store.legacy_dir = str(legacy)
+    owner = User(username="resumeowner", email="owner@example.com", password="testpassword",
+                 resume_path="static/resumes/legacy.pdf")
+    recruiter = User(username="resumerecruiter", email="rr@example.com", password="testpassword", is_recruiter=True)
+    db.session.add_all([owner, recruiter])
+    db.session.commit()
+    resume = store.put(b"%PDF-1.4\n%stored", 'cv.pdf', owner_id=owner.id)
+    with client.session_transaction() as session:
+        session['_user_id'] = recruiter.id
+
+    # Files outside the upload folder are never served
+    for path in ('app/config.py', 'requirements.txt', 'app/app.db', '../app/config.py'):
+        assert client.get(f'/resume/{path}').status_code == 404
+    # Not an applicant of this recruiter
+    assert client.get(f'/resume/{resume.id}').status_code == 404
+    assert client.get('/resume/legacy.pdf').status_code == 404
+
+    posting = Recruiter_Postings(recruiterId=recruiter.id, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    db.session.flush()
+    db.session.add(PostingApplications(postingId=posting.postingId, recruiterId=recruiter.id, applicantId=owner.id))
+    db.session.commit()
+    assert client.get(f'/resume/{resume.id}').data == b"%PDF-1.4\n%stored"
+    assert client.get('/resume/legacy.pdf').data == b"%PDF-1.4\n%legacy"
+
+
+def _log_in(client, user):
+    """Switch the test client to ``user``; the client's app context keeps the previous user on ``g``."""
+    with client.session_transaction() as session:
+        session['_user_id'] = user.id
+    g.pop('_login_user', None)
+
+
+def test_download_resume_only_for_owner_and_recruiters_applied_to(client):
+    owner = User(username="resumeowner", email="owner@example.com", password="testpassword")
+    student = User(username="otherstudent", email="student@example.com", password="testpassword")
+    recruiter = User(username="resumerecruiter", email="rr@example.com", password="testpassword", is_recruiter=True)
+    db.session.add_all([owner, student, recruiter])
+    db.session.commit()
+    _log_in(client, owner)
+    client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%owner"), 'cv.pdf')},
+                content_type='multipart/form-data')
+    assert client.get(f'/download_resume/{owner.id}').data == b"%PDF-1.4\n%owner"
+    file_hash = hashlib.sha256(b"%PDF-1.4\n%owner").hexdigest()
+
+    for other in (student, recruiter):
+        _log_in(client, other)
+        assert client.get(f'/download_resume/{owner.id}').status_code == 403
+        assert client.get(f'/resume_preview/{file_hash}').status_code == 404
+
+    posting = Recruiter_Postings(recruiterId=recruiter.id, jobTitle="TA", jobLink="https://example.com/ta",
+                                 jobDescription="Grading", jobLocation="Raleigh", jobPayRate="15", maxHoursAllowed=20)
+    db.session.add(posting)
+    db.session.flush()
+    db.session.add(PostingApplications(postingId=posting.postingId, recruiterId=recruiter.id, applicantId=owner.id))
+    db.session.commit()
+    assert client.get(f'/download_resume/{owner.id}').data == b"%PDF-1.4\n%owner"
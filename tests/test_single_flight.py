@@ -0,0 +1,34 @@
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False), ("result", True)]
+    with pytest.raises(ZeroDivisionError):
+        flight.do("other", lambda: 1 / 0)
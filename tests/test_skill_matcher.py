@@ -0,0 +1,9 @@
+from app.services.skill_matcher import SkillMatcher, extract_skills
+
+
+def test_skill_matcher_matches_aliases_on_word_boundaries():
+    text = "Built scalable JavaScript and node.js services; used Postgres, k8s, C++ and ASP.NET. Sparked interest."
+    assert extract_skills(text) == ["JavaScript", "Node.js", "PostgreSQL", "Kubernetes", "C++", ".NET"]
+
+    matcher = SkillMatcher({"Hers": ("hers",), "He": ("he",), "She": ("she",), "His": ("his",)})
+    assert matcher.find("ushers she his he") == ["She", "His", "He"]
@@ -0,0 +1,69 @@
+from io import BytesIO
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import StoredResume, User, UserSnapshot, load_user
+from app.services.user_cache import UserCache
+
+
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+def test_load_user_returns_cached_snapshot_without_a_query(client, count_queries):
+    user = User(username="cacheduser", email="cached@example.com", password="testpassword", is_recruiter=True)
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+
+    snapshot = load_user(str(user_id))
+    assert snapshot == UserSnapshot(user_id, "cacheduser", "cached@example.com", True, None)
+    assert snapshot.is_authenticated and snapshot.get_id() == str(user_id)
+    db.session.remove()  # the snapshot is not bound to the session
+    count_queries.clear()
+    assert load_user(str(user_id)).username == "cacheduser"
+    assert count_queries == []
+    with pytest.raises(AttributeError):
+        snapshot.username = "changed"
+
+
+def test_load_user_sees_committed_changes_to_the_user(client, store, login_user):
+    assert load_user(str(login_user.id)).is_recruiter is True
+    with client.session_transaction() as session:
+        session['_user_id'] = login_user.id
+
+    client.post('/profile', data={'username': 'renamed'})
+    assert load_user(str(login_user.id)).username == 'renamed'
+    client.post('/upload_resume', data={'resume': (BytesIO(b"%PDF-1.4\n%cached"), 'cv.pdf')},
+                content_type='multipart/form-data')
+    assert load_user(str(login_user.id)).resume_path == str(StoredResume.query.one().id)
+
+    User.query.get(login_user.id).is_recruiter = False
+    db.session.commit()
+    assert load_user(str(login_user.id)).is_recruiter is False
+    db.session.delete(User.query.get(login_user.id))
+    db.session.commit()
+    assert load_user(str(login_user.id)) is None
+
+
+def test_user_cache_drops_snapshot_loaded_before_an_invalidation():
+    cache = UserCache(ttl=30)
+
+    def load():
+        cache.invalidate(7)  # the row changes while the old values are being read
+        return "stale"
+
+    assert cache.get_or_load(7, load) == "stale"
+    assert cache.get(7) is None
+    assert cache.get_or_load(7, lambda: "fresh") == "fresh"
+    assert cache.get(7) == "fresh"